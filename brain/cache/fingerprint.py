@@ -0,0 +1,141 @@
+#!/usr/bin/python
+
+'''
+
+This file caches the fingerprint of each generated model, so an identical
+model is not regenerated.
+
+'''
+
+import json
+from brain.cache.query import Query
+from brain.cache.model import Model
+
+
+class Fingerprint(object):
+    '''
+
+    This class provides an interface to the fingerprints of each generated sv
+    (i.e. svm, or svr) model, using the following redis hashes:
+
+        - '<model>_fingerprint', the record of each (adjusted) collection,
+          containing the 'fingerprint' of its cached model, along with the
+          'documents', and 'content' hash of the corresponding dataset.
+        - '<model>_fingerprints', the (unadjusted) collection, which most
+          recently generated a model, with each fingerprint.
+
+    Note: the record of a collection is removed, when its model is replaced
+          without a fingerprint (i.e. 'incremental.py').
+
+    Note: this class explicitly inherits the 'new-style' class.
+
+    '''
+
+    def __init__(self, model):
+        '''
+
+        This constructor is responsible for defining class variables, as well
+        as starting the redis client.
+
+        '''
+
+        self.model = model
+        self.records = model + '_fingerprint'
+        self.sources = model + '_fingerprints'
+        self.myRedis = Query()
+        self.myRedis.start_redis()
+
+    def get(self, collection):
+        '''
+
+        This method returns the record of the supplied (adjusted) collection,
+        or None if the collection has no fingerprinted model.
+
+        '''
+
+        record = self.myRedis.hget(self.records, collection)
+        return json.loads(record) if record else None
+
+    def set(self, collection, record):
+        '''
+
+        This method caches the supplied record, of the supplied (unadjusted)
+        collection.
+
+        '''
+
+        self.myRedis.hset(
+            self.records,
+            collection.lower().replace(' ', '_'),
+            json.dumps(record)
+        )
+        self.myRedis.hset(self.sources, record['fingerprint'], collection)
+
+    def invalidate(self, collection):
+        '''
+
+        This method removes the record of the supplied (adjusted) collection.
+
+        '''
+
+        self.myRedis.hdel(self.records, collection)
+
+    def reuse(self, collection, record):
+        '''
+
+        This method returns True, when the model of the supplied (unadjusted)
+        collection already has the fingerprint of the supplied record.
+        Otherwise, the model of any other collection, with the same
+        fingerprint, is copied to the supplied collection.
+
+        '''
+
+        collection_adjusted = collection.lower().replace(' ', '_')
+        current = self.get(collection_adjusted)
+
+        # case 1: model of the collection is current
+        if (
+            current and
+            current['fingerprint'] == record['fingerprint'] and
+            self.myRedis.hexists(self.model + '_model', collection_adjusted)
+        ):
+            if current != record:
+                self.set(collection, record)
+            return True
+
+        # case 2: model of another collection is identical
+        source = self.myRedis.hget(self.sources, record['fingerprint'])
+        if not source:
+            return False
+
+        source_adjusted = source.lower().replace(' ', '_')
+        if source_adjusted == collection_adjusted:
+            return False
+
+        origin = self.get(source_adjusted)
+        if not origin or origin['fingerprint'] != record['fingerprint']:
+            return False
+
+        if not Model().copy(
+            self.model + '_model',
+            source_adjusted,
+            collection_adjusted
+        ):
+            return False
+
+        Model().copy(self.model + '_labels', source_adjusted, collection_adjusted)
+
+        # remaining values: (hash_name, source key, key)
+        entries = [
+            (self.model + '_r2', source_adjusted, collection_adjusted),
+            (self.model + '_calibration', source_adjusted, collection_adjusted),
+            (self.model + '_feature_labels', source, collection)
+        ]
+        uncached = self.myRedis.hget_many([(x[0], x[1]) for x in entries])
+
+        for (hash_name, source_key, key), value in zip(entries, uncached):
+            if value is not None:
+                self.myRedis.hset(hash_name, key, value)
+
+        self.set(collection, record)
+        return True
@@ -64,3 +64,18 @@ class Hset(object):
         except Exception, error:
             self.list_error.append(str(error))
             return {'result': None, 'error': self.list_error}
+
+    def uncache_many(self, entries):
+        '''
+
+        This method uncaches the provided (hash_name, key) entries, from the
+        redis hash cache, using a single round trip. The resulting values are
+        returned in the same order.
+
+        '''
+
+        try:
+            return {'result': self.myRedis.hget_many(entries), 'error': None}
+        except Exception, error:
+            self.list_error.append(str(error))
+            return {'result': None, 'error': self.list_error}
@@ -0,0 +1,339 @@
+#!/usr/bin/python
+
+'''
+
+This file queues jobs into redis lists, to be consumed by a separate worker
+process, and records the status of each job into a redis hash.
+
+'''
+
+import json
+import datetime
+from uuid import uuid4
+from brain.cache.query import Query
+
+
+class JobQueue(object):
+    '''
+
+    This class provides an interface to enqueue, dequeue, and report the status
+    of jobs, using the following redis data structures:
+
+        - '<name>:queue:<uid>', a list of pending job ids, for a single user.
+        - '<name>:users', a list of users, with at least one pending job.
+        - '<name>:active', a set of users, currently within the above list.
+        - '<name>:job:<job_id>', a hash containing the job attributes.
+        - '<name>:processing:<worker>', a list of the job (and user) being
+          dequeued, or run by a single worker.
+        - '<name>:workers', a set of workers, which have sent a heartbeat.
+        - '<name>:heartbeat:<worker>', a key expiring once the corresponding
+          worker stops sending a heartbeat.
+
+    Each dequeue takes the user at the end of the '<name>:users' list, pops a
+    single job from the corresponding user queue, then pushes the user back to
+    the beginning of the list, if any of their jobs remain. Therefore, users
+    are served in turn, regardless of how many jobs each user has queued.
+
+    Note: each user, and job is moved into the processing list of the worker,
+          rather than removed, and only removed ('ack') once the job has
+          finished. A job left within the processing list, by a worker which
+          stopped unexpectedly, is queued again ('recover'), when the worker
+          restarts, or by any other worker, once the heartbeat of the stopped
+          worker has expired ('sweep').
+
+    Note: each dequeue increments the 'attempts' of the job, so a job which
+          repeatedly stops its worker can be failed, rather than recovered
+          indefinitely (see 'worker.py').
+
+    Note: this class explicitly inherits the 'new-style' class.
+
+    '''
+
+    def __init__(self, name='model_generate'):
+        '''
+
+        This constructor is responsible for defining class variables, as well
+        as starting the redis client.
+
+        '''
+
+        self.name = name
+        self.users = name + ':users'
+        self.active = name + ':active'
+        self.workers = name + ':workers'
+        self.myRedis = Query()
+        self.myRedis.start_redis()
+
+    def get_user_queue(self, uid):
+        '''
+
+        This method returns the name of the list of pending jobs, for the
+        supplied user.
+
+        '''
+
+        return self.name + ':queue:' + str(uid)
+
+    def get_job_key(self, job_id):
+        '''
+
+        This method returns the name of the hash, containing the supplied job.
+
+        '''
+
+        return self.name + ':job:' + job_id
+
+    def get_processing(self, worker):
+        '''
+
+        This method returns the name of the list, containing the user, and job
+        being processed by the supplied worker.
+
+        '''
+
+        return self.name + ':processing:' + str(worker)
+
+    def get_heartbeat(self, worker):
+        '''
+
+        This method returns the name of the key, which expires once the
+        supplied worker stops sending a heartbeat.
+
+        '''
+
+        return self.name + ':heartbeat:' + str(worker)
+
+    def enqueue(self, uid, data):
+        '''
+
+        This method stores the supplied job data, and queues the job for the
+        supplied user. The generated job id is returned.
+
+        '''
+
+        job_id = str(uuid4())
+        job_key = self.get_job_key(job_id)
+
+        self.myRedis.hset(job_key, 'uid', uid)
+        self.myRedis.hset(job_key, 'data', json.dumps(data))
+        self.myRedis.hset(job_key, 'status', 'queued')
+        self.myRedis.hset(job_key, 'progress', 0)
+        self.myRedis.hset(job_key, 'created', self.get_timestamp())
+
+        self.myRedis.lpush(self.get_user_queue(uid), job_id)
+        if self.myRedis.sadd(self.active, uid):
+            self.myRedis.lpush(self.users, uid)
+
+        return job_id
+
+    def dequeue(self, worker, timeout=0):
+        '''
+
+        This method returns the next job id, using the above round-robin
+        ordering of users, blocking up to 'timeout' seconds (0 indefinitely),
+        when no job is queued. None is returned, if the timeout elapses.
+
+        @worker, a name identifying the worker, which is unchanged when the
+            worker restarts (see 'recover').
+
+        Note: the 'attempts' of the returned job are incremented.
+
+        Note: when the user queue is found empty, the user is removed from
+              the active set, then the queue is checked again. A job queued
+              in between, is then requeued by whichever of 'enqueue', or this
+              method, adds the user back into the active set.
+
+        '''
+
+        processing = self.get_processing(worker)
+        uid = self.myRedis.brpoplpush(self.users, processing, timeout)
+        if not uid:
+            return None
+
+        user_queue = self.get_user_queue(uid)
+        job_id = self.myRedis.rpoplpush(user_queue, processing)
+        if job_id:
+            self.myRedis.hincrby(self.get_job_key(job_id), 'attempts')
+
+        if self.myRedis.llen(user_queue):
+            self.myRedis.lpush(self.users, uid)
+
+        else:
+            self.myRedis.srem(self.active, uid)
+            if (
+                self.myRedis.llen(user_queue) and
+                self.myRedis.sadd(self.active, uid)
+            ):
+                self.myRedis.lpush(self.users, uid)
+
+        # the user is requeued: only the job remains processing
+        self.myRedis.lrem(processing, 1, uid)
+        return job_id
+
+    def ack(self, worker, job_id):
+        '''
+
+        This method removes the supplied finished job, from the processing
+        list of the supplied worker.
+
+        '''
+
+        self.myRedis.lrem(self.get_processing(worker), 0, job_id)
+
+    def recover(self, worker):
+        '''
+
+        This method queues each job, left within the processing list of the
+        supplied worker, at the end of the corresponding user queue, so it is
+        the next job of the user. The list is then emptied, and the recovered
+        job ids are returned.
+
+        Note: a user left within the processing list (i.e. the worker stopped
+              while dequeuing), is pushed back into the '<name>:users' list.
+
+        '''
+
+        processing = self.get_processing(worker)
+        recovered = []
+
+        for item in self.myRedis.lrange(processing, 0, -1):
+            job_key = self.get_job_key(item)
+            uid = self.myRedis.hget(job_key, 'uid')
+
+            # job: queue again, unless it has finished, or expired
+            if uid is not None:
+                if self.myRedis.hget(job_key, 'status') in ['queued', 'running']:
+                    self.myRedis.hset(job_key, 'status', 'queued')
+                    self.myRedis.hset(job_key, 'progress', 0)
+                    self.myRedis.rpush(self.get_user_queue(uid), item)
+                    recovered.append(item)
+
+                    if self.myRedis.sadd(self.active, uid):
+                        self.myRedis.lpush(self.users, uid)
+
+            # user: interrupted dequeue, of a user with remaining jobs
+            elif self.myRedis.sismember(self.active, item):
+                self.myRedis.lpush(self.users, item)
+
+            self.myRedis.lrem(processing, 1, item)
+
+        return recovered
+
+    def heartbeat(self, worker, ttl):
+        '''
+
+        This method registers the supplied worker, as alive for the next 'ttl'
+        seconds.
+
+        '''
+
+        self.myRedis.setex(self.get_heartbeat(worker), 1, ttl)
+        self.myRedis.sadd(self.workers, worker)
+
+    def sweep(self):
+        '''
+
+        This method recovers the processing list, of each registered worker
+        whose heartbeat has expired (i.e. the worker, or its container no
+        longer exists). The recovered job ids are returned.
+
+        Note: a worker is only recovered by the sweep which removes it from
+              the '<name>:workers' set, so concurrent sweeps cannot queue the
+              same job twice.
+
+        '''
+
+        recovered = []
+
+        for worker in self.myRedis.smembers(self.workers):
+            if (
+                self.myRedis.get(self.get_heartbeat(worker)) is None and
+                self.myRedis.srem(self.workers, worker)
+            ):
+                recovered.extend(self.recover(worker))
+
+        return recovered
+
+    def get_job(self, job_id):
+        '''
+
+        This method returns the attributes of the supplied job, or None if the
+        job does not exist (or has expired).
+
+        '''
+
+        job = self.myRedis.hgetall(self.get_job_key(job_id))
+        if not job:
+            return None
+
+        job['job_id'] = job_id
+        job['progress'] = int(job.get('progress', 0))
+        job['attempts'] = int(job.get('attempts', 0))
+        job['data'] = json.loads(job['data']) if job.get('data') else None
+        job['error'] = json.loads(job['error']) if job.get('error') else None
+        job['result'] = json.loads(job['result']) if job.get('result') else None
+
+        return job
+
+    def set_status(
+        self,
+        job_id,
+        status,
+        progress=None,
+        error=None,
+        ttl=None,
+        result=None
+    ):
+        '''
+
+        This method updates the status of the supplied job.
+
+        @status, one of the following:
+
+            - queued
+            - running
+            - complete
+            - failed
+
+        @ttl, expire time (in seconds) of the job, once it has finished.
+        @result, optional result of a complete job (i.e. search leaderboard).
+
+        '''
+
+        job_key = self.get_job_key(job_id)
+        self.myRedis.hset(job_key, 'status', status)
+
+        if progress is not None:
+            self.myRedis.hset(job_key, 'progress', progress)
+
+        if error:
+            self.myRedis.hset(job_key, 'error', json.dumps(error))
+
+        if result:
+            self.myRedis.hset(job_key, 'result', json.dumps(result))
+
+        if status == 'running':
+            self.myRedis.hset(job_key, 'started', self.get_timestamp())
+
+        elif status in ['complete', 'failed']:
+            self.myRedis.hset(job_key, 'finished', self.get_timestamp())
+            if ttl:
+                self.myRedis.expire(job_key, ttl)
+
+    def set_progress(self, job_id, progress):
+        '''
+
+        This method updates the progress (percentage) of the supplied job.
+
+        '''
+
+        self.myRedis.hset(self.get_job_key(job_id), 'progress', progress)
+
+    def get_timestamp(self):
+        '''
+
+        This method returns the current utc datetime, as a string.
+
+        '''
+
+        return datetime.datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%S")
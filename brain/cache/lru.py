@@ -0,0 +1,237 @@
+#!/usr/bin/python
+
+'''
+
+This file provides an in-process, least recently used (LRU) cache, of models
+previously uncached, and deserialized from the redis hash cache.
+
+'''
+
+import os
+import json
+import redis
+import threading
+from collections import OrderedDict
+from flask import current_app
+from brain.cache.pool import get_pool
+
+# channel used to notify every worker, that a cached model has been replaced
+INVALIDATE_CHANNEL = 'model_cache:invalidate'
+
+# per process instance: reinstantiated after a fork
+_instance = {'pid': None, 'cache': None}
+_instance_lock = threading.Lock()
+
+
+class ModelCache(object):
+    '''
+
+    This class provides an interface to store deserialized models, within the
+    memory of the current worker process. Entries are keyed by the redis hash
+    name, and the corresponding hash key (i.e. collection).
+
+    @max_entries, the maximum number of models held at any time.
+
+    @max_bytes, the maximum combined size of the held models, measured by the
+        length of the corresponding serialized redis value.
+
+    Note: entries are evicted when any process publishes an invalidation
+          message, on the 'INVALIDATE_CHANNEL' (see 'Model.cache').
+          If the corresponding subscription cannot be maintained, the cache
+          is bypassed, rather than risk returning a stale model.
+
+    Note: this class explicitly inherits the 'new-style' class.
+
+    '''
+
+    def __init__(self, max_entries, max_bytes, host=None, port=None, db=0):
+        '''
+
+        This constructor is responsible for defining class variables.
+
+        '''
+
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.host = host
+        self.port = port
+        self.db = db
+
+        self.entries = OrderedDict()
+        self.generation = {}
+        self.epoch = 0
+        self.total_bytes = 0
+        self.lock = threading.RLock()
+        self.listener = None
+
+    def start_listener(self):
+        '''
+
+        This method subscribes to the invalidation channel, using a daemon
+        thread, which evicts the corresponding entry for each message.
+
+        '''
+
+        with self.lock:
+            if self.listener and self.listener.is_alive():
+                return True
+
+            try:
+                client = redis.StrictRedis(
+                    connection_pool=get_pool(self.host, self.port, self.db)
+                )
+                pubsub = client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(INVALIDATE_CHANNEL)
+
+            except redis.RedisError:
+                self.clear()
+                return False
+
+            self.listener = threading.Thread(target=self.listen, args=(pubsub,))
+            self.listener.daemon = True
+            self.listener.start()
+            return True
+
+    def listen(self, pubsub):
+        '''
+
+        This method evicts entries, as invalidation messages are received.
+
+        Note: when the subscription is lost, all entries are cleared, since
+              subsequent invalidation(s) may not be received.
+
+        '''
+
+        try:
+            for message in pubsub.listen():
+                if message.get('type') == 'message':
+                    hash_name, key = json.loads(message['data'])
+                    self.invalidate(hash_name, key)
+
+        except Exception:
+            pass
+
+        self.clear()
+
+    def get(self, hash_name, key):
+        '''
+
+        This method returns the desired model, and marks it as most recently
+        used. None is returned, if the model is not held.
+
+        '''
+
+        if self.max_entries < 1 or not self.start_listener():
+            return None
+
+        with self.lock:
+            entry = self.entries.pop((hash_name, key), None)
+            if entry is None:
+                return None
+
+            self.entries[(hash_name, key)] = entry
+            return entry['value']
+
+    def get_generation(self, hash_name, key):
+        '''
+
+        This method returns the number of invalidations received for the
+        supplied entry, along with the number of times the cache was cleared.
+        It is recorded before fetching from redis, so a model replaced during
+        the fetch, is not stored by 'set'.
+
+        '''
+
+        with self.lock:
+            return (self.epoch, self.generation.get((hash_name, key), 0))
+
+    def set(self, hash_name, key, value, size, generation=None):
+        '''
+
+        This method stores the supplied model, then evicts the least recently
+        used entries, until the entry, and byte limits are satisfied.
+
+        '''
+
+        if size > self.max_bytes or self.max_entries < 1:
+            return
+
+        with self.lock:
+            if (
+                generation is not None and
+                generation != self.get_generation(hash_name, key)
+            ):
+                return
+
+            self.remove((hash_name, key))
+            self.entries[(hash_name, key)] = {'value': value, 'size': size}
+            self.total_bytes += size
+
+            while (
+                len(self.entries) > self.max_entries or
+                self.total_bytes > self.max_bytes
+            ):
+                oldest = next(iter(self.entries))
+                self.remove(oldest)
+
+    def remove(self, entry_key):
+        '''
+
+        This method removes the supplied entry, if it exists.
+
+        '''
+
+        with self.lock:
+            entry = self.entries.pop(entry_key, None)
+            if entry is not None:
+                self.total_bytes -= entry['size']
+
+    def invalidate(self, hash_name, key):
+        '''
+
+        This method evicts the supplied entry, and increments its generation.
+
+        '''
+
+        with self.lock:
+            entry_key = (hash_name, key)
+            self.generation[entry_key] = self.generation.get(entry_key, 0) + 1
+            self.remove(entry_key)
+
+    def clear(self):
+        '''
+
+        This method evicts all entries.
+
+        '''
+
+        with self.lock:
+            self.epoch += 1
+            self.entries.clear()
+            self.total_bytes = 0
+
+
+def get_model_cache():
+    '''
+
+    This function returns the model cache, for the current worker process.
+
+    Note: the cache is created lazily, within the current application context.
+          Since the process id is checked, a cache inherited from a parent
+          process (i.e. pre-forking webserver) is discarded, along with its
+          subscription thread.
+
+    '''
+
+    with _instance_lock:
+        if _instance['pid'] != os.getpid():
+            _instance['cache'] = ModelCache(
+                current_app.config.get('MODEL_CACHE_ENTRIES', 0),
+                current_app.config.get('MODEL_CACHE_BYTES', 0),
+                current_app.config.get('CACHE_HOST'),
+                current_app.config.get('CACHE_PORT'),
+                current_app.config.get('CACHE_DB', 0)
+            )
+            _instance['pid'] = os.getpid()
+
+    return _instance['cache']
@@ -0,0 +1,110 @@
+#!/usr/bin/python
+
+'''
+
+This file caches the metadata of each collection, from the sql database, into
+an expiring redis hash.
+
+'''
+
+from flask import current_app
+from brain.cache.query import Query
+
+
+class Metadata(object):
+    '''
+
+    This class provides an interface to the following metadata, of a given
+    collection, from the 'tbl_dataset_entity' sql database table:
+
+        - id_entity
+        - uid_created
+        - model_type
+
+    Each collection is cached into the 'metadata:<collection>' redis hash,
+    which expires after 'METADATA_TTL' seconds. The hash is removed when the
+    corresponding entity is saved, or removed (see 'entity.py').
+
+    Note: redis errors are ignored, since the sql database remains the
+          source of the metadata.
+
+    Note: collection names are compared case insensitive by the sql database,
+          and therefore lowercased within the redis key.
+
+    Note: feature labels are already cached within redis (i.e. the
+          '<model_type>_feature_labels' hash), and not duplicated here.
+
+    Note: this class explicitly inherits the 'new-style' class.
+
+    '''
+
+    def __init__(self):
+        '''
+
+        This constructor is responsible for defining class variables, as well
+        as starting the redis client.
+
+        '''
+
+        self.ttl = current_app.config.get('METADATA_TTL')
+        self.myRedis = Query()
+        self.myRedis.start_redis()
+
+    def get_key(self, collection):
+        '''
+
+        This method returns the name of the redis hash, for the supplied
+        collection.
+
+        '''
+
+        return 'metadata:' + collection.lower()
+
+    def get(self, collection):
+        '''
+
+        This method returns the cached metadata of the supplied collection, or
+        None if it is not cached.
+
+        '''
+
+        try:
+            cached = self.myRedis.hgetall(self.get_key(collection))
+        except Exception:
+            return None
+
+        if not cached:
+            return None
+
+        return {
+            'id_entity': int(cached['id_entity']),
+            'uid_created': int(cached['uid_created']),
+            'model_type': cached['model_type']
+        }
+
+    def set(self, collection, metadata):
+        '''
+
+        This method caches the supplied metadata, of the supplied collection.
+
+        '''
+
+        if not self.ttl:
+            return
+
+        try:
+            self.myRedis.hset_many(self.get_key(collection), metadata, self.ttl)
+        except Exception:
+            pass
+
+    def invalidate(self, collection):
+        '''
+
+        This method removes any cached metadata, of the supplied collection.
+
+        '''
+
+        try:
+            self.myRedis.delete(self.get_key(collection))
+        except Exception:
+            pass
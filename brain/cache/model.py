@@ -6,7 +6,10 @@ This file caches, and uncaches the supplied model into a redis hash cache.
 
 '''
 
+import json
+from flask import current_app
 from brain.cache.query import Query
+from brain.cache.lru import get_model_cache, INVALIDATE_CHANNEL
 from brain.converter.model import Model as Converter
 
 
@@ -48,25 +51,119 @@ class Model(object):
         This method serializes, then caches the provided model into a redis
         hash cache.
 
+        Note: an invalidation message is published, so each worker evicts
+              any previous model, held within its in-process cache.
+
+        Note: svm, and svr models are stored in the 'MODEL_FORMAT' format,
+              compressed by 'MODEL_CODEC' (see 'cache.yaml').
+
         '''
 
         try:
-            serialized = Converter(self.model).serialize()
+            serialized = Converter(self.model).serialize(
+                current_app.config.get('MODEL_FORMAT', 'pickle'),
+                current_app.config.get('MODEL_CODEC', 'none')
+            )
             self.myRedis.hset(hash_name, key, serialized)
+            self.myRedis.publish(
+                INVALIDATE_CHANNEL,
+                json.dumps([hash_name, key])
+            )
         except Exception, error:
             self.list_error.append(str(error))
             print self.list_error
 
+    def copy(self, hash_name, source, key):
+        '''
+
+        This method copies the serialized model, cached under the 'source'
+        key, to the supplied key, without unserializing the model. False is
+        returned, when no model is cached under the 'source' key.
+
+        Note: an invalidation message is published, consistent with 'cache'.
+
+        '''
+
+        serialized = self.myRedis.hget(hash_name, source)
+        if serialized is None:
+            return False
+
+        self.myRedis.hset(hash_name, key, serialized)
+        self.myRedis.publish(INVALIDATE_CHANNEL, json.dumps([hash_name, key]))
+        return True
+
     def uncache(self, hash_name, key):
         '''
 
         This method unserializes, then uncaches the desired model, using
         the provided key from the redis hash cache.
 
+        Note: models are first looked up within the in-process cache, which
+              allows redis, and deserialization to be skipped entirely.
+
+        '''
+
+        model_cache = get_model_cache()
+        model = model_cache.get(hash_name, key)
+
+        if model is None:
+            generation = model_cache.get_generation(hash_name, key)
+            uncached = self.myRedis.hget(hash_name, key)
+            model = Converter(uncached).deserialize()
+
+            model_cache.set(
+                hash_name,
+                key,
+                model,
+                len(uncached),
+                generation
+            )
+
+        return model
+
+    def uncache_many(self, models, values=None):
+        '''
+
+        This method uncaches the desired models, along with any additional
+        (serialized) values, using a single round trip to the redis hash
+        cache. A tuple is returned, containing the list of unserialized
+        models, followed by the list of values, each in the supplied order.
+
+        @models, a list of (hash_name, key) tuples, each containing a model.
+        @values, a list of (hash_name, key) tuples, returned as stored.
+
+        Note: models held within the in-process cache, are not requested.
+              Any entry which does not exist, is returned as None.
+
         '''
 
-        uncached = self.myRedis.hget(hash_name, key)
-        return Converter(uncached).deserialize()
+        # local variables
+        values = values or []
+        model_cache = get_model_cache()
+        list_model = [model_cache.get(h, k) for h, k in models]
+        missing = [i for i, model in enumerate(list_model) if model is None]
+        generation = [model_cache.get_generation(*models[i]) for i in missing]
+
+        # single round trip
+        entries = [models[i] for i in missing] + list(values)
+        if entries:
+            uncached = self.myRedis.hget_many(entries)
+        else:
+            uncached = []
+
+        # unserialize models
+        for j, i in enumerate(missing):
+            if uncached[j] is not None:
+                list_model[i] = Converter(uncached[j]).deserialize()
+                model_cache.set(
+                    models[i][0],
+                    models[i][1],
+                    list_model[i],
+                    len(uncached[j]),
+                    generation[j]
+                )
+
+        return (list_model, uncached[len(missing):])
 
     def get_all_titles(self, name):
         '''
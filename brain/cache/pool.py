@@ -0,0 +1,152 @@
+#!/usr/bin/python
+
+'''
+
+This file maintains a process-wide registry of redis connection pools, shared
+by each redis client (i.e. 'Query', 'RedisSessionInterface').
+
+'''
+
+import redis
+import threading
+
+# pool settings: defined within 'factory.create_app'
+_settings = {
+    'max_connections': 50,
+    'timeout': 5,
+    'health_check_interval': 30
+}
+
+# registry of pools, keyed by (host, port, db)
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+class MeteredConnectionPool(redis.BlockingConnectionPool):
+    '''
+
+    This class provides a blocking connection pool, which counts each
+    connection checkout, along with each checkout that could not be fulfilled.
+
+    Note: when all 'max_connections' are in use, a checkout waits up to
+          'timeout' seconds for a connection to be released, rather than
+          opening an unbounded number of connections.
+
+    '''
+
+    def __init__(self, *args, **kwargs):
+        '''
+
+        This constructor inherits the 'BlockingConnectionPool' constructor,
+        along with defining the checkout counters.
+
+        '''
+
+        super(MeteredConnectionPool, self).__init__(*args, **kwargs)
+        self.counter_lock = threading.Lock()
+        self.checkouts = 0
+        self.failures = 0
+
+    def get_connection(self, command_name, *keys, **options):
+        '''
+
+        This method checks out a connection, from the pool.
+
+        '''
+
+        try:
+            connection = super(MeteredConnectionPool, self).get_connection(
+                command_name,
+                *keys,
+                **options
+            )
+
+        except redis.RedisError:
+            with self.counter_lock:
+                self.failures += 1
+            raise
+
+        with self.counter_lock:
+            self.checkouts += 1
+
+        return connection
+
+    def get_metrics(self):
+        '''
+
+        This method returns the current usage of the pool.
+
+        '''
+
+        created = len(self._connections)
+        idle = len([c for c in list(self.pool.queue) if c is not None])
+
+        return {
+            'max_connections': self.max_connections,
+            'created': created,
+            'in_use': created - idle,
+            'idle': idle,
+            'checkouts': self.checkouts,
+            'failures': self.failures
+        }
+
+
+def configure(max_connections, timeout, health_check_interval):
+    '''
+
+    This function defines the settings of subsequently created pools.
+
+    @max_connections, maximum connections held by each pool.
+    @timeout, seconds a checkout waits, when every connection is in use.
+    @health_check_interval, seconds a connection can remain idle, before it
+        is verified (PING) on its next checkout.
+
+    '''
+
+    with _pools_lock:
+        _settings['max_connections'] = max_connections
+        _settings['timeout'] = timeout
+        _settings['health_check_interval'] = health_check_interval
+
+
+def get_pool(host, port, db=0):
+    '''
+
+    This function returns the connection pool, for the supplied redis server,
+    creating it on first use.
+
+    Note: each pool discards connections inherited from a parent process (i.e.
+          pre-forking webserver), before its first use within a child process.
+
+    '''
+
+    key = (host, int(port), int(db))
+
+    with _pools_lock:
+        if key not in _pools:
+            _pools[key] = MeteredConnectionPool(
+                host=host,
+                port=int(port),
+                db=int(db),
+                max_connections=_settings['max_connections'],
+                timeout=_settings['timeout'],
+                health_check_interval=_settings['health_check_interval']
+            )
+
+        return _pools[key]
+
+
+def get_metrics():
+    '''
+
+    This function returns the usage of every pool, keyed by 'host:port/db'.
+
+    '''
+
+    with _pools_lock:
+        pools = dict(_pools)
+
+    return {
+        '%s:%s/%s' % key: pool.get_metrics()
+        for key, pool in pools.items()
+    }
@@ -8,6 +8,7 @@ This file allows various redis data structures to be used for caching.
 
 import redis
 from brain.cache.settings import Settings
+from brain.cache.pool import get_pool
 
 
 class Query(object):
@@ -70,14 +71,13 @@ class Query(object):
 
         This method establishes a redis instance.
 
-        @pool, we define a reusable connection pool, based on the supplied
-            host, port, and db_num. This allows the redis client (StrictRedis)
-            to reuse a previous connection within the pool, which may be idle
-            from previous use.
+        @pool, the process-wide connection pool, for the supplied host, port,
+            and db_num. This allows each redis client (StrictRedis) to reuse
+            a previous connection within the pool, which may be idle from
+            previous use, rather than connecting on every instantiation.
 
-        Note: a connection pool manages a set of connection instances. By
-              default, the maximum limit is 10,000 concurrent connections, and
-              can be adjusted within 'redis.conf' (maxmemory directive).
+        Note: the number of connections held by each pool, is limited by the
+              'max_connections' redis pool setting, within 'cache.yaml'.
 
         Note: for more information regarding redis concurrent client
               connections, review the following:
@@ -86,11 +86,7 @@ class Query(object):
 
         '''
 
-        pool = redis.ConnectionPool(
-            host=self.host,
-            port=self.port,
-            db=self.db_num
-        )
+        pool = get_pool(self.host, self.port, self.db_num)
         self.server = redis.StrictRedis(connection_pool=pool)
 
     def shutdown(self):
@@ -141,6 +137,17 @@ class Query(object):
 
         self.server.set(key, value, time)
 
+    def setnx(self, key, value, time=None):
+        '''
+
+        This method sets the provided key-value, only if the key does not
+        exist, with an optional expire time (in seconds). True is returned,
+        if the key was set.
+
+        '''
+
+        return bool(self.server.set(key, value, ex=time, nx=True))
+
     def expire(self, key, time):
         '''
 
@@ -265,6 +272,28 @@ class Query(object):
 
         return self.server.rpop(name)
 
+    def rpoplpush(self, src, dst):
+        '''
+
+        This method removes the last item of the 'src' redis list, and pushes
+        it to the beginning of the 'dst' redis list, as a single operation.
+        The item is returned, or None if the 'src' list is empty.
+
+        '''
+
+        return self.server.rpoplpush(src, dst)
+
+    def brpoplpush(self, src, dst, timeout=0):
+        '''
+
+        This method behaves like 'rpoplpush'. However, if the 'src' list is
+        empty, the call blocks until an item is pushed, or the timeout (in
+        seconds) elapses, in which case None is returned.
+
+        '''
+
+        return self.server.brpoplpush(src, dst, timeout)
+
     def ltrim(self, name, start, end):
         '''
 
@@ -322,6 +351,23 @@ class Query(object):
 
         return self.server.hget(name, key)
 
+    def hget_many(self, entries):
+        '''
+
+        This method returns a list of values, from the specified redis hashes,
+        using a single pipelined round trip.
+
+        @entries, a list of (name, key) tuples, where each value is returned
+            in the same order.
+
+        '''
+
+        pipe = self.server.pipeline(transaction=False)
+        for name, key in entries:
+            pipe.hget(name, key)
+
+        return pipe.execute()
+
     def hset(self, name, key, value):
         '''
 
@@ -331,6 +377,44 @@ class Query(object):
 
         self.server.hset(name, key, value)
 
+    def hincrby(self, name, key, amount=1):
+        '''
+
+        This method increments the integer value, of a redis hash key, and
+        returns the incremented value.
+
+        '''
+
+        return self.server.hincrby(name, key, amount)
+
+    def hset_many(self, name, mapping, time=None):
+        '''
+
+        This method sets each key, and value of the supplied mapping, into a
+        redis hash, along with an optional expire time (in seconds), using a
+        single round trip.
+
+        '''
+
+        pipe = self.server.pipeline(transaction=True)
+        for key, value in mapping.items():
+            pipe.hset(name, key, value)
+
+        if time:
+            pipe.expire(name, time)
+
+        pipe.execute()
+
+    def hgetall(self, name):
+        '''
+
+        This method returns all keys, and values within the specified redis
+        hash, as a dictionary.
+
+        '''
+
+        return self.server.hgetall(name)
+
     def hvals(self, name):
         '''
 
@@ -360,14 +444,25 @@ class Query(object):
 
         return self.server.hkeys(name)
 
+    def publish(self, channel, message):
+        '''
+
+        This method publishes the supplied message, to all subscribers of the
+        specified redis channel.
+
+        '''
+
+        return self.server.publish(channel, message)
+
     def sadd(self, name, *values):
         '''
 
-        This method adds values to the specified redis set.
+        This method adds values to the specified redis set, and returns the
+        number of values which were not already members.
 
         '''
 
-        self.server.sadd(name, *values)
+        return self.server.sadd(name, *values)
 
     def scard(self, name):
         '''
@@ -15,6 +15,7 @@ from datetime import timedelta
 from uuid import uuid4
 from werkzeug.datastructures import CallbackDict
 from flask.sessions import SessionInterface, SessionMixin
+from brain.cache.pool import get_pool
 
 
 class RedisSession(CallbackDict, SessionMixin):
@@ -33,7 +34,7 @@ class RedisSessionInterface(SessionInterface):
     session_class = RedisSession
 
     def __init__(self, host, port=6379, db=0, prefix='session:'):
-        pool = redis.ConnectionPool(host=host, port=port, db=db)
+        pool = get_pool(host, port, db)
 
         redis_instance = redis.StrictRedis(connection_pool=pool)
 
@@ -0,0 +1,153 @@
+#!/usr/bin/python
+
+'''
+
+This file converts observations, between the nested dictionary format, and a
+columnar format, consisting of a float64 feature matrix, a label vector, and
+the corresponding feature names.
+
+'''
+
+import numpy
+from bson.binary import Binary
+
+
+def encode(observations, upload_id, regression=False, max_bytes=8388608):
+    '''
+
+    This method converts the supplied observations, into a list of columnar
+    blocks, which can be stored as separate nosql documents.
+
+    @observations, a list of observations, each with the 'dependent-variable',
+        and 'independent-variables' attributes.
+
+    @upload_id, identifies the upload, the observations were supplied from.
+
+    @regression, stores the labels as a float64 vector, as required by
+        regression model types (i.e. svr). Otherwise, labels are stored as a
+        list of strings.
+
+    @max_bytes, the maximum size of the feature matrix within a single block,
+        which keeps each document below the nosql document size limit.
+
+    Note: features are ordered by sorted feature name, consistent with the
+          feature labels cached during 'model_generate'. Observations which
+          do not share the feature names of the first observation, cause
+          None to be returned, since they cannot form a single matrix.
+
+    '''
+
+    # local variables
+    labels = []
+    rows = []
+    feature_names = None
+
+    for observation in observations:
+        for features in observation['independent-variables']:
+            if feature_names is None:
+                feature_names = sorted(features.keys())
+            elif len(features) != len(feature_names):
+                return None
+
+            try:
+                rows.append([features[name] for name in feature_names])
+            except KeyError:
+                return None
+
+            labels.append(observation['dependent-variable'])
+
+    if not rows:
+        return None
+
+    # build columns
+    try:
+        features = numpy.asarray(rows, dtype=numpy.float64)
+        if regression:
+            labels = numpy.asarray(labels, dtype=numpy.float64)
+
+    except (TypeError, ValueError):
+        return None
+
+    # split columns into blocks
+    blocks = []
+    block_rows = max(1, max_bytes // (8 * features.shape[1]))
+
+    for start in range(0, features.shape[0], block_rows):
+        block_features = numpy.ascontiguousarray(
+            features[start:start + block_rows]
+        )
+
+        if regression:
+            block_labels = Binary(labels[start:start + block_rows].tobytes())
+        else:
+            block_labels = labels[start:start + block_rows]
+
+        blocks.append({
+            'upload_id': upload_id,
+            'feature_names': feature_names,
+            'shape': list(block_features.shape),
+            'features': Binary(block_features.tobytes()),
+            'labels': block_labels,
+            'regression': regression
+        })
+
+    return blocks
+
+
+def decode(blocks):
+    '''
+
+    This method concatenates the supplied columnar blocks, into a single
+    feature matrix, and label vector, using a preallocated buffer.
+
+    Note: None is returned, if the blocks do not share the same feature names,
+          or label type.
+
+    '''
+
+    # local variables
+    blocks = list(blocks)
+    if not blocks:
+        return None
+
+    feature_names = blocks[0]['feature_names']
+    regression = blocks[0]['regression']
+    if any(
+        block['feature_names'] != feature_names or
+        block['regression'] != regression
+        for block in blocks
+    ):
+        return None
+
+    # preallocate columns
+    total = sum(block['shape'][0] for block in blocks)
+    features = numpy.empty((total, len(feature_names)), dtype=numpy.float64)
+    if regression:
+        labels = numpy.empty(total, dtype=numpy.float64)
+    else:
+        labels = []
+
+    # fill columns
+    offset = 0
+    for block in blocks:
+        count = block['shape'][0]
+        features[offset:offset + count] = numpy.frombuffer(
+            block['features'],
+            dtype=numpy.float64
+        ).reshape(block['shape'])
+
+        if regression:
+            labels[offset:offset + count] = numpy.frombuffer(
+                block['labels'],
+                dtype=numpy.float64
+            )
+        else:
+            labels.extend(block['labels'])
+
+        offset += count
+
+    return {
+        'feature_names': feature_names,
+        'features': features,
+        'labels': labels
+    }
@@ -0,0 +1,332 @@
+#!/usr/bin/python
+
+'''
+
+This file converts a fitted sv model (i.e. svm, or svr), to a compact format,
+consisting of a small json header, followed by the raw contiguous arrays of
+the model. The arrays can be read in place (zero-copy), from the supplied
+buffer, which includes a memory mapped file.
+
+The format is structured as follows:
+
+    - MAGIC, 4 bytes
+    - header length, 4 byte little endian unsigned integer
+    - header, json object describing the model parameters, the codec, and the
+      dtype, shape, and offset of each array
+    - padding, to the next 8 byte boundary
+    - payload, concatenation of each array (8 byte aligned), compressed by
+      the chosen codec
+
+'''
+
+import json
+import mmap
+import struct
+import zlib
+import numpy
+from sklearn import svm
+
+# format identifier
+MAGIC = 'SVC1'
+
+# arrays defining a fitted model
+ARRAYS = [
+    'support_',
+    'support_vectors_',
+    'n_support_',
+    '_dual_coef_',
+    '_intercept_',
+    'probA_',
+    'probB_',
+    'class_weight_'
+]
+
+# codecs: name -> (compress, decompress)
+CODECS = {
+    'none': (None, None),
+    'zlib': (zlib.compress, zlib.decompress)
+}
+
+
+def register_codec(name, compress, decompress):
+    '''
+
+    This function registers a codec, used to compress the payload.
+
+    '''
+
+    CODECS[name] = (compress, decompress)
+
+
+# optional codecs: registered, if the corresponding package is installed
+try:
+    import lz4.frame
+    register_codec('lz4', lz4.frame.compress, lz4.frame.decompress)
+except ImportError:
+    pass
+
+try:
+    import zstandard
+    register_codec(
+        'zstd',
+        lambda data: zstandard.ZstdCompressor().compress(data),
+        lambda data: zstandard.ZstdDecompressor().decompress(data)
+    )
+except ImportError:
+    pass
+
+
+def is_supported(model):
+    '''
+
+    This function determines whether the supplied model, can be represented
+    by the compact format.
+
+    '''
+
+    return (
+        type(model) in [svm.classes.SVC, svm.classes.SVR] and
+        not model._sparse and
+        not callable(model.kernel)
+    )
+
+
+def dumps(model, codec='none'):
+    '''
+
+    This function converts the supplied fitted model, to the compact format.
+
+    @codec, name of a registered codec, used to compress the payload.
+
+    '''
+
+    # local variables
+    compress = CODECS[codec][0]
+    arrays = []
+    chunks = []
+    offset = 0
+
+    # arrays: each aligned to 8 bytes
+    names = ARRAYS + (['classes_'] if hasattr(model, 'classes_') else [])
+    for name in names:
+        array = numpy.ascontiguousarray(getattr(model, name))
+        data = array.tobytes()
+        padding = -len(data) % 8
+
+        arrays.append({
+            'name': name,
+            'dtype': array.dtype.str,
+            'shape': list(array.shape),
+            'offset': offset
+        })
+        chunks.append(data + '\0' * padding)
+        offset += len(data) + padding
+
+    payload = ''.join(chunks)
+    if compress:
+        payload = compress(payload)
+
+    # header
+    header = json.dumps({
+        'model': type(model).__name__,
+        'codec': codec,
+        'params': {
+            'kernel': model.kernel,
+            'degree': model.degree,
+            'gamma': model.gamma,
+            'coef0': model.coef0,
+            'C': model.C,
+            'epsilon': model.epsilon,
+            'probability': model.probability,
+            '_gamma': model._gamma,
+            'shape_fit_': list(model.shape_fit_),
+            'fit_status_': model.fit_status_
+        },
+        'arrays': arrays
+    })
+    padding = -(8 + len(header)) % 8
+
+    return ''.join([
+        MAGIC,
+        struct.pack('<I', len(header)),
+        header,
+        ' ' * padding,
+        payload
+    ])
+
+
+def loads(buffer):
+    '''
+
+    This function converts the supplied compact format, to a 'CompactModel'.
+
+    @buffer, any object supporting the buffer protocol (i.e. str, mmap).
+
+    Note: when no codec was used, each array is a read-only view into the
+          supplied buffer, which must therefore remain unchanged.
+
+    '''
+
+    if buffer[:4] != MAGIC:
+        raise ValueError('unrecognized compact model format')
+
+    # header
+    length = struct.unpack('<I', buffer[4:8])[0]
+    header = json.loads(buffer[8:8 + length])
+    start = 8 + length + (-(8 + length) % 8)
+
+    # payload
+    decompress = CODECS[header['codec']][1]
+    if decompress:
+        buffer = decompress(buffer[start:])
+        start = 0
+
+    # arrays
+    arrays = {}
+    for array in header['arrays']:
+        dtype = numpy.dtype(str(array['dtype']))
+        count = int(numpy.prod(array['shape']))
+
+        arrays[array['name']] = numpy.frombuffer(
+            buffer,
+            dtype=dtype,
+            count=count,
+            offset=start + array['offset']
+        ).reshape(array['shape'])
+
+    return CompactModel(header['model'], header['params'], arrays)
+
+
+def dump(model, path, codec='none'):
+    '''
+
+    This function writes the supplied fitted model, in the compact format,
+    into the supplied file path.
+
+    '''
+
+    with open(path, 'wb') as f:
+        f.write(dumps(model, codec))
+
+
+def load(path):
+    '''
+
+    This function memory maps the supplied file, then returns the contained
+    'CompactModel'. Only pages of the file which are read, become resident.
+
+    '''
+
+    with open(path, 'rb') as f:
+        return loads(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+
+
+class CompactModel(object):
+    '''
+
+    This class provides an interface to the arrays, and parameters of a model
+    loaded from the compact format.
+
+    @self.arrays, the model arrays (see 'ARRAYS'), keyed by attribute name.
+
+    Note: 'predict', 'predict_proba', and 'decision_function' are delegated
+          to the equivalent sklearn model, which is reconstructed from the
+          arrays on first use.
+
+    Note: this class explicitly inherits the 'new-style' class.
+
+    '''
+
+    def __init__(self, model, params, arrays):
+        '''
+
+        This constructor is responsible for defining class variables.
+
+        '''
+
+        self.model = str(model)
+        self.params = params
+        self.arrays = arrays
+        self.kernel = str(params['kernel'])
+        self.estimator = None
+
+        if 'classes_' in arrays:
+            self.classes_ = arrays['classes_']
+
+    def get_estimator(self):
+        '''
+
+        This method returns the equivalent sklearn model, reconstructed from
+        a writeable copy of the arrays, as required by libsvm.
+
+        '''
+
+        if self.estimator is not None:
+            return self.estimator
+
+        params = self.params
+        if self.model == 'SVC':
+            estimator = svm.SVC(
+                kernel=self.kernel,
+                degree=params['degree'],
+                gamma=params['gamma'],
+                coef0=params['coef0'],
+                C=params['C'],
+                probability=params['probability']
+            )
+        else:
+            estimator = svm.SVR(
+                kernel=self.kernel,
+                degree=params['degree'],
+                gamma=params['gamma'],
+                coef0=params['coef0'],
+                C=params['C'],
+                epsilon=params['epsilon']
+            )
+
+        for name, array in self.arrays.items():
+            setattr(estimator, name, numpy.array(array))
+
+        estimator._gamma = params['_gamma']
+        estimator._sparse = False
+        estimator.shape_fit_ = tuple(params['shape_fit_'])
+        estimator.fit_status_ = params['fit_status_']
+
+        # public attributes: binary classifiers flip the libsvm sign
+        estimator.dual_coef_ = estimator._dual_coef_.copy()
+        estimator.intercept_ = estimator._intercept_.copy()
+        if self.model == 'SVC' and len(estimator.classes_) == 2:
+            estimator.dual_coef_ *= -1
+            estimator.intercept_ *= -1
+
+        self.estimator = estimator
+        return estimator
+
+    def predict(self, X):
+        '''
+
+        This method returns the prediction, for each supplied observation.
+
+        '''
+
+        return self.get_estimator().predict(X)
+
+    def predict_proba(self, X):
+        '''
+
+        This method returns the probability of each class, for each supplied
+        observation.
+
+        '''
+
+        return self.get_estimator().predict_proba(X)
+
+    def decision_function(self, X):
+        '''
+
+        This method returns the decision function, for each supplied
+        observation.
+
+        '''
+
+        return self.get_estimator().decision_function(X)
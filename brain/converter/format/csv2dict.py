@@ -8,7 +8,8 @@ python dictionary format.
 '''
 
 import csv
-from itertools import islice
+import numpy
+from itertools import chain, islice
 from brain.validator.dataset import Validator
 
 
@@ -30,6 +31,8 @@ def csv2dict(raw_data):
 
           row = row[0].split(',')
 
+    Note: every feature value is validated at once (see 'get_valid_rows').
+
     '''
 
     # local variables:
@@ -48,16 +51,19 @@ def csv2dict(raw_data):
         indep_labels_list = row[0].split(',')[1:]
 
     # all rows of csvfile: except first row
-    for dep_index, row in enumerate(islice(dataset_reader, 0, None)):
-        row_arr = row[0].split(',')
+    rows = [row[0].split(',') for row in dataset_reader]
+    valid = get_valid_rows(validate, [row[1:] for row in rows])
+
+    # merge lists into dict if each independent variable validates
+    for row_arr, is_valid in zip(rows, valid):
         features_list = row_arr[1:]
 
-        # merge lists into dict if each independent variable validates
-        if all(validate.validate_value(item) for item in features_list):
+        if is_valid:
             features_dict = {k: v for k, v in zip(indep_labels_list, features_list)}
             error = None
         else:
-            error = 'csv conversion failed: ' + validate.get_error()
+            features_dict = {}
+            error = 'csv conversion failed: invalid float value(s)'
 
         observation = {
             'dependent-variable': row_arr[:1][0],
@@ -70,3 +76,160 @@ def csv2dict(raw_data):
     # close file, return dataset
     raw_data.close()
     return dataset
+
+
+def csv2chunks(raw_data, chunk_size, regression=False, max_errors=10):
+    '''
+
+    This method converts the supplied csv file-object, into successive lists
+    of observations, each containing at most 'chunk_size' observations. Only a
+    single chunk is held in memory at any time, regardless of the file size.
+
+    @raw_data, a file containing the raw dataset. The file is closed, once
+        every chunk has been consumed.
+
+    @chunk_size, the maximum number of observations (rows) per chunk.
+
+    @regression, coerces the dependent variable to a float, as required by
+        regression model types (i.e. svr).
+
+    @max_errors, the maximum number of validation errors reported per chunk.
+
+    Note: each chunk is validated, and coerced, one column at a time. Only a
+          chunk which fails coercion is revisited cell by cell, in order to
+          locate the offending values.
+
+    Note: a dictionary is yielded for each chunk:
+
+          {'dataset': [...], 'error': None}
+
+          When 'error' is a list of messages, 'dataset' is None, and no
+          further chunks are yielded.
+
+    '''
+
+    try:
+        dataset_reader = csv.reader(raw_data)
+
+        # first row of csvfile: get all columns, except first
+        header = next(dataset_reader, None)
+        if not header or len(header) < 2:
+            yield {'dataset': None, 'error': ['csv conversion failed: no header']}
+            return
+
+        indep_labels_list = header[1:]
+        width = len(header)
+        row_offset = 2
+
+        while True:
+            rows = list(islice(dataset_reader, chunk_size))
+            if not rows:
+                break
+
+            # validate row width, before building the chunk matrix
+            errors = [
+                'csv conversion failed: expected {0} columns @ row {1}'.format(
+                    width,
+                    row_offset + index
+                )
+                for index, row in enumerate(rows) if len(row) != width
+            ]
+
+            if errors:
+                yield {'dataset': None, 'error': errors[:max_errors]}
+                return
+
+            matrix = numpy.array(rows)
+            labels = matrix[:, 0]
+            features = matrix[:, 1:]
+
+            # coerce columns: locate offending cells, only on failure
+            try:
+                features = features.astype(numpy.float64)
+                if regression:
+                    labels = labels.astype(numpy.float64)
+
+            except ValueError:
+                errors = locate_errors(
+                    matrix,
+                    header,
+                    row_offset,
+                    regression,
+                    max_errors
+                )
+                yield {'dataset': None, 'error': errors}
+                return
+
+            yield {
+                'dataset': [
+                    {
+                        'dependent-variable': label,
+                        'independent-variables': [
+                            dict(zip(indep_labels_list, values))
+                        ],
+                        'error': None
+                    }
+                    for label, values in zip(labels.tolist(), features.tolist())
+                ],
+                'error': None
+            }
+
+            row_offset += len(rows)
+
+    finally:
+        raw_data.close()
+
+
+def locate_errors(matrix, header, row_offset, regression, max_errors):
+    '''
+
+    This method returns the location of each value, within the supplied chunk
+    matrix, which cannot be coerced to a float.
+
+    '''
+
+    errors = []
+    columns = range(0 if regression else 1, len(header))
+
+    for column in columns:
+        try:
+            matrix[:, column].astype(numpy.float64)
+            continue
+        except ValueError:
+            pass
+
+        for index, value in enumerate(matrix[:, column].tolist()):
+            try:
+                float(value)
+            except ValueError:
+                errors.append(
+                    'csv conversion failed: invalid float \'{0}\' @ row {1}, '
+                    'column \'{2}\''.format(value, row_offset + index, header[column])
+                )
+
+                if len(errors) >= max_errors:
+                    return errors
+
+    return errors
+
+
+def get_valid_rows(validate, rows):
+    '''
+
+    This method returns a boolean array, indicating whether every value of
+    each supplied row, can be converted to a float. The values of every row
+    are validated at once.
+
+    '''
+
+    lengths = numpy.array([len(row) for row in rows], dtype=numpy.intp)
+    mask = validate.validate_values(list(chain.from_iterable(rows)))
+
+    # rows without values are valid: count the invalid values of each row
+    invalid = numpy.bincount(
+        numpy.repeat(numpy.arange(len(rows)), lengths),
+        weights=~mask,
+        minlength=len(rows)
+    )
+
+    return invalid == 0
@@ -7,7 +7,8 @@ python dictionary format.
 
 '''
 
-import xmltodict
+from itertools import chain, islice
+from xml.etree.cElementTree import iterparse, ParseError
 from brain.validator.dataset import Validator
 
 
@@ -20,27 +21,49 @@ def xml2dict(raw_data):
         to be used when computing a corresponding model. If this argument is a
         file, it needs to be closed.
 
+    Note: the xml file is parsed incrementally (see 'get_observations'), so
+          only the resulting dataset is held in memory.
+
+    Note: a dictionary is returned, consistent with each 'xml2chunks' chunk:
+
+          {'dataset': [...], 'error': None}
+
+          When the xml is malformed, 'dataset' is None, and 'error' is a list
+          containing the conversion error.
+
     '''
 
     # local variables
     dataset = []
     validate = Validator()
 
-    # local variable: open temporary 'xmltodict' object
-    dataset_reader = xmltodict.parse(raw_data)
-
-    # build dataset
-    for observation in dataset_reader['dataset']['observation']:
+    try:
+        observations = list(get_observations(raw_data))
+    except ParseError, error:
+        return {
+            'dataset': None,
+            'error': ['xml conversion failed: {0}'.format(error)]
+        }
+    finally:
+        raw_data.close()
+
+    # validate every feature value at once
+    valid = iter(validate.validate_values([
+        value for label, value in chain.from_iterable(
+            features for dependent_variable, features in observations
+        )
+    ]))
+
+    # build dataset: define features set if independent variable validates
+    for dependent_variable, features in observations:
         features_dict = {}
-        dependent_variable = observation['dependent-variable']
+        error = None
 
-        # define features set if independent variable validates
-        for feature in observation['independent-variable']:
-            if validate.validate_value(feature['value']):
-                features_dict[feature['label']] = feature['value']
-                error = None
+        for label, value in features:
+            if next(valid):
+                features_dict[label] = value
             else:
-                error = 'xml conversion failed: ' + validate.get_error()
+                error = 'xml conversion failed: invalid float value(s)'
 
         adjusted = {
             'dependent-variable': dependent_variable,
@@ -50,6 +73,151 @@ def xml2dict(raw_data):
 
         dataset.append(adjusted)
 
-    # save observation labels, and return
-    raw_data.close()
-    return dataset
+    return {'dataset': dataset, 'error': None}
+
+
+def xml2chunks(raw_data, chunk_size, regression=False, max_errors=10):
+    '''
+
+    This method converts the supplied xml file-object, into successive lists
+    of observations, each containing at most 'chunk_size' observations. Only a
+    single chunk is held in memory at any time, regardless of the file size.
+
+    @raw_data, a file containing the raw dataset. The file is closed, once
+        every chunk has been consumed.
+
+    @chunk_size, the maximum number of observations per chunk.
+
+    @regression, coerces the dependent variable to a float, as required by
+        regression model types (i.e. svr).
+
+    @max_errors, the maximum number of validation errors reported per chunk.
+
+    Note: each chunk is coerced at once. Only a chunk which fails coercion is
+          revisited value by value, in order to locate the offending values.
+
+    Note: a dictionary is yielded for each chunk, identical to 'csv2chunks':
+
+          {'dataset': [...], 'error': None}
+
+          When 'error' is a list of messages, 'dataset' is None, and no
+          further chunks are yielded.
+
+    '''
+
+    try:
+        observations = get_observations(raw_data)
+        offset = 1
+
+        while True:
+            try:
+                chunk = list(islice(observations, chunk_size))
+            except ParseError, error:
+                yield {
+                    'dataset': None,
+                    'error': ['xml conversion failed: {0}'.format(error)]
+                }
+                return
+
+            if not chunk:
+                break
+
+            # coerce chunk: locate offending values, only on failure
+            try:
+                dataset = [
+                    {
+                        'dependent-variable': (
+                            float(dependent_variable) if regression
+                            else dependent_variable
+                        ),
+                        'independent-variables': [
+                            {label: float(value) for label, value in features}
+                        ],
+                        'error': None
+                    }
+                    for dependent_variable, features in chunk
+                ]
+
+            except (TypeError, ValueError):
+                errors = locate_errors(chunk, offset, regression, max_errors)
+                yield {'dataset': None, 'error': errors}
+                return
+
+            yield {'dataset': dataset, 'error': None}
+
+            offset += len(chunk)
+
+    finally:
+        raw_data.close()
+
+
+def get_observations(raw_data):
+    '''
+
+    This method parses the supplied xml file-object incrementally, and yields
+    each 'observation' element, as a tuple:
+
+        (dependent variable, [(label, value), ...])
+
+    Note: each 'observation' element is cleared once it has been parsed, and
+          removed from the root element, so the parsed tree does not grow
+          with the file size.
+
+    '''
+
+    context = iterparse(raw_data, events=('start', 'end'))
+    event, root = next(context)
+
+    for event, element in context:
+        if event != 'end' or element.tag != 'observation':
+            continue
+
+        features = [
+            (get_text(feature, 'label'), get_text(feature, 'value'))
+            for feature in element.iterfind('independent-variable')
+        ]
+
+        yield (get_text(element, 'dependent-variable'), features)
+
+        element.clear()
+        root.clear()
+
+
+def get_text(element, path):
+    '''
+
+    This method returns the stripped text, of the supplied element's child,
+    or None, when the child is missing, or empty.
+
+    '''
+
+    text = element.findtext(path)
+    return text.strip() if text and text.strip() else None
+
+
+def locate_errors(chunk, offset, regression, max_errors):
+    '''
+
+    This method returns the location of each value, within the supplied chunk
+    of observations, which cannot be coerced to a float.
+
+    '''
+
+    errors = []
+
+    for index, (dependent_variable, features) in enumerate(chunk):
+        values = [('dependent-variable', dependent_variable)] if regression else []
+
+        for label, value in values + features:
+            try:
+                float(value)
+            except (TypeError, ValueError):
+                errors.append(
+                    'xml conversion failed: invalid float \'{0}\' @ observation '
+                    '{1}, label \'{2}\''.format(value, offset + index, label)
+                )
+
+                if len(errors) >= max_errors:
+                    return errors
+
+    return errors
@@ -8,6 +8,29 @@ This file serializes, and deserializes an SVM object
 
 from six.moves import cPickle as pickle
 from sklearn import svm, preprocessing
+from brain.converter import compact
+
+# model types, which can be serialized: extended by 'register'
+_acceptable = [
+    svm.classes.SVC,
+    svm.classes.SVR,
+    preprocessing.label.LabelEncoder
+]
+
+
+def register(model_type):
+    '''
+
+    This function permits the supplied model type to be serialized, so model
+    types defined outside this module (i.e. 'OnlineSV'), are not imported by
+    this module.
+
+    '''
+
+    if model_type not in _acceptable:
+        _acceptable.append(model_type)
+
+    return model_type
 
 
 class Model(object):
@@ -29,27 +52,36 @@ class Model(object):
         '''
 
         self.model = model
-        self.acceptable = [
-            svm.classes.SVC,
-            svm.classes.SVR,
-            preprocessing.label.LabelEncoder
-        ]
+        self.acceptable = _acceptable
 
-    def serialize(self):
+    def serialize(self, format='pickle', codec='none'):
         '''
 
         This method serializes the provide model.
 
+        @format, either 'pickle', or 'compact'. The latter stores the arrays
+            of a fitted svm, or svr model, as raw contiguous arrays (see
+            'brain/converter/compact.py'). Other models are always pickled.
+
+        @codec, compresses the compact format (i.e. none, zlib, lz4, zstd).
+
         '''
 
-        if type(self.model) in self.acceptable:
+        if format == 'compact' and compact.is_supported(self.model):
+            return compact.dumps(self.model, codec)
+
+        elif type(self.model) in self.acceptable:
             return pickle.dumps(self.model)
 
     def deserialize(self):
         '''
 
-        This method deserializes the provided object.
+        This method deserializes the provided object. The compact format is
+        identified by its leading 'MAGIC' bytes.
 
         '''
 
+        if self.model[:len(compact.MAGIC)] == compact.MAGIC:
+            return compact.loads(self.model)
+
         return pickle.loads(self.model)
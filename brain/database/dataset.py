@@ -7,9 +7,21 @@ using the mongodb framework.
 
 '''
 
+from flask import current_app
 from brain.database.query import NoSQL
 
 
+def get_columnar(collection):
+    '''
+
+    This function returns the name of the companion collection, which stores
+    the columnar representation of the supplied collection.
+
+    '''
+
+    return collection + '.columnar'
+
+
 class Collection(object):
     '''
 
@@ -32,12 +44,16 @@ class Collection(object):
         self.list_error = []
         self.nosql = NoSQL()
 
-    def query(self, collection, operation, payload=None):
+    def query(self, collection, operation, payload=None, options=None):
         '''
 
         This method executes a query, with respect to the desired 'operation'.
 
+        @options, optional keyword arguments of the 'aggregate', 'find',
+            'count_documents' (i.e. 'hint'), or 'create_index' operation.
+
         @operation, the type of operation:
+            - aggregate
             - insert_one
             - insert_many
             - update_one
@@ -47,17 +63,21 @@ class Collection(object):
             - delete_one
             - delete_many
             - count_documents
+            - create_index
             - drop_collection
 
+        Note: dropping a collection, also drops its columnar companion.
+
         '''
 
         # execute query
         if operation == 'drop_collection':
             self.nosql.connect()
             response = self.nosql.execute(operation, collection)
+            self.nosql.execute(operation, get_columnar(collection))
         else:
             self.nosql.connect(collection)
-            response = self.nosql.execute(operation, payload)
+            response = self.nosql.execute(operation, payload, options)
 
         # retrieve any error(s)
         response_error = self.nosql.get_errors()
@@ -71,3 +91,123 @@ class Collection(object):
             }
         else:
             return {'status': True, 'result': response['result'], 'error': None}
+
+    def stream(
+        self,
+        collection,
+        payload=None,
+        projection=None,
+        batch_size=None,
+        limit=None
+    ):
+        '''
+
+        This method yields the documents of the specified collection, as lists
+        of at most 'batch_size' documents, so a single batch is held in memory,
+        rather than every document.
+
+        @payload, either a 'find' filter, or an 'aggregate' pipeline (list).
+        @projection, fields returned of each document.
+        @batch_size, documents per batch, and per cursor batch, defaults to
+            'DATASET_BATCH_SIZE'.
+        @limit, maximum number of documents, applied by the database.
+
+        Note: error(s) of the query are stored within 'list_error', and no
+              batch is yielded.
+
+        '''
+
+        batch_size = batch_size or current_app.config.get('DATASET_BATCH_SIZE')
+
+        if isinstance(payload, list):
+            pipeline = list(payload)
+            if projection:
+                pipeline.append({'$project': projection})
+            if limit:
+                pipeline.append({'$limit': limit})
+
+            response = self.query(
+                collection,
+                'aggregate',
+                pipeline,
+                {'allowDiskUse': True, 'batchSize': batch_size}
+            )
+
+        else:
+            options = {'batch_size': batch_size}
+            if projection:
+                options['projection'] = projection
+            if limit:
+                options['limit'] = limit
+
+            response = self.query(collection, 'find', payload or {}, options)
+
+        if response['error']:
+            self.list_error.extend(response['error'])
+            return
+
+        batch = []
+        for document in response['result'] or []:
+            batch.append(document)
+
+            if len(batch) == batch_size:
+                yield batch
+                batch = []
+
+        if batch:
+            yield batch
+
+    def count_uploads(self, collection):
+        '''
+
+        This method counts the dataset upload(s), stored within the specified
+        collection. An upload stored as several chunk documents, is counted
+        once, using its first chunk.
+
+        Note: a missing 'properties.chunk' field, is matched by 'None'.
+
+        Note: the count uses the 'properties.chunk' index (see
+              'index_uploads'), which is created when missing, so collections
+              stored before the index was introduced, are also indexed. An
+              empty, or missing collection is counted from its metadata,
+              without creating the collection.
+
+        '''
+
+        response = self.query(collection, 'count_documents')
+        if response['error'] or not response['result']:
+            return response
+
+        response = self.index_uploads(collection)
+        if response['error']:
+            return response
+
+        return self.query(
+            collection,
+            'count_documents',
+            {'properties.chunk': {'$in': [None, 0]}},
+            {'hint': [('properties.chunk', 1)]}
+        )
+
+    def index_uploads(self, collection):
+        '''
+
+        This method creates the indexes of the specified collection, used to
+        count the uploads (see 'count_uploads'), and to select documents by
+        their 'sequence' (see 'incremental.py'). An existing index is not
+        recreated.
+
+        '''
+
+        for index in [[('properties.chunk', 1)], [('sequence', 1)]]:
+            response = self.query(
+                collection,
+                'create_index',
+                index,
+                {'background': True}
+            )
+
+            if response['error']:
+                break
+
+        return response
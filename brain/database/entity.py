@@ -8,6 +8,7 @@ This file retrieves dataset entity related properties.
 
 from flask import current_app
 from brain.database.query import SQL
+from brain.cache.metadata import Metadata
 
 
 class Entity(object):
@@ -81,6 +82,10 @@ class Entity(object):
         # retrieve any error(s)
         response_error = self.sql.get_errors()
 
+        # remove cached metadata
+        if self.premodel_data.get('collection'):
+            Metadata().invalidate(self.premodel_data['collection'])
+
         # return result
         if response_error:
             return {'status': False, 'error': response_error}
@@ -118,6 +123,55 @@ class Entity(object):
         else:
             return {'error': None, 'result': response['result']}
 
+    def get_metadata(self, collection):
+        '''
+
+        This method is responsible for retrieving the 'id_entity', the
+        'uid_created', and the 'model_type' of the supplied collection. The
+        sql database is only queried, when the metadata is not cached.
+
+        @sql_statement, is a sql format string, and not a python string.
+            Therefore, '%s' is used for argument substitution.
+
+        '''
+
+        # cached metadata
+        metadata = Metadata()
+        cached = metadata.get(collection)
+        if cached:
+            return {'error': None, 'result': cached}
+
+        # select entity
+        self.sql.connect(self.db_ml)
+        sql_statement = 'SELECT mid.id_entity, mid.uid_created, mtype.model'\
+            ' FROM tbl_dataset_entity mid'\
+            ' INNER JOIN tbl_model_type mtype'\
+            ' ON mid.model_type = mtype.id_model'\
+            ' WHERE mid.collection=%s'
+        args = (collection)
+        response = self.sql.execute('select', sql_statement, args)
+
+        # retrieve any error(s)
+        response_error = self.sql.get_errors()
+
+        # return result
+        if response_error:
+            return {'error': response_error, 'result': None}
+
+        elif not response['result']:
+            return {'error': 'no entity found for collection', 'result': None}
+
+        else:
+            row = response['result'][0]
+            result = {
+                'id_entity': int(row[0]),
+                'uid_created': int(row[1]),
+                'model_type': row[2]
+            }
+
+            metadata.set(collection, result)
+            return {'error': None, 'result': result}
+
     def get_collections(self, uid):
         '''
 
@@ -200,6 +254,9 @@ class Entity(object):
         # retrieve any error(s)
         response_error = self.sql.get_errors()
 
+        # remove cached metadata
+        Metadata().invalidate(collection)
+
         # return result
         if response_error:
             return {'error': response_error, 'result': None}
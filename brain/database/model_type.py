@@ -8,6 +8,7 @@ This file retrieves model type, when provided the corresponding collection.
 
 from flask import current_app
 from brain.database.query import SQL
+from brain.database.entity import Entity
 
 
 class ModelType(object):
@@ -37,26 +38,15 @@ class ModelType(object):
         @collection, this supplied argument corresponding to the 'collection'
             column from the 'tbl_dataset_entity' database table.
 
-        @sql_statement, is a sql format string, and not a python string.
-            Therefore, '%s' is used for argument substitution.
+        Note: the model type is retrieved, along with the remaining metadata
+              of the collection, which is cached (see 'Entity.get_metadata').
 
         '''
 
-        # select dataset
-        self.sql.connect(self.db_ml)
-        sql_statement = 'SELECT mtype.model'\
-            ' FROM tbl_dataset_entity mid'\
-            ' INNER JOIN tbl_model_type mtype'\
-            ' ON mid.model_type = mtype.id_model'\
-            ' WHERE mid.collection=%s'
-        args = (collection)
-        response = self.sql.execute('select', sql_statement, args)
-
-        # retrieve any error(s)
-        response_error = self.sql.get_errors()
+        response = Entity().get_metadata(collection)
 
         # return result
-        if response_error:
-            return {'error': response_error, 'result': None}
+        if response['error']:
+            return {'error': response['error'], 'result': None}
         else:
-            return {'error': None, 'result': response['result'][0][0]}
+            return {'error': None, 'result': response['result']['model_type']}
@@ -0,0 +1,386 @@
+#!/usr/bin/python
+
+'''
+
+This file maintains a process-wide registry of mariadb connection pools,
+shared by each sql client (i.e. 'SQL'), along with the mongodb client, shared
+by each nosql client (i.e. 'NoSQL'), across requests.
+
+'''
+
+import os
+import time
+import threading
+import MySQLdb as MariaClient
+from pymongo import MongoClient
+
+# pool settings: defined within 'factory.create_app'
+_settings = {
+    'max_connections': 20,
+    'timeout': 5,
+    'max_idle': 300,
+    'ping_interval': 30
+}
+
+# registry of pools, keyed by (host, user, database)
+_pools = {}
+_pools_lock = threading.Lock()
+
+# mongodb client settings: defined within 'factory.create_app'
+_mongodb_settings = {
+    'max_pool_size': 50,
+    'connect_timeout': 10,
+    'socket_timeout': 0,
+    'server_selection_timeout': 10,
+    'wait_queue_timeout': 10,
+    'read_preference': 'primary'
+}
+
+# mongodb client, of the current process
+_mongodb = {'client': None, 'uri': None, 'pid': None}
+
+
+class PoolTimeout(MariaClient.OperationalError):
+    '''
+
+    This class is raised, when no connection is returned to an exhausted
+    pool, within the configured 'timeout'.
+
+    '''
+
+    pass
+
+
+class ConnectionPool(object):
+    '''
+
+    This class provides a bounded, thread-safe pool of mariadb connections,
+    which are checked out, then returned ('release') when the corresponding
+    app context tears down.
+
+    Note: when all 'max_connections' are checked out, a checkout waits up to
+          'timeout' seconds for a connection to be returned, rather than
+          opening an unbounded number of connections.
+
+    Note: a connection idle longer than 'ping_interval' seconds is verified
+          (PING) on its next checkout, while a connection idle longer than
+          'max_idle' seconds is closed, rather than reused.
+
+    Note: this class explicitly inherits the 'new-style' class.
+
+    '''
+
+    def __init__(self, host, user, passwd, database=None):
+        '''
+
+        This constructor is responsible for defining class variables.
+
+        '''
+
+        self.host = host
+        self.user = user
+        self.passwd = passwd
+        self.database = database
+        self.max_connections = _settings['max_connections']
+        self.timeout = _settings['timeout']
+        self.max_idle = _settings['max_idle']
+        self.ping_interval = _settings['ping_interval']
+
+        self.condition = threading.Condition(threading.Lock())
+        self.reset()
+
+    def reset(self):
+        '''
+
+        This method discards every connection, along with the counters.
+
+        Note: connections inherited from a parent process (i.e. pre-forking
+              webserver) are discarded without being closed, since closing
+              would also end the session of the parent process.
+
+        '''
+
+        self.pid = os.getpid()
+        self.idle = []
+        self.created = 0
+        self.checkouts = 0
+        self.failures = 0
+        self.evictions = 0
+
+    def checkout(self):
+        '''
+
+        This method returns an idle connection, or a new connection, when
+        fewer than 'max_connections' are open.
+
+        '''
+
+        deadline = time.time() + self.timeout
+
+        with self.condition:
+            if self.pid != os.getpid():
+                self.reset()
+
+            while True:
+                # reuse: most recently returned connection
+                while self.idle:
+                    conn, returned = self.idle.pop()
+                    idle = time.time() - returned
+
+                    if idle > self.max_idle or (
+                        idle > self.ping_interval and not self.ping(conn)
+                    ):
+                        self.discard(conn)
+                        continue
+
+                    self.checkouts += 1
+                    return conn
+
+                if self.created < self.max_connections:
+                    self.created += 1
+                    break
+
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    self.failures += 1
+                    raise PoolTimeout(
+                        'no mariadb connection available, within %s seconds' %
+                        self.timeout
+                    )
+
+                self.condition.wait(remaining)
+
+        # connect: outside the lock, so other checkouts are not delayed
+        try:
+            if self.database is None:
+                conn = MariaClient.connect(self.host, self.user, self.passwd)
+            else:
+                conn = MariaClient.connect(
+                    self.host,
+                    self.user,
+                    self.passwd,
+                    self.database
+                )
+
+        except MariaClient.Error:
+            with self.condition:
+                self.created -= 1
+                self.failures += 1
+                self.condition.notify()
+            raise
+
+        with self.condition:
+            self.checkouts += 1
+
+        return conn
+
+    def release(self, conn):
+        '''
+
+        This method returns the supplied connection to the pool, discarding
+        any uncommitted change(s).
+
+        '''
+
+        try:
+            conn.rollback()
+            healthy = True
+
+        except MariaClient.Error:
+            healthy = False
+
+        with self.condition:
+            if self.pid != os.getpid():
+                return
+
+            if healthy:
+                self.idle.append((conn, time.time()))
+            else:
+                self.discard(conn)
+
+            self.condition.notify()
+
+    def ping(self, conn):
+        '''
+
+        This method returns whether the supplied connection is alive.
+
+        '''
+
+        try:
+            conn.ping()
+            return True
+
+        except MariaClient.Error:
+            return False
+
+    def discard(self, conn):
+        '''
+
+        This method closes the supplied connection, and frees its slot.
+
+        Note: the pool lock is held by the caller.
+
+        '''
+
+        try:
+            conn.close()
+        except MariaClient.Error:
+            pass
+
+        self.created -= 1
+        self.evictions += 1
+
+    def get_metrics(self):
+        '''
+
+        This method returns the current usage of the pool.
+
+        '''
+
+        with self.condition:
+            idle = len(self.idle)
+
+            return {
+                'max_connections': self.max_connections,
+                'created': self.created,
+                'in_use': self.created - idle,
+                'idle': idle,
+                'checkouts': self.checkouts,
+                'failures': self.failures,
+                'evictions': self.evictions
+            }
+
+
+def configure(max_connections, timeout, max_idle, ping_interval):
+    '''
+
+    This function defines the settings of subsequently created pools.
+
+    @max_connections, maximum connections held by each pool.
+    @timeout, seconds a checkout waits, when every connection is in use.
+    @max_idle, seconds a connection can remain idle, before it is closed.
+    @ping_interval, seconds a connection can remain idle, before it is
+        verified (PING) on its next checkout.
+
+    '''
+
+    with _pools_lock:
+        _settings['max_connections'] = max_connections
+        _settings['timeout'] = timeout
+        _settings['max_idle'] = max_idle
+        _settings['ping_interval'] = ping_interval
+
+
+def get_pool(host, user, passwd, database=None):
+    '''
+
+    This function returns the connection pool, for the supplied mariadb
+    server, user, and database, creating it on first use.
+
+    '''
+
+    key = (host, user, database)
+
+    with _pools_lock:
+        if key not in _pools:
+            _pools[key] = ConnectionPool(host, user, passwd, database)
+
+        return _pools[key]
+
+
+def get_metrics():
+    '''
+
+    This function returns the usage of every pool, keyed by
+    'user@host/database'.
+
+    '''
+
+    with _pools_lock:
+        pools = dict(_pools)
+
+    return {
+        '%s@%s/%s' % (key[1], key[0], key[2] or ''): pool.get_metrics()
+        for key, pool in pools.items()
+    }
+
+
+def configure_mongodb(
+    max_pool_size,
+    connect_timeout,
+    socket_timeout,
+    server_selection_timeout,
+    wait_queue_timeout,
+    read_preference
+):
+    '''
+
+    This function defines the settings of the subsequently created mongodb
+    client.
+
+    @max_pool_size, maximum sockets held by the client, for each server.
+    @connect_timeout, seconds to establish a socket (0 waits indefinitely).
+    @socket_timeout, seconds to wait for a response, of a sent operation (0
+        waits indefinitely).
+    @server_selection_timeout, seconds to find an available server (unlike
+        the above timeouts, 0 does not wait at all).
+    @wait_queue_timeout, seconds an operation waits for a socket, when every
+        socket is in use (0 waits indefinitely).
+    @read_preference, mode used to select the server of each read (i.e.
+        'primary', 'primaryPreferred', 'secondary', 'secondaryPreferred',
+        'nearest').
+
+    '''
+
+    with _pools_lock:
+        _mongodb_settings['max_pool_size'] = max_pool_size
+        _mongodb_settings['connect_timeout'] = connect_timeout
+        _mongodb_settings['socket_timeout'] = socket_timeout
+        _mongodb_settings['server_selection_timeout'] = server_selection_timeout
+        _mongodb_settings['wait_queue_timeout'] = wait_queue_timeout
+        _mongodb_settings['read_preference'] = read_preference
+        _mongodb['client'] = None
+
+
+def get_mongodb(uri):
+    '''
+
+    This function returns the mongodb client, of the current process, for the
+    supplied connection uri, creating it on first use.
+
+    Note: the client does not connect until its first operation, so a client
+          is never shared with a child process (i.e. pre-forking webserver).
+          A client inherited from a parent process is replaced, without being
+          closed, since its sockets are shared with the parent process.
+
+    '''
+
+    # connect, socket, and wait queue timeouts: 0 waits indefinitely (None)
+    def get_ms(seconds):
+        return int(seconds * 1000) if seconds else None
+
+    with _pools_lock:
+        if (
+            _mongodb['client'] is None or
+            _mongodb['pid'] != os.getpid() or
+            _mongodb['uri'] != uri
+        ):
+            _mongodb['client'] = MongoClient(
+                uri,
+                connect=False,
+                maxPoolSize=_mongodb_settings['max_pool_size'],
+                connectTimeoutMS=get_ms(_mongodb_settings['connect_timeout']),
+                socketTimeoutMS=get_ms(_mongodb_settings['socket_timeout']),
+                serverSelectionTimeoutMS=int(
+                    _mongodb_settings['server_selection_timeout'] * 1000
+                ),
+                waitQueueTimeoutMS=get_ms(
+                    _mongodb_settings['wait_queue_timeout']
+                ),
+                readPreference=_mongodb_settings['read_preference']
+            )
+            _mongodb['uri'] = uri
+            _mongodb['pid'] = os.getpid()
+
+        return _mongodb['client']
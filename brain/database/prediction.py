@@ -8,6 +8,46 @@ This file saves, as well as retrieves, previous stored predictions.
 
 from flask import current_app, session
 from brain.database.query import SQL
+from brain.validator.prediction import Validator
+
+
+# values of each prediction: each branch is constrained by 'id_result', so the
+#     corresponding rows are read, rather than each table.
+VALUES = ' UNION ALL '.join([
+    'SELECT id_result, \'%s\' AS param, CAST(%s AS CHAR) AS value, '
+    '%s AS id_value FROM %s WHERE id_result=%%s' % (param, param, key, table)
+    for param, key, table in [
+        ('class', 'id_class', 'tbl_svm_results_class'),
+        ('decision_function', 'id_decision_function',
+            'tbl_svm_results_decision_function'),
+        ('probability', 'id_probability', 'tbl_svm_results_probability'),
+        ('r2', 'id_r2', 'tbl_svr_results_r2')
+    ]
+])
+
+
+def get_values(rows):
+    '''
+
+    This function groups the supplied (id_result, model_type, result, param,
+    value) rows, ordered by 'id_result', into a prediction per 'id_result',
+    where each param is a list of single value rows.
+
+    '''
+
+    predictions = []
+    for id_result, model_type, result, param, value in rows:
+        if not predictions or predictions[-1]['id_result'] != id_result:
+            predictions.append({
+                'id_result': id_result,
+                'model_type': model_type,
+                'result': [(result,)]
+            })
+
+        if param:
+            predictions[-1].setdefault(param, []).append((value,))
+
+    return predictions
 
 
 class Prediction(object):
@@ -42,68 +82,112 @@ class Prediction(object):
 
         This method stores the corresponding prediction.
 
+        Note: the prediction is stored, as a single transaction (see
+              'save_many').
+
+        '''
+
+        return self.save_many([{
+            'data': data,
+            'model_type': model_type,
+            'title': title
+        }])
+
+    def save_many(self, predictions):
+        '''
+
+        This method stores each of the supplied predictions, within a single
+        transaction. Either every prediction is stored, or none are stored.
+
+        @predictions, a list of dicts, each containing the 'data', 'model_type',
+            and 'title' of a prediction.
+
         @sql_statement, is a sql format string, and not a python string.
             Therefore, '%s' is used for argument substitution.
 
         Note: 'UTC_TIMESTAMP' returns the universal UTC datetime
 
+        Note: the child rows of every prediction, are inserted using a single
+              'executemany' statement per table, rather than a statement per
+              row.
+
+        Note: every prediction is validated, before any row is inserted.
+
         '''
 
         # local variables
-        result = data['result']
+        children = {
+            'class': [],
+            'probability': [],
+            'decision_function': [],
+            'r2': []
+        }
+
+        # validate predictions
+        validate = Validator()
+
+        for prediction in predictions:
+            validate.validate_prediction(prediction, self.model_list)
+
+        self.list_error.extend(validate.get_errors())
+        if self.list_error:
+            return {'error': self.list_error, 'result': 1}
 
-        # insert prediction
+        # insert predictions: not committed, until every row is inserted
         self.sql.connect(self.db_ml)
 
-        if model_type == 'svm':
-            classes = data['classes']
-            probability = data['probability']
-            decision_function = data['decision_function']
+        for prediction in predictions:
+            data = prediction['data']
+            model_type = prediction['model_type']
 
-            # svm results
             sql_statement = 'INSERT INTO tbl_prediction_results '\
                 '(model_type, title, result, uid_created, datetime_created) '\
                 'VALUES(%s, %s, %s, %s, UTC_TIMESTAMP())'
-            args = (self.model_list.index(model_type) + 1, title, result, self.uid)
-            svm_results = self.sql.execute('insert', sql_statement, args)
-
-            # svm classes
-            for x in classes:
-                sql_statement = 'INSERT INTO tbl_svm_results_class '\
-                    '(id_result, class) VALUES(%s, %s)'
-                args = (svm_results['id'], x)
-                self.sql.execute('insert', sql_statement, args)
-
-            # svm probability
-            for x in probability:
-                sql_statement = 'INSERT INTO tbl_svm_results_probability '\
-                    '(id_result, probability) VALUES(%s, %s)'
-                args = (svm_results['id'], x)
-                self.sql.execute('insert', sql_statement, args,)
-
-            # svm decision function
-            for x in decision_function:
-                sql_statement = 'INSERT INTO tbl_svm_results_decision_function '\
-                    '(id_result, decision_function) VALUES(%s, %s)'
-                args = (svm_results['id'], x,)
-                self.sql.execute('insert', sql_statement, args,)
-
-        elif model_type == 'svr':
-            # svr results
-            sql_statement = 'INSERT INTO tbl_prediction_results '\
-                '(model_type, title, result, uid_created, datetime_created) '\
-                'VALUES(%s, %s, %s, %s, UTC_TIMESTAMP())'
-            args = (self.model_list.index(model_type) + 1, title, result, self.uid)
-            svr_results = self.sql.execute('insert', sql_statement, args,)
+            args = (
+                self.model_list.index(model_type) + 1,
+                prediction['title'],
+                data['result'],
+                self.uid
+            )
+            response = self.sql.execute('insert', sql_statement, args, False)
+            if not response or not response['status']:
+                break
+
+            # svm classes, probability, and decision function
+            if model_type == 'svm':
+                for param in ['class', 'probability', 'decision_function']:
+                    key = 'classes' if param == 'class' else param
+                    children[param].extend(
+                        [(response['id'], x) for x in data.get(key) or []]
+                    )
 
             # svr r2
-            sql_statement = 'INSERT INTO tbl_svr_results_r2 '\
-                '(id_result, r2) VALUES(%s, %s)'
-            args = (svr_results['id'], data['r2'])
-            self.sql.execute('insert', sql_statement, args,)
+            elif model_type == 'svr':
+                children['r2'].append((response['id'], data['r2']))
+
+        # insert child rows
+        for param, table in [
+            ('class', 'tbl_svm_results_class'),
+            ('probability', 'tbl_svm_results_probability'),
+            ('decision_function', 'tbl_svm_results_decision_function'),
+            ('r2', 'tbl_svr_results_r2')
+        ]:
+            if self.list_error or self.sql.get_errors():
+                break
+
+            if children[param]:
+                sql_statement = 'INSERT INTO %s (id_result, %s) '\
+                    'VALUES(%%s, %%s)' % (table, param)
+                self.sql.execute_many(sql_statement, children[param])
+
+        # commit, or discard every prediction
+        if self.list_error or self.sql.get_errors():
+            self.sql.rollback()
+        else:
+            self.sql.commit()
 
         # retrieve any error(s)
-        response_error = self.sql.get_errors()
+        response_error = self.list_error + self.sql.get_errors()
 
         # return result
         if response_error:
@@ -111,6 +195,161 @@ class Prediction(object):
         else:
             return {'error': None, 'result': 0}
 
+    def get_prediction(self, id_result):
+        '''
+
+        This method retrieves the 'model_type', 'result', and each value of a
+        prediction, based on the supplied id_result, using a single query.
+
+        @sql_statement, is a sql format string, and not a python string.
+            Therefore, '%s' is used for argument substitution.
+
+        Note: the returned values are grouped by parameter (see 'get_values'),
+              where each value is a row, consistent with 'get_value'.
+
+        '''
+
+        # select prediction, and each value
+        self.sql.connect(self.db_ml)
+
+        sql_statement = 'SELECT r.id_result, m.model, r.result, v.param, '\
+            'v.value FROM tbl_prediction_results r '\
+            'INNER JOIN tbl_model_type m ON m.id_model=r.model_type '\
+            'LEFT JOIN (' + VALUES + ') v ON v.id_result=r.id_result '\
+            'WHERE r.id_result=%s '\
+            'ORDER BY v.param, v.id_value'
+        args = (id_result, id_result, id_result, id_result, id_result)
+        response = self.sql.execute('select', sql_statement, args)
+
+        # retrieve any error(s)
+        response_error = self.sql.get_errors()
+
+        # return result
+        if response_error:
+            return {
+                'status': False,
+                'error': response_error,
+                'result': None
+            }
+
+        predictions = get_values(response['result'])
+        return {
+            'status': True,
+            'error': None,
+            'result': predictions[0] if predictions else None,
+        }
+
+    def get_predictions(self, model_type=None, limit=None, after=None):
+        '''
+
+        This method retrieves a page of stored predictions for the current
+        user, including each value, using two queries, rather than a query
+        per prediction.
+
+        @model_type, constrains the 'select' result to a specified model type.
+            Otherwise, defaults to return results for all model types.
+
+        @limit, maximum number of predictions, bounded by the configured
+            'PREDICTION_EXPORT_LIMIT'. Both 'limit', and 'after' are validated
+            as integers (see 'validate_export').
+
+        @after, the 'id_result' of the last prediction of the previous page,
+            so successive pages are selected from the primary key index,
+            rather than skipping an increasing number of rows.
+
+        @sql_statement, is a sql format string, and not a python string.
+            Therefore, '%s' is used for argument substitution.
+
+        Note: the returned 'next' value is supplied as 'after', to retrieve the
+              following page, and is None on the last page.
+
+        '''
+
+        # validate page arguments
+        error = Validator().validate_export(limit, after)
+        if error:
+            return {
+                'status': False,
+                'error': error,
+                'result': None,
+                'next': None
+            }
+
+        # local variables
+        max_limit = current_app.config.get('PREDICTION_EXPORT_LIMIT')
+        limit = min(int(limit), max_limit) if limit is not None else max_limit
+        after = int(after) if after is not None else 0
+
+        # select page of predictions: one additional row, indicates a next page
+        self.sql.connect(self.db_ml)
+
+        sql_statement = 'SELECT r.id_result, m.model, r.title, r.result, '\
+            'r.datetime_created FROM tbl_prediction_results r '\
+            'INNER JOIN tbl_model_type m ON m.id_model=r.model_type '\
+            'WHERE r.uid_created=%s AND r.id_result>%s'
+        args = [self.uid, after]
+
+        if model_type in self.model_list:
+            sql_statement += ' AND r.model_type=%s'
+            args.append(self.model_list.index(model_type) + 1)
+
+        sql_statement += ' ORDER BY r.id_result LIMIT %s'
+        args.append(limit + 1)
+        response = self.sql.execute('select', sql_statement, tuple(args))
+
+        found = response['result'] if response and response['result'] else []
+        rows = found[:limit]
+        predictions = []
+
+        # select values of every prediction, within the page
+        if rows:
+            ids = [row[0] for row in rows]
+            placeholders = ', '.join(['%s'] * len(ids))
+            branches = VALUES.replace(
+                'WHERE id_result=%s',
+                'WHERE id_result IN (' + placeholders + ')'
+            )
+
+            sql_statement = 'SELECT v.id_result, NULL, NULL, v.param, '\
+                'v.value FROM (' + branches + ') v '\
+                'ORDER BY v.id_result, v.param, v.id_value'
+            values = self.sql.execute('select', sql_statement, tuple(ids * 4))
+
+            if values and values['status']:
+                grouped = dict(
+                    (x['id_result'], x) for x in get_values(values['result'])
+                )
+
+                for id_result, model, title, result, created in rows:
+                    prediction = grouped.get(id_result, {})
+                    prediction.update({
+                        'id_result': id_result,
+                        'model_type': model,
+                        'title': title,
+                        'result': [(result,)],
+                        'datetime_created': created
+                    })
+                    predictions.append(prediction)
+
+        # retrieve any error(s)
+        response_error = self.sql.get_errors()
+
+        # return result
+        if response_error:
+            return {
+                'status': False,
+                'error': response_error,
+                'result': None,
+                'next': None
+            }
+        else:
+            return {
+                'status': True,
+                'error': None,
+                'result': predictions,
+                'next': rows[-1][0] if len(found) > limit else None
+            }
+
     def get_all_titles(self, model_type=None):
         '''
 
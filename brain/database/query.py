@@ -8,15 +8,20 @@ This file contains various SQL, and NoSql related methods.
 
 from flask import g
 import MySQLdb as MariaClient
-from pymongo import MongoClient, errors
+from pymongo import errors
 from brain.database.settings import Database
+from brain.database.pool import get_pool, get_mongodb as get_client
 
 
 def get_mariadb(host, user, passwd, database):
     '''
 
-    This function opens a new mariadb database connection, if there is none yet
-    for the current application context.
+    This function checks out a mariadb database connection, from the process
+    wide connection pool, if there is none yet for the current application
+    context, and the supplied database.
+
+    Note: each checked out connection is returned to its pool, when the
+          application context tears down (see 'release_mariadb').
 
     Note: the following resources can be further reviewed:
 
@@ -26,44 +31,48 @@ def get_mariadb(host, user, passwd, database):
     '''
 
     if not hasattr(g, 'mariadb'):
-        if database is None:
-            conn = MariaClient.connect(host, user, passwd)
-
-        else:
-            conn = MariaClient.connect(host, user, passwd, database)
+        g.mariadb = {}
 
-        g.mariadb = conn
+    if database not in g.mariadb:
+        pool = get_pool(host, user, passwd, database)
+        g.mariadb[database] = (pool, pool.checkout())
 
-    return g.mariadb
+    return g.mariadb[database][1]
 
 
-def get_mongodb():
+def release_mariadb():
     '''
 
-    This function opens a new mongo database connection, if there is none yet
-    for the current application context.
+    This function returns each mariadb connection, checked out within the
+    current application context, to the corresponding pool.
 
-    Note: the following resources can be further reviewed:
+    '''
+
+    for pool, conn in g.pop('mariadb', {}).values():
+        pool.release(conn)
 
-          http://flask.pocoo.org/docs/0.12/tutorial/dbcon/
-          http://flask.pocoo.org/docs/0.12/appcontext/#context-usage
 
+def get_mongodb():
     '''
 
-    if not hasattr(g, 'mongodb'):
-        settings = Database()
-        params = {
-            'user': settings.get_db_username('nosql'),
-            'pass': settings.get_db_password('nosql'),
-            'host': settings.get_db_host('nosql'),
-        }
+    This function returns the mongodb client, shared by each application
+    context, within the current process.
 
-        client = MongoClient(
-            "mongodb://{user}:{pass}@{host}/admin?authSource=admin".format(**params)
-        )
-        g.mongodb = client
+    Note: the client maintains its own pool of sockets, and is configured
+          within 'factory.create_app' (see 'brain.database.pool').
 
-    return g.mongodb
+    '''
+
+    settings = Database()
+    params = {
+        'user': settings.get_db_username('nosql'),
+        'pass': settings.get_db_password('nosql'),
+        'host': settings.get_db_host('nosql'),
+    }
+
+    return get_client(
+        "mongodb://{user}:{pass}@{host}/admin?authSource=admin".format(**params)
+    )
 
 
 class NoSQL(object):
@@ -117,12 +126,22 @@ class NoSQL(object):
                 'error': self.list_error,
             }
 
-    def execute(self, operation, payload):
+    def execute(self, operation, payload, options=None):
         '''
 
         This method is responsible for defining the necessary interface to
         perform NoSQL commands.
 
+        @options, optional keyword arguments of the 'aggregate', 'find',
+            'count_documents', or 'create_index' operation (i.e.
+            'allowDiskUse', 'batchSize', 'projection', 'hint').
+
+        @payload, the 'filter', and 'update' of an 'update_one', or an
+            'update_many' operation.
+
+        Note: 'count_documents' without a filter returns the document count,
+              from the collection metadata, rather than counting documents.
+
         Note: collection level operations can be further reviewed:
 
           - http://api.mongodb.com/python/current/api/pymongo/collection.html
@@ -130,24 +149,31 @@ class NoSQL(object):
         '''
 
         result = None
+        options = options or {}
         if self.proceed:
             try:
                 if operation == 'aggregate':
-                    result = self.collection.aggregate(payload)
+                    result = self.collection.aggregate(payload, **options)
                 elif operation == 'insert_one':
                     result = self.collection.insert_one(payload)
                 elif operation == 'insert_many':
                     result = self.collection.insert_many(payload)
                 elif operation == 'update_one':
-                    result = self.collection.update_one(payload)
+                    result = self.collection.update_one(
+                        payload['filter'],
+                        payload['update']
+                    )
                 elif operation == 'update_many':
-                    result = self.collection.update_many(payload)
+                    result = self.collection.update_many(
+                        payload['filter'],
+                        payload['update']
+                    )
                 elif operation == 'delete_one':
                     result = self.collection.delete_one(payload)
                 elif operation == 'delete_many':
                     result = self.collection.delete_many(payload)
                 elif operation == 'find':
-                    result = self.collection.find(payload)
+                    result = self.collection.find(payload, **options)
                 elif operation == 'map_reduce':
                     result = self.collection.map_reduce(
                         payload['map'],
@@ -162,9 +188,11 @@ class NoSQL(object):
                     result = self.collection.delete_many(payload)
                 elif operation == 'count_documents':
                     if payload:
-                        result = self.collection.find(payload).count()
+                        result = self.collection.count(payload, **options)
                     else:
                         result = self.collection.count()
+                elif operation == 'create_index':
+                    result = self.collection.create_index(payload, **options)
                 elif operation == 'drop_collection':
                     result = self.database.drop_collection(payload)
 
@@ -177,7 +205,7 @@ class NoSQL(object):
                     'error': self.list_error,
                 }
 
-            if result:
+            if result is not None:
                 return {'status': True, 'result': result, 'error': None}
             else:
                 return {'status': False, 'result': None, 'error': None}
@@ -186,24 +214,19 @@ class NoSQL(object):
         '''
         This method is responsible for defining the necessary interface to
         disconnect from a NoSQL database.
-        '''
 
-        if self.proceed:
-            try:
-                self.client.close()
+        Note: the shared client is not closed, since it is reused by each
+              subsequent request, within the current process.
 
-                return {
-                    'status': True,
-                    'error': None,
-                }
+        '''
 
-            except errors, error:
-                self.list_error.append(error)
+        if self.proceed:
+            self.client = None
 
-                return {
-                    'status': False,
-                    'error': self.list_error,
-                }
+            return {
+                'status': True,
+                'error': None,
+            }
 
     def get_errors(self):
         '''
@@ -265,7 +288,7 @@ class SQL(object):
         self.conn = get_mariadb(self.host, self.user, self.passwd, database)
         self.cursor = self.conn.cursor()
 
-    def execute(self, operation, statement, sql_args=None):
+    def execute(self, operation, statement, sql_args=None, commit=True):
         '''
 
         This method is responsible for defining the necessary interface to
@@ -274,6 +297,10 @@ class SQL(object):
         @sql_args, is a tuple used for argument substitution with the supplied
             'statement'.
 
+        @commit, if False, an 'insert', 'delete', or 'update' is not committed,
+            so several statements can be committed, as a single transaction
+            (see 'commit').
+
         '''
 
         if self.proceed:
@@ -282,7 +309,8 @@ class SQL(object):
 
                 # commit change(s), return lastrowid
                 if operation in ['insert', 'delete', 'update']:
-                    self.conn.commit()
+                    if commit:
+                        self.conn.commit()
 
                     return {
                         'status': True,
@@ -310,6 +338,73 @@ class SQL(object):
                     'result': None,
                 }
 
+    def execute_many(self, statement, list_args):
+        '''
+
+        This method executes the supplied 'insert' statement, once for each
+        tuple of arguments, without committing the change(s). The mysqldb
+        client sends the rows, as a single multi-row 'VALUES' statement.
+
+        @list_args, is a list of tuples, each used for argument substitution
+            with the supplied 'statement'.
+
+        '''
+
+        if self.proceed:
+            try:
+                self.cursor.executemany(statement, list_args)
+
+                return {
+                    'status': True,
+                    'error': self.list_error,
+                    'rows': self.cursor.rowcount,
+                }
+
+            except MariaClient.Error, error:
+                self.conn.rollback()
+                self.list_error.append(error)
+
+                return {
+                    'status': False,
+                    'error': self.list_error,
+                    'rows': None,
+                }
+
+    def commit(self):
+        '''
+
+        This method commits the change(s), of each preceding statement, which
+        was not committed.
+
+        '''
+
+        if self.proceed:
+            try:
+                self.conn.commit()
+                return {'status': True, 'error': self.list_error}
+
+            except MariaClient.Error, error:
+                self.conn.rollback()
+                self.list_error.append(error)
+                return {'status': False, 'error': self.list_error}
+
+    def rollback(self):
+        '''
+
+        This method discards the change(s), of each preceding statement, which
+        was not committed.
+
+        '''
+
+        if self.proceed:
+            try:
+                self.conn.rollback()
+                return {'status': True, 'error': self.list_error}
+
+            except MariaClient.Error, error:
+                self.list_error.append(error)
+                return {'status': False, 'error': self.list_error}
+
     def disconnect(self):
         '''
 
@@ -8,6 +8,7 @@ This file retrieves session related properties from the sql database.
 
 from flask import current_app
 from brain.database.query import SQL
+from brain.database.entity import Entity
 
 
 class Session(object):
@@ -39,22 +40,18 @@ class Session(object):
         This method is responsible for retrieving the 'session_id', given
         that the 'collection' is known.
 
-        '''
+        Note: the 'session_id' is retrieved, along with the remaining metadata
+              of the collection, which is cached (see 'Entity.get_metadata').
 
-        self.sql.connect(self.db_ml)
-        sql_statement = 'SELECT id_entity FROM tbl_dataset_entity '\
-            'WHERE collection=%s'
-        args = (collection)
-        response = self.sql.execute('select', sql_statement, args)
+        '''
 
-        # retrieve any error(s)
-        response_error = self.sql.get_errors()
+        response = Entity().get_metadata(collection)
 
         # return result
-        if response_error:
-            return {'result': None, 'error': response_error}
+        if response['error']:
+            return {'result': None, 'error': response['error']}
         else:
-            return {'result': response['result'][0][0], 'error': None}
+            return {'result': response['result']['id_entity'], 'error': None}
 
     def get_all_collections(self):
         '''
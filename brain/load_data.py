@@ -14,6 +14,7 @@ from brain.session.data_append import DataAppend
 from brain.session.model_generate import ModelGenerate
 from brain.session.model_predict import ModelPredict
 from brain.database.session import Session
+from brain.cache.job import JobQueue
 
 
 class Load_Data(object):
@@ -140,11 +141,38 @@ class Load_Data(object):
         model into a NoSQL cache, using a chosen stored dataset from the SQL
         database.
 
+        Note: when 'TRAINING_ASYNC' is enabled (i.e. the programmatic
+              interface), the validated session is queued for a separate
+              worker process ('worker.py'), and the returned 'job_id' can be
+              supplied to '/retrieve-job-status'.
+
         '''
 
         # instantiate class
         session = ModelGenerate(self.data)
 
+        # queue model
+        if current_app.config.get('TRAINING_ASYNC'):
+            if not session.validate_arg_none():
+                session.validate_premodel_settings()
+
+            if session.get_errors():
+                response = {
+                    'status': 1,
+                    'msg': 'Model not queued',
+                    'type': 'model-generate',
+                    'error': session.get_errors()
+                }
+            else:
+                response = {
+                    'status': 0,
+                    'msg': 'Model queued',
+                    'type': 'model-generate',
+                    'job_id': JobQueue().enqueue(self.uid, self.data)
+                }
+
+            return json.dumps(response)
+
         # generate model
         if not session.validate_arg_none():
             session.validate_premodel_settings()
@@ -164,6 +192,8 @@ class Load_Data(object):
                 'msg': 'Model properly generated',
                 'type': 'model-generate'
             }
+            if session.return_leaderboard():
+                response['leaderboard'] = session.return_leaderboard()
 
         return json.dumps(response)
 
@@ -173,20 +203,31 @@ class Load_Data(object):
         This method validates the supplied parameters, before generating a
         prediction, using a chosen stored model from the NoSQL cache.
 
+        Note: the supplied 'prediction_input[]' can either be a single
+              observation, or a matrix of observations (batch mode). The
+              settings are validated, before any model is uncached, since a
+              malformed matrix cannot be predicted against.
+
         '''
 
         # instantiate class
-        errors = None
         session = ModelPredict(self.data)
 
         # implement class methods
         if not session.validate_arg_none():
             session.validate_premodel_settings()
             if session.get_errors():
-                errors = session.get_errors()
+                response = {
+                    'status': 1,
+                    'result': None,
+                    'type': 'model-predict',
+                    'error': session.get_errors()
+                }
+
+                return json.dumps(response)
 
             my_prediction = session.predict()
-            if errors or my_prediction['error']:
+            if my_prediction['error']:
                 response = {
                     'status': 1,
                     'result': my_prediction['error'],
@@ -11,10 +11,14 @@ Note: the term 'dataset' used throughout various comments in this file,
 '''
 
 import datetime
+from uuid import uuid4
 from brain.session.base import Base
 from flask import current_app
 from brain.session.data.dataset import dataset2dict
-from brain.database.dataset import Collection
+from brain.converter.format.csv2dict import csv2chunks
+from brain.converter.format.xml2dict import xml2chunks
+from brain.converter.columnar import encode
+from brain.database.dataset import Collection, get_columnar
 from brain.database.entity import Entity
 
 
@@ -48,6 +52,11 @@ class BaseData(Base):
         # class variable
         self.model_type = premodel_data['properties']['model_type']
         self.premodel_data = premodel_data
+        self.dataset = None
+        self.deferred = []
+        self.columnar = False
+        self.chunk_size = current_app.config.get('DATASET_CHUNK_SIZE')
+        self.chunk_buffer = current_app.config.get('DATASET_CHUNK_BUFFER')
 
         if uid:
             self.uid = uid
@@ -89,7 +98,7 @@ class BaseData(Base):
         collection = self.premodel_data['properties']['collection']
         collection_adjusted = collection.lower().replace(' ', '_')
         collection_count = entity.get_collection_count(self.uid)
-        document_count = cursor.query(collection_adjusted, 'count_documents')
+        document_count = cursor.count_uploads(collection_adjusted)
 
         # enfore collection limit: oldest collection name is obtained from the
         #     sql database. Then, the corresponding collection (i.e. target) is
@@ -104,7 +113,7 @@ class BaseData(Base):
             cursor.query(target, 'drop_collection')
             entity.remove_entity(self.uid, target)
             collection_count = entity.get_collection_count(self.uid)
-            document_count = cursor.query(collection_adjusted, 'count_documents')
+            document_count = cursor.count_uploads(collection_adjusted)
 
         # save dataset
         if (
@@ -116,6 +125,15 @@ class BaseData(Base):
         ):
             current_utc = datetime.datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%S")
             self.premodel_data['properties']['datetime_saved'] = current_utc
+            self.prepare_columnar(
+                cursor,
+                collection_adjusted,
+                not document_count['result']
+            )
+
+            # new collection: index used to count the uploads
+            if not document_count['result']:
+                cursor.index_uploads(collection_adjusted)
 
             if self.dataset:
                 document = {
@@ -129,6 +147,25 @@ class BaseData(Base):
                     document
                 )
 
+                if not response['error']:
+                    self.save_premodel_columns(
+                        cursor,
+                        collection_adjusted,
+                        self.dataset,
+                        str(response['result'].inserted_id)
+                    )
+
+            # deferred csv, or xml upload(s): converted, and stored in chunks
+            for upload in self.deferred:
+                if response and response['error']:
+                    break
+
+                response = self.save_premodel_chunks(
+                    cursor,
+                    collection_adjusted,
+                    upload
+                )
+
         else:
             response = None
 
@@ -143,6 +180,163 @@ class BaseData(Base):
         else:
             return {'result': None, 'error': 'no dataset provided'}
 
+    def save_premodel_chunks(self, cursor, collection, upload):
+        '''
+
+        This method converts the supplied csv, or xml upload, one chunk at a
+        time, and stores each chunk as a separate document, into the nosql
+        implementation. At most 'chunk_buffer' documents are held in memory,
+        before being written with a single 'insert_many'.
+
+        @upload, a dictionary, containing the 'filename', and 'file' object.
+
+        Note: each document shares an 'upload_id', and records its 'chunk'
+              index, within the 'properties' attribute. If any chunk fails
+              validation, every previously stored chunk of the same upload is
+              removed, so an upload is stored entirely, or not at all.
+
+        '''
+
+        # local variables
+        upload_id = str(uuid4())
+        regression = self.model_type == self.list_model_type[1]
+        documents = []
+        chunk_count = 0
+        error = None
+
+        if upload['filename'].lower().endswith('.xml'):
+            converter = xml2chunks
+        else:
+            converter = csv2chunks
+
+        for chunk in converter(
+            upload['file'],
+            self.chunk_size,
+            regression,
+            current_app.config.get('DATASET_MAX_ERRORS')
+        ):
+            if chunk['error']:
+                error = {
+                    'validation': [{
+                        'location': upload['filename'],
+                        'message': chunk['error']
+                    }]
+                }
+                break
+
+            properties = dict(self.premodel_data['properties'])
+            properties['upload_id'] = upload_id
+            properties['chunk'] = chunk_count
+            documents.append({'properties': properties, 'dataset': chunk['dataset']})
+            chunk_count += 1
+
+            self.save_premodel_columns(
+                cursor,
+                collection,
+                chunk['dataset'],
+                upload_id
+            )
+
+            # write buffered documents
+            if len(documents) >= self.chunk_buffer:
+                response = cursor.query(collection, 'insert_many', documents)
+                documents = []
+
+                if response['error']:
+                    error = response['error']
+                    break
+
+        if not error and documents:
+            response = cursor.query(collection, 'insert_many', documents)
+            error = response['error']
+
+        if not error and not chunk_count:
+            error = {
+                'validation': [{
+                    'location': upload['filename'],
+                    'message': 'empty dataset, or invalid syntax (try lint)'
+                }]
+            }
+
+        # remove partially stored upload
+        if error:
+            cursor.query(
+                collection,
+                'delete_many',
+                {'properties.upload_id': upload_id}
+            )
+            cursor.query(
+                get_columnar(collection),
+                'delete_many',
+                {'upload_id': upload_id}
+            )
+            return {'result': None, 'error': error}
+
+        return {'result': upload_id, 'error': None}
+
+    def prepare_columnar(self, cursor, collection, empty):
+        '''
+
+        This method determines whether the columnar representation, of the
+        supplied collection, can be extended by the current upload(s).
+
+        @empty, indicates the collection has no previous upload(s). A new
+            columnar companion collection is then started, along with a
+            'manifest' document, marking it as complete.
+
+        Note: a collection which predates the columnar format, has no
+              manifest, and is not extended. Instead, 'model_generate' reads
+              its documents directly.
+
+        '''
+
+        columnar = get_columnar(collection)
+
+        if empty:
+            cursor.query(columnar, 'drop_collection')
+            response = cursor.query(
+                columnar,
+                'insert_one',
+                {'_id': 'manifest', 'complete': True}
+            )
+            self.columnar = not response['error']
+
+        else:
+            response = cursor.query(
+                columnar,
+                'count_documents',
+                {'_id': 'manifest', 'complete': True}
+            )
+            self.columnar = bool(response['result'])
+
+    def save_premodel_columns(self, cursor, collection, observations, upload_id):
+        '''
+
+        This method stores the columnar representation, of the supplied
+        observations, into the columnar companion of the collection.
+
+        Note: if the observations cannot be represented, or stored, the
+              manifest is removed. The columnar representation is then
+              incomplete, and no longer used by 'model_generate'.
+
+        '''
+
+        if not self.columnar:
+            return
+
+        # local variables
+        columnar = get_columnar(collection)
+        regression = self.model_type == self.list_model_type[1]
+        blocks = encode(observations, upload_id, regression)
+
+        if blocks:
+            response = cursor.query(columnar, 'insert_many', blocks)
+            if not response['error']:
+                return
+
+        cursor.query(columnar, 'delete_one', {'_id': 'manifest'})
+        self.columnar = False
+
     def convert_dataset(self):
         '''
 
@@ -157,6 +351,8 @@ class BaseData(Base):
         # return result
         if response['error']:
             self.dataset = None
+            self.deferred = []
             self.list_error.append(response['error'])
         else:
             self.dataset = response['dataset']
+            self.deferred = response['deferred']
@@ -9,8 +9,8 @@ Note: the term 'dataset' used throughout various comments in this file,
 '''
 
 import json
-import requests
 from flask import current_app
+from brain.session.data.fetch import fetch_all
 from brain.validator.dataset import Validator
 from brain.converter.format.csv2dict import csv2dict
 from brain.converter.format.xml2dict import xml2dict
@@ -24,12 +24,21 @@ def dataset2dict(model_type, upload):
 
     @upload, uploaded dataset(s).
 
+    Note: 'dataset_url' references are retrieved concurrently, before being
+          validated (see 'fetch.py').
+
+    @deferred, csv, or xml file upload(s) which are not converted here. Instead, they
+        are converted, and stored in chunks, when the 'DATASET_CHUNK_SIZE'
+        configuration is a positive integer (see 'BaseData').
+
     '''
 
     # local variables
     list_error = []
     converted = []
-    Validate = Validator()
+    deferred = []
+    chunk_size = current_app.config.get('DATASET_CHUNK_SIZE')
+    Validate = Validator(current_app.config.get('DATASET_MAX_ERRORS'))
     datasets = upload['dataset']
     settings = upload['properties']
     stream = settings.get('stream', None)
@@ -40,12 +49,20 @@ def dataset2dict(model_type, upload):
         session_name = settings['session_name']
         dataset_type = settings['dataset_type']
 
+        # scrape url content: concurrently
+        if dataset_type == 'dataset_url':
+            fetched = fetch_all(datasets)
+
         # convert dataset(s) into extended list
-        for dataset in datasets:
-            # scrape url content
+        for i, dataset in enumerate(datasets):
             if dataset_type == 'dataset_url':
-                r = requests.get(dataset)
-                instance = r.json()['dataset']
+                instance = fetched[i]['dataset']
+
+                if fetched[i]['error']:
+                    list_error.append({
+                        'location': dataset,
+                        'message': fetched[i]['error']
+                    })
 
             else:
                 instance = [dataset]
@@ -74,18 +91,32 @@ def dataset2dict(model_type, upload):
         else:
             adjusted_datasets = upload['dataset']['dataset_url']
 
-        # convert dataset(s) into extended list
-        for dataset in adjusted_datasets:
-            location = dataset['filename']
+        # scrape url content: concurrently
+        if dataset_type == 'dataset_url':
+            fetched = fetch_all(adjusted_datasets)
 
-            # scrape url content
+        # convert dataset(s) into extended list
+        for i, dataset in enumerate(adjusted_datasets):
             if dataset_type == 'dataset_url':
-                r = requests.get(dataset)
-                instance = [r.json()][0]['dataset']
+                location = dataset
+                instance = fetched[i]['dataset']
+
+                if fetched[i]['error']:
+                    list_error.append({
+                        'location': location,
+                        'message': fetched[i]['error']
+                    })
+                    continue
 
             # file content
             else:
+                location = dataset['filename']
+
                 if dataset['filename'].lower().endswith('.csv'):
+                    if chunk_size:
+                        deferred.append(dataset)
+                        continue
+
                     instance = csv2dict(dataset['file'])
 
                 elif dataset['filename'].lower().endswith('.json'):
@@ -95,7 +126,19 @@ def dataset2dict(model_type, upload):
                     except:
                         instance = dataset['file']
                 elif dataset['filename'].lower().endswith('.xml'):
-                    instance = xml2dict(dataset['file'])
+                    if chunk_size:
+                        deferred.append(dataset)
+                        continue
+
+                    converted_xml = xml2dict(dataset['file'])
+                    if converted_xml['error']:
+                        list_error.append({
+                            'location': location,
+                            'message': converted_xml['error']
+                        })
+                        continue
+
+                    instance = converted_xml['dataset']
 
             if instance:
                 if model_type == list_model_type[0]:
@@ -122,6 +165,7 @@ def dataset2dict(model_type, upload):
     if list_error:
         return {
             'dataset': converted,
+            'deferred': deferred,
             'settings': settings,
             'error': {
                 'validation': list_error
@@ -131,6 +175,7 @@ def dataset2dict(model_type, upload):
     else:
         return {
             'dataset': converted,
+            'deferred': deferred,
             'settings': settings,
             'error': None,
         }
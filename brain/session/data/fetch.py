@@ -0,0 +1,255 @@
+#!/usr/bin/python
+
+'''
+
+This file retrieves the dataset(s) of the supplied 'dataset_url' references,
+concurrently, using a keep-alive session, shared within the process.
+
+'''
+
+import io
+import os
+import json
+import time
+import errno
+import requests
+import threading
+from multiprocessing.pool import ThreadPool
+from flask import current_app
+from brain.converter.md5 import calculate
+
+# session of the current process
+_session = {'session': None, 'pid': None}
+_session_lock = threading.Lock()
+
+
+def get_session(workers):
+    '''
+
+    This function returns the keep-alive session of the current process,
+    creating it on first use, with at least one pooled connection per worker.
+
+    Note: a session inherited from a parent process (i.e. pre-forking
+          webserver) is replaced, since its sockets are shared with the
+          parent process.
+
+    '''
+
+    with _session_lock:
+        if _session['session'] is None or _session['pid'] != os.getpid():
+            session = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(
+                pool_connections=workers,
+                pool_maxsize=workers
+            )
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+
+            _session['session'] = session
+            _session['pid'] = os.getpid()
+
+        return _session['session']
+
+
+def fetch_all(urls):
+    '''
+
+    This function retrieves the 'dataset' attribute of each supplied url,
+    using a bounded pool of 'DATASET_URL_WORKERS' threads, so a slow url does
+    not delay the remaining urls. A list is returned in the order of the
+    supplied urls, where each element contains the 'dataset', along with any
+    'error'.
+
+    '''
+
+    config = current_app.config
+    settings = {
+        'workers': config.get('DATASET_URL_WORKERS'),
+        'timeout': (
+            config.get('DATASET_URL_CONNECT_TIMEOUT'),
+            config.get('DATASET_URL_READ_TIMEOUT')
+        ),
+        'total_timeout': config.get('DATASET_URL_TOTAL_TIMEOUT'),
+        'max_bytes': config.get('DATASET_URL_MAX_BYTES'),
+        'cache_path': config.get('DATASET_URL_CACHE_PATH')
+    }
+
+    if not urls:
+        return []
+
+    session = get_session(settings['workers'])
+    pool = ThreadPool(min(settings['workers'], len(urls)))
+
+    try:
+        return pool.map(lambda url: fetch(session, url, settings), urls)
+    finally:
+        pool.close()
+        pool.join()
+
+
+def fetch(session, url, settings):
+    '''
+
+    This function retrieves the 'dataset' attribute, of the supplied url.
+
+    @settings, the 'timeout' (connect, read), the 'total_timeout' (seconds)
+        of each url, the 'max_bytes' of a response, and the optional
+        'cache_path' directory.
+
+    Note: when a 'cache_path' is defined, each response with an 'ETag' header
+          is cached. Subsequent requests are conditional ('If-None-Match'),
+          and the cached content is used, when the server responds '304 Not
+          Modified'.
+
+    '''
+
+    deadline = time.time() + settings['total_timeout']
+    cached = get_cache(settings['cache_path'], url)
+    headers = {'If-None-Match': cached['etag']} if cached else {}
+
+    try:
+        response = session.get(
+            url,
+            headers=headers,
+            timeout=settings['timeout'],
+            stream=True
+        )
+
+        with response:
+            if cached and response.status_code == 304:
+                content = cached['content']
+
+            else:
+                response.raise_for_status()
+                content = read(response, settings['max_bytes'], deadline)
+
+                if content is None:
+                    return {
+                        'dataset': None,
+                        'error': 'response exceeds %s bytes' % settings['max_bytes']
+                    }
+
+                if response.headers.get('ETag'):
+                    set_cache(
+                        settings['cache_path'],
+                        url,
+                        response.headers['ETag'],
+                        content
+                    )
+
+        return {'dataset': json.loads(content)['dataset'], 'error': None}
+
+    except requests.exceptions.RequestException, error:
+        return {'dataset': None, 'error': 'unable to retrieve url: %s' % error}
+
+    except (ValueError, KeyError, TypeError):
+        return {'dataset': None, 'error': 'url content is not a json dataset'}
+
+
+def read(response, max_bytes, deadline):
+    '''
+
+    This function returns the content of the supplied streamed response, or
+    None, when the content exceeds 'max_bytes'. The content is read in
+    chunks, so an oversized response is abandoned, without being read.
+
+    @deadline, the time (seconds since the epoch) after which the response is
+        abandoned, by raising a 'Timeout'. Unlike the read timeout, which
+        applies to each chunk, the deadline limits a server sending a few
+        bytes at a time.
+
+    Note: the deadline is checked after each chunk, so the chunk size also
+          bounds how far a response can overrun the deadline.
+
+    '''
+
+    length = response.headers.get('Content-Length')
+    if length and length.isdigit() and int(length) > max_bytes:
+        return None
+
+    content = io.BytesIO()
+    for chunk in response.iter_content(8192):
+        content.write(chunk)
+
+        if content.tell() > max_bytes:
+            return None
+
+        if time.time() > deadline:
+            raise requests.exceptions.Timeout(
+                'response exceeds the total timeout'
+            )
+
+    return content.getvalue()
+
+
+def get_cache(cache_path, url):
+    '''
+
+    This function returns the cached 'etag', and 'content' of the supplied
+    url, or None.
+
+    '''
+
+    if not cache_path:
+        return None
+
+    path = os.path.join(cache_path, get_key(url))
+
+    try:
+        with open(path + '.etag', 'rb') as f:
+            etag = f.read()
+        with open(path + '.json', 'rb') as f:
+            content = f.read()
+
+    except IOError:
+        return None
+
+    # entries are keyed by url, and the etag of the content
+    if not etag or calculate(io.BytesIO(content), hr=True) != etag.split('\n')[-1]:
+        return None
+
+    return {'etag': etag.split('\n')[0], 'content': content}
+
+
+def set_cache(cache_path, url, etag, content):
+    '''
+
+    This function caches the supplied content, and etag of the supplied url.
+    Each file is written to a temporary file, then renamed, so a concurrent
+    reader does not read a partially written entry.
+
+    '''
+
+    if not cache_path:
+        return
+
+    try:
+        os.makedirs(cache_path)
+    except OSError, error:
+        if error.errno != errno.EEXIST:
+            return
+
+    path = os.path.join(cache_path, get_key(url))
+    suffix = '.%s.%s' % (os.getpid(), threading.current_thread().ident)
+
+    try:
+        for extension, value in [
+            ('.json', content),
+            ('.etag', etag + '\n' + calculate(io.BytesIO(content), hr=True))
+        ]:
+            with open(path + extension + suffix, 'wb') as f:
+                f.write(value)
+            os.rename(path + extension + suffix, path + extension)
+
+    except (IOError, OSError):
+        pass
+
+
+def get_key(url):
+    '''
+
+    This function returns the cache file name, of the supplied url.
+
+    '''
+
+    return calculate(io.BytesIO(url.encode('utf-8')), hr=True)
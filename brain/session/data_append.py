@@ -68,11 +68,12 @@ class DataAppend(BaseData):
         collection = premodel_settings['collection']
         collection_adjusted = collection.lower().replace(' ', '_')
         collection_count = entity.get_collection_count(self.uid)
-        document_count = cursor.query(collection_adjusted, 'count_documents')
+        document_count = cursor.count_uploads(collection_adjusted)
 
         # define entity properties
         premodel_entity = {
             'title': premodel_settings.get('session_name', None),
+            'collection': collection,
             'uid': self.uid,
             'id_entity': session_id,
         }
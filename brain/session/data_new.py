@@ -66,7 +66,7 @@ class DataNew(BaseData):
         collection = premodel_settings['collection']
         collection_adjusted = collection.lower().replace(' ', '_')
         collection_count = entity.get_collection_count(self.uid)
-        document_count = cursor.query(collection_adjusted, 'count_documents')
+        document_count = cursor.count_uploads(collection_adjusted)
 
         # assign numerical representation
         numeric_model_type = self.list_model_type.index(self.model_type) + 1
@@ -0,0 +1,331 @@
+#!/usr/bin/python
+
+'''
+
+This file computes, and caches the probability calibration of an svm model,
+separately from the corresponding model fit.
+
+'''
+
+import json
+import numpy
+from flask import current_app
+from sklearn import svm
+from brain.cache.hset import Hset
+from brain.cache.job import JobQueue
+from brain.cache.model import Model
+from brain.cache.query import Query
+from brain.session.model.sv import get_dataset
+from brain.session.predict.engine import get_engine
+
+# cross validation folds, and sigmoid fit parameters, consistent with libsvm
+FOLDS = 5
+SEED = 0
+MAX_ITER = 100
+MIN_STEP = 1e-10
+SIGMA = 1e-12
+EPS = 1e-5
+
+
+def calibrate(model, collection):
+    '''
+
+    This method computes the pairwise (platt) probability calibration, of the
+    cached svm model, consistent with 'SVC(probability=True)', then caches
+    the calibration within the '<model>_calibration' redis hash. The
+    calibration is returned, or None if no exact svm model is cached.
+
+    Note: the cached calibration includes the intercept of the calibrated
+          model, so a calibration is not applied, once the model is
+          regenerated.
+
+    '''
+
+    # local variables
+    collection_adjusted = collection.lower().replace(' ', '_')
+    payload = [{'$project': {'dataset': 1}}]
+
+    try:
+        list_model, list_value = Model().uncache_many([
+            (model + '_model', collection_adjusted),
+            (model + '_labels', collection_adjusted)
+        ])
+        clf, label_encoder = list_model
+        if clf is None or label_encoder is None:
+            return None
+
+        engine = get_engine(clf)
+        if not hasattr(engine, 'set_calibration'):
+            return None
+
+        # observations: encoded consistent with the cached model
+        observation_labels, grouped_features, sorted_labels = get_dataset(
+            model,
+            collection_adjusted,
+            payload
+        )
+
+        prob_a, prob_b = get_platt(
+            numpy.asarray(grouped_features, dtype=numpy.float64),
+            label_encoder.transform(observation_labels),
+            get_params(clf)
+        )
+
+        calibration = {
+            'probA': prob_a.tolist(),
+            'probB': prob_b.tolist(),
+            'intercept': engine.intercept.tolist()
+        }
+
+        Hset().cache(
+            model + '_calibration',
+            collection_adjusted,
+            json.dumps(calibration)
+        )
+
+    finally:
+        query = Query()
+        query.start_redis()
+        query.delete(get_pending(model, collection_adjusted))
+
+    return calibration
+
+
+def load(engine, model, collection, value):
+    '''
+
+    This method applies the supplied cached calibration to the engine, and
+    returns whether the engine is calibrated. Otherwise, the calibration is
+    either queued for a worker process, when 'TRAINING_CALIBRATION_BACKGROUND'
+    is enabled, or computed immediately.
+
+    @value, the cached '<model>_calibration' value, or None.
+
+    Note: models calibrated when fit (i.e. 'probability=True'), along with
+          online models, are already calibrated.
+
+    Note: a calibration which fails, is logged, and the engine is returned
+          uncalibrated, so the corresponding prediction still succeeds.
+
+    '''
+
+    if getattr(engine, 'calibrated', True):
+        return True
+
+    calibration = json.loads(value) if value else None
+    if calibration and not numpy.array_equal(
+        calibration['intercept'],
+        engine.intercept
+    ):
+        calibration = None
+
+    # calibrate: once, for concurrent predictions
+    if not calibration:
+        query = Query()
+        query.start_redis()
+
+        if not query.setnx(
+            get_pending(model, collection.lower().replace(' ', '_')),
+            1,
+            current_app.config.get('TRAINING_CALIBRATION_TIMEOUT')
+        ):
+            return False
+
+        if current_app.config.get('TRAINING_CALIBRATION_BACKGROUND'):
+            JobQueue().enqueue('calibration', {
+                'properties': {
+                    'session_type': 'model_calibrate',
+                    'collection': collection,
+                    'model_type': model
+                }
+            })
+            return False
+
+        try:
+            calibration = calibrate(model, collection)
+        except Exception, error:
+            current_app.logger.error('calibration failed: %s' % error)
+            return False
+
+        if not calibration:
+            return False
+
+    engine.set_calibration(calibration['probA'], calibration['probB'])
+    return True
+
+
+def get_pending(model, collection):
+    '''
+
+    This method returns the redis key, indicating a calibration is pending,
+    for the supplied (adjusted) collection.
+
+    '''
+
+    return model + '_calibration:pending:' + collection
+
+
+def get_params(clf):
+    '''
+
+    This method returns the svm parameters, of either a 'CompactModel' (see
+    'brain/converter/compact.py'), or a fitted sklearn model.
+
+    '''
+
+    if hasattr(clf, 'params'):
+        params = clf.params
+    else:
+        params = {
+            'kernel': clf.kernel,
+            'C': clf.C,
+            '_gamma': clf._gamma,
+            'degree': clf.degree,
+            'coef0': clf.coef0
+        }
+
+    return {
+        'kernel': str(params['kernel']),
+        'C': params['C'],
+        'gamma': params['_gamma'],
+        'degree': params['degree'],
+        'coef0': params['coef0']
+    }
+
+
+def get_platt(X, y, params):
+    '''
+
+    This method returns the platt parameters (i.e. 'probA_', 'probB_'), for
+    each pair (i, j) of classes, where i < j, consistent with libsvm. Each
+    pair is fit against the cross validated decision values, of a binary svm
+    trained on the corresponding observations.
+
+    '''
+
+    n_class = len(numpy.unique(y))
+    prob_a = []
+    prob_b = []
+
+    for i in range(n_class):
+        for j in range(i + 1, n_class):
+            mask = (y == i) | (y == j)
+            positive = y[mask] == i
+            decision = get_decision(X[mask], positive, params)
+
+            a, b = sigmoid_train(decision, positive)
+            prob_a.append(a)
+            prob_b.append(b)
+
+    return numpy.array(prob_a), numpy.array(prob_b)
+
+
+def get_decision(X, positive, params):
+    '''
+
+    This method returns the cross validated decision value, of each supplied
+    observation, where positive values indicate the 'positive' class.
+
+    Note: observations are assigned to folds by a seeded permutation, so the
+          calibration of a dataset is reproducible. Fewer observations than
+          'FOLDS' are cross validated with one observation per fold.
+
+    '''
+
+    n = len(positive)
+    folds = min(FOLDS, n)
+    order = numpy.random.RandomState(SEED).permutation(n)
+    decision = numpy.zeros(n)
+
+    for fold in range(folds):
+        test = order[fold * n // folds:(fold + 1) * n // folds]
+        if not len(test):
+            continue
+
+        train = numpy.setdiff1d(order, test)
+        n_positive = numpy.count_nonzero(positive[train])
+
+        # single class: constant decision value
+        if n_positive == len(train):
+            decision[test] = 1 if n_positive else 0
+        elif not n_positive:
+            decision[test] = -1
+
+        else:
+            clf = svm.SVC(**params)
+            clf.fit(X[train], positive[train].astype(int))
+            decision[test] = clf.decision_function(X[test])
+
+    return decision
+
+
+def sigmoid_train(decision, positive):
+    '''
+
+    This method returns the sigmoid parameters (A, B), where the probability
+    of the positive class is 1 / (1 + exp(A * decision + B)), using the newton
+    method of Lin, Lin, and Weng (i.e. libsvm 'sigmoid_train').
+
+    '''
+
+    prior1 = float(numpy.count_nonzero(positive))
+    prior0 = len(positive) - prior1
+    target = numpy.where(
+        positive,
+        (prior1 + 1) / (prior1 + 2),
+        1 / (prior0 + 2)
+    )
+
+    def objective(a, b):
+        f = decision * a + b
+        return numpy.sum(numpy.where(
+            f >= 0,
+            target * f + numpy.log1p(numpy.exp(-numpy.abs(f))),
+            (target - 1) * f + numpy.log1p(numpy.exp(-numpy.abs(f)))
+        ))
+
+    a = 0.0
+    b = numpy.log((prior0 + 1) / (prior1 + 1))
+    value = objective(a, b)
+
+    for iteration in range(MAX_ITER):
+        # gradient, and hessian
+        f = decision * a + b
+        p = numpy.where(
+            f >= 0,
+            numpy.exp(-numpy.abs(f)) / (1 + numpy.exp(-numpy.abs(f))),
+            1 / (1 + numpy.exp(-numpy.abs(f)))
+        )
+        d2 = p * (1 - p)
+        h11 = SIGMA + numpy.sum(decision * decision * d2)
+        h22 = SIGMA + numpy.sum(d2)
+        h21 = numpy.sum(decision * d2)
+        d1 = target - p
+        g1 = numpy.sum(decision * d1)
+        g2 = numpy.sum(d1)
+
+        if abs(g1) < EPS and abs(g2) < EPS:
+            break
+
+        # newton direction, and line search
+        det = h11 * h22 - h21 * h21
+        da = -(h22 * g1 - h21 * g2) / det
+        db = -(-h21 * g1 + h11 * g2) / det
+        gd = g1 * da + g2 * db
+
+        step = 1.0
+        while step >= MIN_STEP:
+            new_a = a + step * da
+            new_b = b + step * db
+            new_value = objective(new_a, new_b)
+
+            if new_value < value + 0.0001 * step * gd:
+                a, b, value = new_a, new_b, new_value
+                break
+
+            step /= 2
+
+        if step < MIN_STEP:
+            break
+
+    return a, b
@@ -0,0 +1,113 @@
+#!/usr/bin/python
+
+'''
+
+This file computes the fingerprint of an sv model, from its dataset, and
+settings.
+
+'''
+
+import io
+import json
+import numpy
+import sklearn
+from flask import current_app
+from brain.converter.md5 import calculate
+from brain.database.dataset import Collection
+
+
+def get_documents(collection):
+    '''
+
+    This method returns a hash of the document count, and the greatest
+    document id, within the supplied (adjusted) collection, which changes
+    when documents are appended, or removed. None is returned, when the
+    collection has no documents.
+
+    Note: the count is read from the collection metadata, and the greatest id
+          from the '_id' index, so neither reads the documents. Documents are
+          only removed with the upload containing them (i.e. a chunked upload
+          failing validation), which changes the count.
+
+    '''
+
+    cursor = Collection()
+    count = cursor.query(collection, 'count_documents')
+    if count['error'] or not count['result']:
+        return None
+
+    latest = cursor.query(collection, 'aggregate', [
+        {'$sort': {'_id': -1}},
+        {'$limit': 1},
+        {'$project': {'_id': 1}}
+    ])
+    if latest['error']:
+        return None
+
+    ids = [str(document['_id']) for document in latest['result'] or []]
+    if not ids:
+        return None
+
+    return calculate(
+        io.BytesIO('{0},{1}'.format(count['result'], ids[0])),
+        hr=True
+    )
+
+
+def get_content(model, dataset):
+    '''
+
+    This method returns a hash of the supplied dataset (see 'get_dataset'),
+    which is identical for collections with identical observations,
+    regardless of whether the dataset was restructured, or decoded from the
+    columnar companion.
+
+    '''
+
+    list_model_type = current_app.config.get('MODEL_TYPE')
+    observation_labels, grouped_features, sorted_labels = dataset
+    features = numpy.asarray(grouped_features, dtype=numpy.float64)
+
+    if model == list_model_type[1]:
+        labels = numpy.asarray(observation_labels, dtype=numpy.float64).tobytes()
+    else:
+        labels = json.dumps(list(observation_labels))
+
+    content = io.BytesIO()
+    for part in [
+        model,
+        json.dumps(sorted_labels),
+        json.dumps(features.shape),
+        features.tobytes(),
+        labels
+    ]:
+        content.write(part)
+        content.write('\n')
+
+    content.seek(0)
+    return calculate(content, hr=True)
+
+
+def get_fingerprint(content, model, kernel, penalty, gamma, approximate):
+    '''
+
+    This method returns the fingerprint of an sv model, generated from the
+    supplied dataset content hash, and settings, using the installed sklearn
+    version.
+
+    @approximate, the number of components approximating the kernel, or
+        False for an exact model.
+
+    '''
+
+    settings = json.dumps([
+        content,
+        model,
+        kernel,
+        float(penalty),
+        gamma,
+        approximate,
+        sklearn.__version__
+    ])
+
+    return calculate(io.BytesIO(settings), hr=True)
@@ -0,0 +1,252 @@
+#!/usr/bin/python
+
+'''
+
+This file generates, or incrementally updates an online sv model.
+
+'''
+
+import copy
+import json
+import numpy
+from flask import current_app
+from sklearn import preprocessing
+from brain.database.dataset import Collection
+from brain.cache.hset import Hset
+from brain.cache.fingerprint import Fingerprint
+from brain.cache.model import Model
+from brain.session.model.online import OnlineSV
+from brain.session.model.sv import restructure
+
+
+def update(
+    model,
+    kernel_type,
+    collection,
+    penalty,
+    gamma,
+    list_error,
+    progress=None
+):
+
+    '''
+
+    This method updates the cached online sv (i.e. svm, or svr) model, of the
+    supplied collection, using only the documents stored since the model was
+    last generated, or updated. The model is generated from every document,
+    when no online model is cached, the cached model has a different kernel,
+    or the new documents introduce unknown labels (svm), or different
+    features.
+
+    @watermark, the greatest document 'sequence' the cached model was
+        trained with, cached within the '<model>_watermark' redis hash (see
+        'stamp'). Sequences are assigned when a model is generated, or
+        updated, rather than compared by document id, since ids created
+        within the same second, by separate webservers, are not ordered.
+
+    @progress, optional callback, supplied the completed percentage, after
+        the dataset is loaded, and after the model is fit.
+
+    Note: nonlinear kernels are approximated (see 'OnlineSV'), using the
+          components sampled when the model was generated from every document.
+
+    '''
+
+    # local variables
+    list_model_type = current_app.config.get('MODEL_TYPE')
+    epochs = current_app.config.get('TRAINING_INCREMENTAL_EPOCHS')
+    collection_adjusted = collection.lower().replace(' ', '_')
+    regression = model == list_model_type[1]
+    cursor = Collection()
+
+    # cached model, and watermark
+    models = [(model + '_model', collection_adjusted)]
+    if not regression:
+        models.append((model + '_labels', collection_adjusted))
+
+    list_model, list_value = Model().uncache_many(
+        models,
+        [
+            (model + '_watermark', collection_adjusted),
+            (model + '_feature_labels', collection)
+        ]
+    )
+
+    clf = list_model[0]
+    watermark = json.loads(list_value[0]) if list_value[0] else None
+    incremental = (
+        isinstance(clf, OnlineSV) and
+        isinstance(watermark, int) and
+        (clf.kernel, clf.gamma) == (kernel_type, gamma)
+    )
+
+    # sequence: of the documents stored since the last stamp
+    cursor.index_uploads(collection_adjusted)
+    sequence = stamp(cursor, collection_adjusted)
+
+    if cursor.list_error:
+        list_error.extend(cursor.list_error)
+        return {'error': list_error}
+
+    # new documents: since the watermark
+    if incremental:
+        documents = load(cursor, collection_adjusted, sequence, watermark)
+        if not documents:
+            return {'error': list_error}
+
+        observation_labels, grouped_features, sorted_labels = restructure(
+            model,
+            list_model_type,
+            {'result': documents}
+        )
+
+        if regression:
+            known_labels = True
+        else:
+            known_labels = list_model[1] is not None and numpy.all(
+                numpy.in1d(observation_labels, list_model[1].classes_)
+            )
+
+        incremental = (
+            known_labels and
+            sorted_labels == json.loads(list_value[1] or 'null')
+        )
+
+        if incremental:
+            label_encoder = list_model[1]
+            clf = copy.deepcopy(clf)
+
+    # all documents
+    if not incremental:
+        documents = load(cursor, collection_adjusted, sequence)
+        observation_labels, grouped_features, sorted_labels = restructure(
+            model,
+            list_model_type,
+            {'result': documents}
+        )
+
+        if not regression:
+            label_encoder = preprocessing.LabelEncoder()
+            label_encoder.fit(observation_labels)
+
+        clf = OnlineSV(
+            regression,
+            penalty,
+            len(grouped_features),
+            kernel_type,
+            gamma,
+            current_app.config.get('TRAINING_APPROXIMATE_COMPONENTS')
+        )
+
+    if not grouped_features:
+        list_error.append('no observations found, within the collection')
+        return {'error': list_error}
+
+    if progress:
+        progress(30)
+
+    # fit, or update model
+    if regression:
+        labels = numpy.asarray(observation_labels, dtype=numpy.float64)
+    else:
+        labels = label_encoder.transform(observation_labels)
+
+    if incremental:
+        clf.partial_fit(grouped_features, labels, epochs)
+    else:
+        clf.fit(grouped_features, labels)
+
+    if progress:
+        progress(90)
+
+    # cache model, labels, and watermark
+    if not incremental:
+        if not regression:
+            Model(label_encoder).cache(model + '_labels', collection_adjusted)
+
+        Hset().cache(
+            model + '_feature_labels',
+            collection,
+            json.dumps(sorted_labels)
+        )
+
+    # coefficient of determination: of the observations most recently fit
+    if regression:
+        Hset().cache(
+            model + '_r2',
+            collection_adjusted,
+            clf.score(grouped_features, labels)
+        )
+
+    Model(clf).cache(model + '_model', collection_adjusted)
+    Fingerprint(model).invalidate(collection_adjusted)
+    Hset().cache(model + '_watermark', collection_adjusted, json.dumps(sequence))
+
+    return {'error': list_error}
+
+
+def stamp(cursor, collection):
+    '''
+
+    This method assigns the next sequence, to each document of the supplied
+    collection without a 'sequence', then returns the greatest sequence, or
+    0 when no document has a sequence.
+
+    Note: documents stored while a model is updated, are assigned a greater
+          sequence by the next update, so no document is skipped, regardless
+          of the order in which documents are stored.
+
+    '''
+
+    response = cursor.query(collection, 'aggregate', [
+        {'$match': {'sequence': {'$ne': None}}},
+        {'$sort': {'sequence': -1}},
+        {'$limit': 1},
+        {'$project': {'sequence': 1}}
+    ])
+    if response['error']:
+        cursor.list_error.extend(response['error'])
+        return 0
+
+    latest = [document['sequence'] for document in response['result'] or []]
+    sequence = latest[0] if latest else 0
+
+    response = cursor.query(
+        collection,
+        'update_many',
+        {
+            'filter': {'sequence': None},
+            'update': {'$set': {'sequence': sequence + 1}}
+        }
+    )
+    if response['error']:
+        cursor.list_error.extend(response['error'])
+        return 0
+
+    if response['result'] and response['result'].modified_count:
+        sequence += 1
+
+    return sequence
+
+
+def load(cursor, collection, sequence, watermark=0):
+    '''
+
+    This method returns a list of the dataset documents, within the supplied
+    collection, whose 'sequence' is greater than the supplied watermark, and
+    not greater than the supplied (stamped) sequence.
+
+    Note: both bounds use the 'sequence' index (see 'index_uploads').
+
+    '''
+
+    payload = {
+        'dataset': {'$exists': True},
+        'sequence': {'$gt': watermark, '$lte': sequence}
+    }
+
+    return [
+        document
+        for batch in cursor.stream(collection, payload, {'dataset': 1})
+        for document in batch
+    ]
@@ -0,0 +1,206 @@
+#!/usr/bin/python
+
+'''
+
+This file defines an online (i.e. incrementally updated) sv model, which is
+either linear, or approximates a nonlinear kernel.
+
+'''
+
+import numpy
+from sklearn.kernel_approximation import Nystroem
+from sklearn.linear_model import SGDClassifier, SGDRegressor
+from sklearn.preprocessing import StandardScaler
+from brain.converter.model import register
+
+
+class OnlineSV(object):
+    '''
+
+    This class provides a linear sv (i.e. svm, or svr) model, trained using
+    stochastic gradient descent, which can be updated using only additional
+    observations, rather than refit against the entire dataset.
+
+    Nonlinear kernels are approximated, by mapping each observation into a
+    fixed number of (Nystroem) components, sampled from the observations
+    supplied to 'fit'. Training, and prediction then scale linearly with the
+    number of observations, unlike the exact 'SVC', and 'SVR' models.
+
+    The svm model minimizes the 'modified_huber' loss (a smoothed hinge loss,
+    which also provides probability estimates), while the svr model minimizes
+    the 'epsilon_insensitive' loss.
+
+    Note: features are standardized (after any kernel mapping), using the
+          mean, and variance of the observations supplied to 'fit'. Subsequent
+          updates reuse the same mapping, and scaling, so the learned weights
+          remain comparable.
+
+    Note: this class explicitly inherits the 'new-style' class.
+
+    '''
+
+    def __init__(
+        self,
+        regression=False,
+        penalty=1.0,
+        n_samples=1,
+        kernel='linear',
+        gamma='auto',
+        components=100
+    ):
+        '''
+
+        This constructor is responsible for defining class variables.
+
+        @penalty, the svm penalty (C), converted to the equivalent sgd
+            regularization term, 1 / (C * n_samples).
+        @n_samples, number of observations, used to derive the above
+            regularization term, along with the maximum passes over the
+            observations supplied to 'fit' (roughly 10^6 sgd updates are
+            sufficient to converge).
+        @kernel, the 'sv_kernel_type', where 'poly', 'rbf', and 'sigmoid'
+            are approximated, consistent with the 'SVC' defaults.
+        @gamma, kernel coefficient, where 'auto' is 1 / n_features.
+        @components, number of observations sampled, to approximate the
+            kernel.
+
+        '''
+
+        alpha = 1.0 / (penalty * max(n_samples, 1))
+        epochs = int(min(1000, max(5, numpy.ceil(1e6 / max(n_samples, 1)))))
+        self.regression = regression
+        self.kernel = kernel
+        self.gamma = gamma
+        self.components = components
+        self.feature_map = None
+        self.scaler = StandardScaler()
+
+        if regression:
+            self.estimator = SGDRegressor(
+                loss='epsilon_insensitive',
+                alpha=alpha,
+                max_iter=epochs,
+                tol=1e-3,
+                average=True
+            )
+        else:
+            self.estimator = SGDClassifier(
+                loss='modified_huber',
+                alpha=alpha,
+                max_iter=epochs,
+                tol=1e-3,
+                average=True
+            )
+
+    @property
+    def classes_(self):
+        '''
+
+        This property returns the classes of the svm model.
+
+        '''
+
+        return self.estimator.classes_
+
+    def fit(self, X, y):
+        '''
+
+        This method fits the model (along with the kernel mapping, and
+        scaling), against the supplied observations.
+
+        '''
+
+        X = numpy.asarray(X, dtype=numpy.float64)
+
+        if self.kernel != 'linear':
+            if self.gamma == 'auto':
+                gamma = 1.0 / X.shape[1]
+            else:
+                gamma = float(self.gamma)
+
+            self.feature_map = Nystroem(
+                kernel=self.kernel,
+                gamma=gamma,
+                coef0=0.0,
+                degree=3,
+                n_components=min(self.components, X.shape[0])
+            )
+            X = self.feature_map.fit_transform(X)
+
+        self.scaler.fit(X)
+        self.estimator.fit(self.scaler.transform(X), y)
+        return self
+
+    def transform(self, X):
+        '''
+
+        This method maps, and scales the supplied observations, consistent
+        with the observations supplied to 'fit'.
+
+        '''
+
+        X = numpy.asarray(X, dtype=numpy.float64)
+        if self.feature_map is not None:
+            X = self.feature_map.transform(X)
+
+        return self.scaler.transform(X)
+
+    def partial_fit(self, X, y, epochs=1):
+        '''
+
+        This method updates the model, using only the supplied observations,
+        with 'epochs' passes over them.
+
+        Note: labels which the svm model was not fit against, cannot be
+              supplied.
+
+        '''
+
+        X = self.transform(X)
+        for epoch in range(epochs):
+            self.estimator.partial_fit(X, y)
+
+        return self
+
+    def predict(self, X):
+        '''
+
+        This method returns the prediction, for each supplied observation.
+
+        '''
+
+        return self.estimator.predict(self.transform(X))
+
+    def predict_proba(self, X):
+        '''
+
+        This method returns the probability of each class, for each supplied
+        observation.
+
+        '''
+
+        return self.estimator.predict_proba(self.transform(X))
+
+    def decision_function(self, X):
+        '''
+
+        This method returns the decision function, for each supplied
+        observation.
+
+        '''
+
+        return self.estimator.decision_function(self.transform(X))
+
+    def score(self, X, y):
+        '''
+
+        This method returns the coefficient of determination (svr), or the
+        mean accuracy (svm), of the supplied observations.
+
+        '''
+
+        return self.estimator.score(self.transform(X), y)
+
+
+# serializable model type (see 'brain/converter/model.py')
+register(OnlineSV)
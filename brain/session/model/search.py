@@ -0,0 +1,217 @@
+#!/usr/bin/python
+
+'''
+
+This file searches the sv hyperparameters, then generates the best sv model.
+
+'''
+
+import json
+import numpy
+from flask import current_app
+from scipy.stats import reciprocal
+from sklearn import svm, preprocessing
+from sklearn.model_selection import GridSearchCV, RandomizedSearchCV
+from brain.cache.hset import Hset
+from brain.session.model.sv import generate, get_dataset
+
+
+def search(
+    model,
+    collection,
+    settings,
+    payload,
+    list_error,
+    progress=None
+):
+
+    '''
+
+    This method cross validates an sv (i.e. svm, or svr) model, for each
+    candidate combination of the 'sv_kernel_type', 'penalty', and 'gamma'
+    settings. The dataset is loaded once, and candidates are fit in parallel,
+    across a pool of 'TRAINING_SEARCH_PROCESSES' processes. The best model is
+    then generated, and cached, along with the leaderboard of every candidate.
+
+    @settings, the 'model_generate' properties, where the 'search' property
+        is either:
+
+        - grid, every combination of the supplied 'sv_kernel_type[]',
+          'penalty[]', and 'gamma[]' values.
+        - random, 'TRAINING_SEARCH_ITERATIONS' combinations, where 'penalty[]',
+          and 'gamma[]' are [minimum, maximum] ranges, sampled uniformly on a
+          log scale.
+
+        The single 'sv_kernel_type', 'penalty', and 'gamma' properties are
+        used, when the corresponding list is not supplied.
+
+    @progress, optional callback, supplied the completed percentage, after
+        the dataset is loaded, and after the search completes.
+
+    Note: candidates are scored by mean accuracy (svm), or the coefficient of
+          determination (svr), over 'TRAINING_SEARCH_FOLDS' folds.
+
+    '''
+
+    # local variables
+    list_model_type = current_app.config.get('MODEL_TYPE')
+    folds = current_app.config.get('TRAINING_SEARCH_FOLDS')
+    collection_adjusted = collection.lower().replace(' ', '_')
+    grid = get_grid(settings)
+
+    # load dataset: once, for every candidate
+    dataset = get_dataset(model, collection_adjusted, payload)
+    observation_labels, grouped_features, sorted_labels = dataset
+
+    if not len(grouped_features):
+        list_error.append('no observations found, within the collection')
+        return {'error': list_error, 'leaderboard': None}
+
+    if progress:
+        progress(30)
+
+    # estimator: default parameters, replaced by each candidate
+    if model == list_model_type[0]:
+        labels = preprocessing.LabelEncoder().fit_transform(observation_labels)
+        folds = min(folds, numpy.bincount(labels).min())
+        estimator = svm.SVC()
+    else:
+        labels = numpy.asarray(observation_labels, dtype=numpy.float64)
+        folds = min(folds, len(labels))
+        estimator = svm.SVR()
+
+    if folds < 2:
+        list_error.append(
+            'search requires at least 2 observations, of each label'
+        )
+        return {'error': list_error, 'leaderboard': None}
+
+    # cross validate candidates
+    options = {
+        'cv': folds,
+        'n_jobs': current_app.config.get('TRAINING_SEARCH_PROCESSES'),
+        'refit': False,
+        'iid': False,
+        'error_score': numpy.nan
+    }
+
+    if settings['search'] == 'random':
+        searcher = RandomizedSearchCV(
+            estimator,
+            {
+                'kernel': grid['kernel'],
+                'C': get_distribution(grid['C']),
+                'gamma': get_distribution(grid['gamma']),
+            },
+            n_iter=current_app.config.get('TRAINING_SEARCH_ITERATIONS'),
+            **options
+        )
+    else:
+        searcher = GridSearchCV(estimator, grid, **options)
+
+    searcher.fit(numpy.asarray(grouped_features, dtype=numpy.float64), labels)
+    leaderboard = get_leaderboard(searcher.cv_results_)
+
+    if progress:
+        progress(80)
+
+    # generate, and cache best model
+    best = leaderboard[0]
+    if best['mean_score'] is None:
+        list_error.append('no search candidate could be fit')
+        return {'error': list_error, 'leaderboard': leaderboard}
+
+    result = generate(
+        model,
+        best['sv_kernel_type'],
+        collection,
+        best['penalty'],
+        best['gamma'],
+        payload,
+        list_error,
+        dataset=dataset
+    )
+
+    Hset().cache(
+        model + '_leaderboard',
+        collection_adjusted,
+        json.dumps(leaderboard)
+    )
+
+    return {'error': result['error'], 'leaderboard': leaderboard}
+
+
+def get_grid(settings):
+    '''
+
+    This method returns the candidate values of each hyperparameter, from the
+    supplied 'model_generate' properties. A single submitted value (i.e. from
+    the web-interface) is a single candidate.
+
+    '''
+
+    candidates = {}
+    for key, name, default in [
+        ('kernel', 'sv_kernel_type', settings['sv_kernel_type']),
+        ('C', 'penalty', settings.get('penalty', 1.0)),
+        ('gamma', 'gamma', settings.get('gamma', 'auto'))
+    ]:
+        values = settings.get(name + '[]', [default])
+        if not isinstance(values, list):
+            values = [values]
+
+        if key == 'kernel':
+            candidates[key] = [str(x) for x in values]
+        else:
+            candidates[key] = [x if x == 'auto' else float(x) for x in values]
+
+    return candidates
+
+
+def get_distribution(values):
+    '''
+
+    This method returns a log-uniform distribution, between the minimum, and
+    maximum of the supplied values, or the values, when only a single value
+    (i.e. 'auto') is supplied.
+
+    '''
+
+    if len(values) < 2 or 'auto' in values:
+        return values
+
+    return reciprocal(min(values), max(values))
+
+
+def get_leaderboard(results):
+    '''
+
+    This method returns each candidate, ordered by rank, along with the mean,
+    and standard deviation of its scores, and its mean fit time.
+
+    Note: candidates which failed to fit, are ranked last, with a null score.
+
+    '''
+
+    leaderboard = []
+    for i, params in enumerate(results['params']):
+        score = results['mean_test_score'][i]
+        leaderboard.append({
+            'sv_kernel_type': params['kernel'],
+            'penalty': float(params['C']),
+            'gamma': params['gamma'] if params['gamma'] == 'auto'
+            else float(params['gamma']),
+            'mean_score': None if numpy.isnan(score) else float(score),
+            'std_score': None if numpy.isnan(score)
+            else float(results['std_test_score'][i]),
+            'mean_fit_time': float(results['mean_fit_time'][i]),
+        })
+
+    leaderboard.sort(
+        key=lambda x: (x['mean_score'] is None, -(x['mean_score'] or 0))
+    )
+
+    for rank, candidate in enumerate(leaderboard):
+        candidate['rank'] = rank + 1
+
+    return leaderboard
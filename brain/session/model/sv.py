@@ -7,11 +7,20 @@ This file generates an sv model.
 '''
 
 from flask import current_app
-from brain.database.dataset import Collection
+from brain.database.dataset import Collection, get_columnar
+from brain.converter.columnar import decode
 from brain.cache.hset import Hset
 from brain.cache.model import Model
+from brain.cache.fingerprint import Fingerprint
+from brain.session.model.online import OnlineSV
+from brain.session.model.fingerprint import (
+    get_documents,
+    get_content,
+    get_fingerprint
+)
 from sklearn import svm, preprocessing
 import json
+import numpy
 
 
 def generate(
@@ -21,7 +30,10 @@ def generate(
     penalty,
     gamma,
     payload,
-    list_error
+    list_error,
+    progress=None,
+    dataset=None,
+    approximate=False
 ):
 
     '''
@@ -35,46 +47,67 @@ def generate(
         observation.
     @encoded_labels, observation labels (dependent variable labels),
         encoded into a unique integer representation.
+    @progress, optional callback, supplied the completed percentage, after
+        the dataset is loaded, and after the model is fit.
+    @dataset, optional tuple (see 'get_dataset'), previously loaded from the
+        supplied collection, otherwise the dataset is loaded.
+    @approximate, generates an 'OnlineSV' model, which approximates the
+        kernel using 'TRAINING_APPROXIMATE_COMPONENTS' components, rather
+        than an exact model, which scales quadratically with the number of
+        observations.
+
+    Note: svm models are fit without probability estimates, which are
+          calibrated separately, when first predicted (see 'calibration.py').
+
+    Note: the model is not regenerated, when the cached model of the supplied
+          collection, or of another collection with identical observations,
+          has the same fingerprint (see 'fingerprint.py').
 
     '''
 
     # local variables
-    sorted_labels = False
-    label_encoder = preprocessing.LabelEncoder()
     list_model_type = current_app.config.get('MODEL_TYPE')
     collection_adjusted = collection.lower().replace(' ', '_')
-    cursor = Collection()
 
-    # get datasets
-    datasets = cursor.query(
-        collection_adjusted,
-        'aggregate',
-        payload
-    )
+    fingerprint = Fingerprint(model)
 
-    # restructure dataset into arrays
-    observation_labels = []
-    grouped_features = []
+    # dataset content: unchanged, while the count, and greatest id are unchanged
+    record = fingerprint.get(collection_adjusted)
+    documents = get_documents(collection_adjusted) if dataset is None else None
 
-    for dataset in datasets['result']:
-        for observation in dataset['dataset']:
-            indep_variables = observation['independent-variables']
+    if record and documents and record['documents'] == documents:
+        content = record['content']
+    else:
+        if dataset is None:
+            dataset = get_dataset(model, collection_adjusted, payload)
+        content = get_content(model, dataset)
 
-            for features in indep_variables:
-                # svm case
-                if model == list_model_type[0]:
-                    observation_labels.append(observation['dependent-variable'])
-                    sorted_features = [v for k, v in sorted(features.items())]
+    # fingerprint: return the cached model, when already generated
+    record = {
+        'fingerprint': get_fingerprint(
+            content,
+            model,
+            kernel_type,
+            penalty,
+            gamma,
+            approximate and current_app.config.get(
+                'TRAINING_APPROXIMATE_COMPONENTS'
+            )
+        ),
+        'documents': documents,
+        'content': content
+    }
 
-                # svr case
-                elif model == list_model_type[1]:
-                    observation_labels.append(float(observation['dependent-variable']))
-                    sorted_features = [float(v) for k, v in sorted(features.items())]
+    if fingerprint.reuse(collection, record):
+        return {'error': list_error}
 
-                grouped_features.append(sorted_features)
+    if dataset is None:
+        dataset = get_dataset(model, collection_adjusted, payload)
 
-                if not sorted_labels:
-                    sorted_labels = [k for k, v in sorted(features.items())]
+    observation_labels, grouped_features, sorted_labels = dataset
+
+    if progress:
+        progress(30)
 
     # generate svm model
     if model == list_model_type[0]:
@@ -84,7 +117,17 @@ def generate(
         encoded_labels = label_encoder.transform(observation_labels)
 
         # create model
-        clf = svm.SVC(kernel=kernel_type, C=penalty, gamma=gamma, probability=True)
+        if approximate:
+            clf = OnlineSV(
+                False,
+                penalty,
+                len(grouped_features),
+                kernel_type,
+                gamma,
+                current_app.config.get('TRAINING_APPROXIMATE_COMPONENTS')
+            )
+        else:
+            clf = svm.SVC(kernel=kernel_type, C=penalty, gamma=gamma)
 
         # cache encoded labels
         Model(label_encoder).cache(model + '_labels', collection_adjusted)
@@ -95,7 +138,17 @@ def generate(
     # generate svr model
     elif model == list_model_type[1]:
         # create model
-        clf = svm.SVR(kernel=kernel_type, C=penalty, gamma=gamma)
+        if approximate:
+            clf = OnlineSV(
+                True,
+                penalty,
+                len(grouped_features),
+                kernel_type,
+                gamma,
+                current_app.config.get('TRAINING_APPROXIMATE_COMPONENTS')
+            )
+        else:
+            clf = svm.SVR(kernel=kernel_type, C=penalty, gamma=gamma)
 
         # fit model
         clf.fit(grouped_features, observation_labels)
@@ -108,6 +161,9 @@ def generate(
             r2
         )
 
+    if progress:
+        progress(90)
+
     # cache model
     Model(clf).cache(model + '_model', collection_adjusted)
 
@@ -118,5 +174,165 @@ def generate(
         json.dumps(sorted_labels)
     )
 
+    # fingerprint of the cached model
+    fingerprint.set(collection, record)
+
     # return error(s) if exists
     return {'error': list_error}
+
+
+def get_dataset(model, collection, payload):
+    '''
+
+    This method returns the observation labels, the matrix of features, and
+    the sorted feature labels, of the supplied (adjusted) collection.
+
+    '''
+
+    # local variables
+    list_model_type = current_app.config.get('MODEL_TYPE')
+    cursor = Collection()
+
+    # get columnar dataset: only when the columnar companion is complete
+    columns = None
+    manifest = cursor.query(
+        get_columnar(collection),
+        'count_documents',
+        {'_id': 'manifest', 'complete': True}
+    )
+
+    if manifest['result']:
+        blocks = cursor.query(
+            get_columnar(collection),
+            'find',
+            {'upload_id': {'$exists': True}}
+        )
+        columns = decode(blocks['result'] or [])
+
+    # restructure dataset into arrays: columnar labels are a float64 vector,
+    #     only for regression model types.
+    if columns and (
+        (model == list_model_type[1]) ==
+        isinstance(columns['labels'], numpy.ndarray)
+    ):
+        return columns['labels'], columns['features'], columns['feature_names']
+
+    return flatten(model, list_model_type, cursor, collection, payload)
+
+
+def flatten(model, list_model_type, cursor, collection, payload):
+    '''
+
+    This method returns the observation labels, the matrix of features, and
+    the sorted feature labels, of the supplied (adjusted) collection. Each
+    observation is unwound within the aggregation pipeline, so only the label,
+    and features of each observation are sent, then streamed into arrays,
+    preallocated from the observation count.
+
+    @payload, the aggregation pipeline, selecting the dataset documents,
+        which is extended by the unwinding stages.
+
+    Note: this is used for collections, without a complete columnar
+          representation (see 'brain.converter.columnar').
+
+    '''
+
+    # local variables
+    regression = model == list_model_type[1]
+
+    # observation count: computed by the database
+    response = cursor.query(
+        collection,
+        'aggregate',
+        payload + [
+            {'$unwind': '$dataset'},
+            {'$group': {
+                '_id': None,
+                'count': {'$sum': {'$size': '$dataset.independent-variables'}}
+            }}
+        ]
+    )
+    count = sum(x['count'] for x in response['result'] or [])
+
+    # observations: one label, and feature dict per row
+    batches = cursor.stream(
+        collection,
+        payload + [
+            {'$unwind': '$dataset'},
+            {'$unwind': '$dataset.independent-variables'}
+        ],
+        {
+            '_id': 0,
+            'label': '$dataset.dependent-variable',
+            'features': '$dataset.independent-variables'
+        }
+    )
+
+    sorted_labels = False
+    labels = numpy.empty(count, dtype=numpy.float64 if regression else object)
+    features = None
+    row = 0
+
+    for batch in batches:
+        for observation in batch:
+            if not sorted_labels:
+                sorted_labels = sorted(observation['features'].keys())
+                features = numpy.empty((count, len(sorted_labels)))
+
+            # observations appended since counted
+            if row == len(labels):
+                labels = numpy.resize(labels, max(1, 2 * row))
+                features = numpy.resize(
+                    features,
+                    (len(labels), len(sorted_labels))
+                )
+
+            labels[row] = observation['label']
+            features[row] = [
+                v for k, v in sorted(observation['features'].items())
+            ]
+            row += 1
+
+    if features is None:
+        return [], [], sorted_labels
+
+    return labels[:row], features[:row], sorted_labels
+
+
+def restructure(model, list_model_type, datasets):
+    '''
+
+    This method restructures the supplied dataset documents, into a list of
+    observation labels, a matrix of features, and the sorted feature labels.
+
+    Note: this is used by incremental updates, which restructure only the
+          appended dataset documents (see 'incremental.py').
+
+    '''
+
+    # local variables
+    sorted_labels = False
+    observation_labels = []
+    grouped_features = []
+
+    for dataset in datasets['result']:
+        for observation in dataset['dataset']:
+            indep_variables = observation['independent-variables']
+
+            for features in indep_variables:
+                # svm case
+                if model == list_model_type[0]:
+                    observation_labels.append(observation['dependent-variable'])
+                    sorted_features = [v for k, v in sorted(features.items())]
+
+                # svr case
+                elif model == list_model_type[1]:
+                    observation_labels.append(float(observation['dependent-variable']))
+                    sorted_features = [float(v) for k, v in sorted(features.items())]
+
+                grouped_features.append(sorted_features)
+
+                if not sorted_labels:
+                    sorted_labels = [k for k, v in sorted(features.items())]
+
+    return observation_labels, grouped_features, sorted_labels
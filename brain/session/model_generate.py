@@ -12,6 +12,8 @@ into respective database table(s), which later can be retrieved within
 
 from brain.session.base import Base
 from brain.session.model.sv import generate
+from brain.session.model.incremental import update
+from brain.session.model.search import search
 
 
 class ModelGenerate(Base):
@@ -44,14 +46,18 @@ class ModelGenerate(Base):
         self.collection = premodel_settings['collection']
         self.kernel = str(premodel_settings['sv_kernel_type'])
         self.list_error = []
+        self.leaderboard = None
 
-    def generate_model(self):
+    def generate_model(self, progress=None):
         '''
 
         This method generates a corresponding model, using a chosen dataset
         from the SQL database. The resulting model is stored into a NoSQL
         datastore.
 
+        @progress, optional callback, supplied the completed percentage of the
+            model generation.
+
         '''
 
         # local variables
@@ -71,15 +77,45 @@ class ModelGenerate(Base):
             else:
                 gamma = 'auto'
 
-            result = generate(
-                model_type,
-                self.kernel,
-                self.collection,
-                penalty,
-                gamma,
-                payload,
-                self.list_error
-            )
+            # approximate: approximate the kernel, rather than an exact model
+            approximate = self.premodel_data['properties'].get('approximate') == 'True'
+
+            # search: cross validate each candidate, then generate the best
+            if self.premodel_data['properties'].get('search'):
+                result = search(
+                    model_type,
+                    self.collection,
+                    self.premodel_data['properties'],
+                    payload,
+                    self.list_error,
+                    progress
+                )
+                self.leaderboard = result['leaderboard']
+
+            # incremental: update the online model, using appended documents
+            elif self.premodel_data['properties'].get('incremental') == 'True':
+                result = update(
+                    model_type,
+                    self.kernel,
+                    self.collection,
+                    penalty,
+                    gamma,
+                    self.list_error,
+                    progress
+                )
+
+            else:
+                result = generate(
+                    model_type,
+                    self.kernel,
+                    self.collection,
+                    penalty,
+                    gamma,
+                    payload,
+                    self.list_error,
+                    progress,
+                    approximate=approximate
+                )
 
         # store any errors
         if result and result['error']:
@@ -93,3 +129,13 @@ class ModelGenerate(Base):
         '''
 
         return self.list_error
+
+    def return_leaderboard(self):
+        '''
+
+        This method returns the ranked candidates, of a 'search' session,
+        otherwise None.
+
+        '''
+
+        return self.leaderboard
@@ -43,6 +43,9 @@ class ModelPredict(Base):
         @self.predictors, a list of arguments (floats) required to make a
             corresponding prediction, against the respective model.
 
+        @self.batch, indicates the supplied 'prediction_input[]' is a matrix,
+            where each nested list is a separate observation to predict.
+
         Note: the superclass constructor expects the same 'prediction_input'
               argument.
 
@@ -53,6 +56,10 @@ class ModelPredict(Base):
         self.prediction_settings = self.prediction_input['properties']
         self.collection = self.prediction_settings['collection']
         self.predictors = self.prediction_settings['prediction_input[]']
+        self.batch = bool(
+            self.predictors and
+            isinstance(self.predictors[0], (list, tuple))
+        )
 
     def predict(self):
         '''
@@ -65,4 +72,9 @@ class ModelPredict(Base):
 
         # get model type
         model_type = ModelType().get_model_type(self.collection)['result']
-        return predict(model_type, self.collection, self.predictors)
+        return predict(
+            model_type,
+            self.collection,
+            self.predictors,
+            self.batch
+        )
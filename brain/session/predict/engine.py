@@ -0,0 +1,343 @@
+#!/usr/bin/python
+
+'''
+
+This file computes sv (i.e. svm, or svr) predictions, directly from the arrays
+of a fitted model, using batched numpy operations, rather than libsvm.
+
+'''
+
+import numpy
+from sklearn.utils.multiclass import _ovr_decision_function
+
+# arrays required to score a fitted model
+ARRAYS = [
+    'support_vectors_',
+    'n_support_',
+    '_dual_coef_',
+    '_intercept_',
+    'probA_',
+    'probB_'
+]
+
+# maximum kernel matrix size (in elements), computed at once
+KERNEL_BLOCK = 4194304
+
+# probability bounds, and tolerance, consistent with libsvm
+MIN_PROB = 1e-7
+
+
+class Engine(object):
+    '''
+
+    This class provides an interface to score observations, against a fitted
+    svm (SVC), or svr (SVR) model.
+
+    Each pairwise (one-vs-one) decision value is computed, consistent with
+    libsvm. Linear models are collapsed into a single weight vector per pair
+    of classes. Other kernels are evaluated against the support vectors, one
+    block of observations at a time.
+
+    Note: results match the corresponding sklearn methods, within floating
+          point tolerance.
+
+    Note: this class explicitly inherits the 'new-style' class.
+
+    '''
+
+    def __init__(self, arrays, params, classes=None):
+        '''
+
+        This constructor precomputes the terms, shared by every prediction.
+
+        @arrays, the 'ARRAYS' of the fitted model, keyed by attribute name.
+        @params, the kernel parameters: 'kernel', '_gamma', 'degree', and
+            'coef0'.
+        @classes, the 'classes_' of a classifier, otherwise None.
+
+        '''
+
+        self.kernel = str(params['kernel'])
+        self.gamma = float(params['_gamma'])
+        self.degree = params['degree']
+        self.coef0 = float(params['coef0'])
+        self.classes_ = classes
+        self.support_vectors = arrays['support_vectors_']
+        self.intercept = arrays['_intercept_']
+        self.prob_a = arrays['probA_']
+        self.prob_b = arrays['probB_']
+
+        # pairwise coefficients: one column per pair of classes
+        dual_coef = arrays['_dual_coef_']
+        if classes is None:
+            self.coef = dual_coef.T
+        else:
+            self.coef = self.get_pairwise_coef(dual_coef, arrays['n_support_'])
+
+        # linear: single weight vector per pair
+        if self.kernel == 'linear':
+            self.weights = self.support_vectors.T.dot(self.coef)
+
+        # rbf: -gamma * |x - sv|^2 = 2 * gamma * x.sv - gamma * (|x|^2 + |sv|^2)
+        elif self.kernel == 'rbf':
+            self.sv_scaled = numpy.ascontiguousarray(
+                (2 * self.gamma * self.support_vectors).T
+            )
+            self.sv_norm = self.gamma * numpy.einsum(
+                'ij,ij->i',
+                self.support_vectors,
+                self.support_vectors
+            )
+
+    @property
+    def calibrated(self):
+        '''
+
+        This property indicates whether the platt parameters, required by
+        'predict_proba', are available.
+
+        '''
+
+        return self.prob_a is not None and len(self.prob_a) > 0
+
+    def set_calibration(self, prob_a, prob_b):
+        '''
+
+        This method sets the platt parameters, computed separately from the
+        model fit (see 'brain/session/model/calibration.py').
+
+        '''
+
+        self.prob_a = numpy.asarray(prob_a, dtype=numpy.float64)
+        self.prob_b = numpy.asarray(prob_b, dtype=numpy.float64)
+
+    def get_pairwise_coef(self, dual_coef, n_support):
+        '''
+
+        This method returns the coefficient of each support vector, for each
+        pair (i, j) of classes, where i < j, ordered consistent with libsvm.
+        Support vectors which do not belong to either class, are zero.
+
+        '''
+
+        n_class = len(n_support)
+        start = numpy.concatenate([[0], numpy.cumsum(n_support)])
+        coef = numpy.zeros((dual_coef.shape[1], n_class * (n_class - 1) // 2))
+
+        p = 0
+        for i in range(n_class):
+            for j in range(i + 1, n_class):
+                si = slice(start[i], start[i + 1])
+                sj = slice(start[j], start[j + 1])
+                coef[si, p] = dual_coef[j - 1, si]
+                coef[sj, p] = dual_coef[i, sj]
+                p += 1
+
+        return coef
+
+    def get_kernel(self, X):
+        '''
+
+        This method returns the kernel matrix, between the supplied
+        observations, and the support vectors.
+
+        '''
+
+        if self.kernel == 'rbf':
+            K = X.dot(self.sv_scaled)
+            K -= self.gamma * numpy.einsum('ij,ij->i', X, X)[:, numpy.newaxis]
+            K -= self.sv_norm
+            numpy.minimum(K, 0, out=K)
+            return numpy.exp(K, out=K)
+
+        K = X.dot(self.support_vectors.T)
+
+        if self.kernel == 'poly':
+            K *= self.gamma
+            K += self.coef0
+            return numpy.power(K, self.degree, out=K)
+
+        elif self.kernel == 'sigmoid':
+            K *= self.gamma
+            K += self.coef0
+            return numpy.tanh(K, out=K)
+
+        return K
+
+    def get_decision(self, X):
+        '''
+
+        This method returns the pairwise (libsvm) decision values, of the
+        supplied observations.
+
+        '''
+
+        X = numpy.asarray(X, dtype=numpy.float64)
+
+        if self.kernel == 'linear':
+            return X.dot(self.weights) + self.intercept
+
+        # kernel matrix: computed one block of observations at a time
+        decision = numpy.empty((X.shape[0], self.coef.shape[1]))
+        block = max(1, KERNEL_BLOCK // max(1, len(self.support_vectors)))
+
+        for start in range(0, X.shape[0], block):
+            K = self.get_kernel(X[start:start + block])
+            decision[start:start + block] = K.dot(self.coef) + self.intercept
+
+        return decision
+
+    def predict(self, X):
+        '''
+
+        This method returns the prediction, for each supplied observation.
+        Classifiers select the class with the most pairwise votes.
+
+        '''
+
+        decision = self.get_decision(X)
+        if self.classes_ is None:
+            return decision[:, 0]
+
+        n_class = len(self.classes_)
+        votes = numpy.zeros((decision.shape[0], n_class), dtype=numpy.intp)
+
+        p = 0
+        for i in range(n_class):
+            for j in range(i + 1, n_class):
+                positive = decision[:, p] > 0
+                votes[:, i] += positive
+                votes[:, j] += ~positive
+                p += 1
+
+        return self.classes_[numpy.argmax(votes, axis=1)]
+
+    def decision_function(self, X):
+        '''
+
+        This method returns the decision function, for each supplied
+        observation, using the default 'ovr' shape for multiclass models.
+
+        '''
+
+        decision = self.get_decision(X)
+        if len(self.classes_) == 2:
+            return -decision.ravel()
+
+        return _ovr_decision_function(
+            decision < 0,
+            -decision,
+            len(self.classes_)
+        )
+
+    def predict_proba(self, X):
+        '''
+
+        This method returns the probability of each class, for each supplied
+        observation, using the pairwise coupling method of libsvm.
+
+        '''
+
+        decision = self.get_decision(X)
+        n_class = len(self.classes_)
+
+        # pairwise probability: platt scaling
+        f = decision * self.prob_a + self.prob_b
+        pairwise = numpy.where(
+            f >= 0,
+            numpy.exp(-numpy.abs(f)) / (1 + numpy.exp(-numpy.abs(f))),
+            1 / (1 + numpy.exp(-numpy.abs(f)))
+        )
+        pairwise = numpy.clip(pairwise, MIN_PROB, 1 - MIN_PROB)
+
+        # r[:, i, j], probability of class i, given class i, or j
+        r = numpy.zeros((decision.shape[0], n_class, n_class))
+        p = 0
+        for i in range(n_class):
+            for j in range(i + 1, n_class):
+                r[:, i, j] = pairwise[:, p]
+                r[:, j, i] = 1 - pairwise[:, p]
+                p += 1
+
+        return self.couple(r)
+
+    def couple(self, r):
+        '''
+
+        This method combines the supplied pairwise probabilities, into the
+        probability of each class, for each observation (i.e. libsvm
+        'multiclass_probability').
+
+        '''
+
+        n, k = r.shape[0], r.shape[1]
+
+        # Q[t][t] = sum(r[j][t]^2), Q[t][j] = -r[j][t] * r[t][j]
+        Q = -r.transpose(0, 2, 1) * r
+        diagonal = numpy.einsum('nij,nij->nj', r, r)
+        index = numpy.arange(k)
+        Q[:, index, index] = diagonal
+
+        prob = numpy.full((n, k), 1.0 / k)
+        active = numpy.ones(n, dtype=bool)
+        eps = 0.005 / k
+
+        for iteration in range(max(100, k)):
+            Qp = numpy.einsum('nij,nj->ni', Q, prob)
+            pQp = numpy.einsum('ni,ni->n', prob, Qp)
+
+            active &= numpy.abs(Qp - pQp[:, numpy.newaxis]).max(axis=1) >= eps
+            if not active.any():
+                break
+
+            rows = numpy.nonzero(active)[0]
+            p, q, qp, pqp = prob[rows], Q[rows], Qp[rows], pQp[rows]
+
+            for t in range(k):
+                diff = (-qp[:, t] + pqp) / q[:, t, t]
+                p[:, t] += diff
+                pqp = (
+                    (pqp + diff * (diff * q[:, t, t] + 2 * qp[:, t])) /
+                    (1 + diff) / (1 + diff)
+                )
+                qp = (qp + diff[:, numpy.newaxis] * q[:, t, :]) / \
+                    (1 + diff)[:, numpy.newaxis]
+                p /= (1 + diff)[:, numpy.newaxis]
+
+            prob[rows] = p
+
+        return prob
+
+
+def get_engine(clf):
+    '''
+
+    This function returns the engine, for the supplied model, which is either
+    a 'CompactModel' (see 'brain/converter/compact.py'), or a fitted sklearn
+    model. The engine is stored on the model, so it is created once per
+    (cached) model. Other models are returned unchanged.
+
+    '''
+
+    # models without support vectors (i.e. 'OnlineSV') are scored directly
+    if not hasattr(clf, 'arrays') and not hasattr(clf, 'support_vectors_'):
+        return clf
+
+    engine = getattr(clf, 'engine', None)
+    if engine is None:
+        if hasattr(clf, 'arrays'):
+            arrays = clf.arrays
+            params = clf.params
+        else:
+            arrays = {name: getattr(clf, name) for name in ARRAYS}
+            params = {
+                'kernel': clf.kernel,
+                '_gamma': clf._gamma,
+                'degree': clf.degree,
+                'coef0': clf.coef0
+            }
+
+        engine = Engine(arrays, params, getattr(clf, 'classes_', None))
+        clf.engine = engine
+
+    return engine
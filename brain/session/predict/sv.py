@@ -7,12 +7,15 @@ levels, associated with corresponding predictions.
 
 '''
 
+import json
+import numpy
 from flask import current_app
-from brain.cache.hset import Hset
 from brain.cache.model import Model
+from brain.session.predict.engine import get_engine
+from brain.session.model.calibration import load
 
 
-def predict(model, collection, predictors):
+def predict(model, collection, predictors, batch=False):
     '''
 
     This method generates an sv (i.e. svm, or svr) prediction using the
@@ -33,8 +36,23 @@ def predict(model, collection, predictors):
 
     @clf, decoded model, containing several methods (i.e. predict)
 
+    @engine, scores the observations directly from the arrays of 'clf' (see
+        'engine.py'), rather than through libsvm.
+
     @predictors, a list of arguments (floats) required to make an SVM
-        prediction, against the respective svm model.
+        prediction, against the respective svm model. When 'batch' is set,
+        this is a matrix, where each nested list is a single observation.
+
+    @batch, indicates 'predictors' is a matrix of observations. Each estimator
+        method is then called once, against the entire matrix, and results
+        are returned as arrays, ordered by observation.
+
+    Note: the model, along with the labels, and calibration (svm), or r2
+          (svr), and the feature labels, are uncached using a single redis
+          round trip.
+
+    Note: 'probability' is an empty list, until the probability calibration of
+          the svm model is computed (see 'brain/session/model/calibration.py').
 
     '''
 
@@ -44,33 +62,94 @@ def predict(model, collection, predictors):
     collection_adjusted = collection.lower().replace(' ', '_')
     list_model_type = current_app.config.get('MODEL_TYPE')
 
-    # get necessary model
-    clf = Model().uncache(
-        model + '_model',
-        collection_adjusted
-    )
+    # observation matrix: single prediction is a matrix with one row
+    try:
+        if batch:
+            observations = numpy.asarray(predictors, dtype=numpy.float64)
+        else:
+            observations = numpy.asarray([predictors], dtype=numpy.float64)
+
+    except (TypeError, ValueError), error:
+        return {'result': None, 'model': model, 'error': [str(error)]}
+
+    if observations.ndim != 2 or not observations.size:
+        return {
+            'result': None,
+            'model': model,
+            'error': ['prediction input must be a non-empty matrix']
+        }
+
+    # get necessary model(s), and values: single cache round trip
+    models = [(model + '_model', collection_adjusted)]
+    values = [(model + '_feature_labels', collection)]
+
+    if model == list_model_type[0]:
+        models.append((model + '_labels', collection_adjusted))
+        values.append((model + '_calibration', collection_adjusted))
+    elif model == list_model_type[1]:
+        values.append((model + '_r2', collection_adjusted))
+
+    list_model, list_value = Model().uncache_many(models, values)
+    clf = list_model[0]
+
+    if clf is None:
+        return {
+            'result': None,
+            'model': model,
+            'error': ['no model cached for \'' + collection + '\'']
+        }
+
+    if (
+        list_value[0] and
+        observations.shape[1] != len(json.loads(list_value[0]))
+    ):
+        return {
+            'result': None,
+            'model': model,
+            'error': [
+                'prediction input requires ' +
+                str(len(json.loads(list_value[0]))) + ' features'
+            ]
+        }
+
+    engine = get_engine(clf)
 
     # case 1: return svm prediction, and confidence level
     if model == list_model_type[0]:
         # perform prediction, and return the result
-        prediction = clf.predict([predictors])
-
-        encoded_labels = Model().uncache(
-            model + '_labels',
-            collection_adjusted
-        )
+        prediction = engine.predict(observations)
+        encoded_labels = list_model[1]
 
         textual_label = encoded_labels.inverse_transform(prediction)
-        probability = clf.predict_proba([predictors])
-        decision_function = clf.decision_function([predictors])
-        classes = [encoded_labels.inverse_transform(x) for x in clf.classes_]
+        if load(engine, model, collection, list_value[1]):
+            probability = engine.predict_proba(observations)
+        decision_function = engine.decision_function(observations).reshape(
+            observations.shape[0],
+            -1
+        )
+        classes = encoded_labels.inverse_transform(engine.classes_)
+
+        # batch: one array per result, ordered by observation
+        if batch:
+            return {
+                'result': textual_label.tolist(),
+                'model': model,
+                'confidence': {
+                    'classes': classes.tolist(),
+                    'probability': [] if probability is None
+                    else probability.tolist(),
+                    'decision_function': decision_function.tolist()
+                },
+                'error': None
+            }
 
         return {
             'result': textual_label[0],
             'model': model,
             'confidence': {
                 'classes': list(classes),
-                'probability': list(probability[0]),
+                'probability': [] if probability is None
+                else list(probability[0]),
                 'decision_function': list(decision_function[0])
             },
             'error': None
@@ -79,12 +158,20 @@ def predict(model, collection, predictors):
     # case 2: return svr prediction, and confidence level
     elif model == list_model_type[1]:
         # perform prediction, and return the result
-        prediction = (clf.predict([predictors]))
-
-        r2 = Hset().uncache(
-            model + '_r2',
-            collection_adjusted
-        )['result']
+        prediction = engine.predict(observations)
+
+        r2 = list_value[1]
+
+        # batch: one array per result, ordered by observation
+        if batch:
+            return {
+                'result': [str(x) for x in prediction],
+                'model': model,
+                'confidence': {
+                    'score': r2
+                },
+                'error': None
+            }
 
         return {
             'result': str(prediction[0]),
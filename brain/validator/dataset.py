@@ -6,6 +6,8 @@ This script performs validation on corresponding dataset(s).
 
 '''
 
+import numpy
+from itertools import chain
 from voluptuous import Schema, Required, All, Any, Length
 from voluptuous.humanize import validate_with_humanized_errors
 
@@ -20,14 +22,18 @@ class Validator(object):
 
     '''
 
-    def __init__(self):
+    def __init__(self, max_errors=None):
         '''
 
         This constructor saves a subset of the passed-in form data.
 
+        @max_errors, the maximum number of errors reported, for each validated
+            dataset, or None for every error.
+
         '''
 
         self.list_error = []
+        self.max_errors = max_errors
 
     def validate_classification(self, data):
         '''
@@ -36,7 +42,6 @@ class Validator(object):
 
         '''
 
-        current_errors = []
         schema = Schema({
             Required('dependent-variable'): All(unicode, Length(min=1)),
             Required('independent-variables'): [{
@@ -44,19 +49,7 @@ class Validator(object):
             }],
         })
 
-        for instance in data:
-            try:
-                validate_with_humanized_errors(instance, schema)
-
-            except Exception, error:
-                split_error = str(error).splitlines()
-                current_errors.extend(split_error)
-                self.list_error.extend(split_error)
-
-        if current_errors:
-            return current_errors
-        else:
-            return False
+        return self.validate_dataset(data, schema, False)
 
     def validate_regression(self, data):
         '''
@@ -65,7 +58,6 @@ class Validator(object):
 
         '''
 
-        current_errors = []
         schema = Schema({
             Required('dependent-variable'): Any(int, float),
             Required('independent-variables'): [{
@@ -73,33 +65,130 @@ class Validator(object):
             }],
         })
 
+        return self.validate_dataset(data, schema, True)
+
+    def validate_dataset(self, data, schema, regression):
+        '''
+
+        This method validates the supplied observations, against the supplied
+        schema, and returns a list of the first 'max_errors' humanized errors,
+        or False if every observation is valid.
+
+        Each column (i.e. the dependent variables, the distinct feature labels,
+        and every feature value) is first validated at once. Only when a column
+        is invalid, are observations validated one at a time, until the first
+        'max_errors' errors are located, using the supplied schema. Therefore,
+        errors are identical to validating each observation with the schema.
+
+        '''
+
+        current_errors = []
+        if self.validate_columns(data, regression):
+            return False
+
         for instance in data:
+            if self.validate_columns([instance], regression):
+                continue
+
             try:
                 validate_with_humanized_errors(instance, schema)
 
             except Exception, error:
-                split_error = str(error).splitlines()
-                current_errors.extend(split_error)
-                self.list_error.extend(split_error)
+                current_errors.extend(str(error).splitlines())
+                if self.max_errors and len(current_errors) >= self.max_errors:
+                    current_errors = current_errors[:self.max_errors]
+                    break
+
+        self.list_error.extend(current_errors)
+        return current_errors or False
 
-        if current_errors:
-            return current_errors
-        else:
+    def validate_columns(self, data, regression):
+        '''
+
+        This method returns True, when each of the supplied observations is
+        valid, otherwise False.
+
+        @values, every feature value, coerced into a single array. The array
+            has a numeric (or boolean) dtype, only when every value is an int,
+            or float (i.e. 'Any(int, float)').
+
+        '''
+
+        try:
+            if not all(
+                isinstance(instance, dict) and
+                len(instance) == 2 and
+                isinstance(instance['independent-variables'], list)
+                for instance in data
+            ):
+                return False
+
+            # features: non-empty dict, with non-empty unicode labels
+            features = list(chain.from_iterable(
+                instance['independent-variables'] for instance in data
+            ))
+
+            if not all(isinstance(f, dict) and f for f in features):
+                return False
+
+            if not all(
+                isinstance(label, unicode) and label
+                for label in set(chain.from_iterable(features))
+            ):
+                return False
+
+            values = numpy.array(list(chain.from_iterable(
+                f.itervalues() for f in features
+            )))
+
+            if values.size and not is_numeric(values):
+                return False
+
+            # dependent variables
+            labels = [instance['dependent-variable'] for instance in data]
+            if regression:
+                return not labels or is_numeric(numpy.array(labels))
+
+            return all(
+                isinstance(label, unicode) and label
+                for label in set(labels)
+            )
+
+        except (KeyError, TypeError, ValueError, OverflowError):
             return False
 
+    def validate_values(self, values):
+        '''
+
+        This method returns a boolean array, indicating whether each supplied
+        (feature) value can be converted to a float. The values are converted
+        at once, and only converted one at a time, when any value is invalid.
+
+        '''
+
+        try:
+            numpy.array(values, dtype=numpy.float64)
+            return numpy.ones(len(values), dtype=bool)
+
+        except (TypeError, ValueError):
+            return numpy.array(
+                [self.validate_value(value) is not None for value in values],
+                dtype=bool
+            )
+
     def validate_value(self, data):
         '''
 
-        This method validates the independent variable (feature) value(s).
+        This method validates the independent variable (feature) value, and
+        returns the corresponding float, or None if the value is invalid.
 
         '''
 
         try:
             return float(data)
 
-        except Exception, error:
-            self.list_error.append(error)
-            return error
+        except (TypeError, ValueError):
+            return None
 
     def get_errors(self):
         '''
@@ -109,3 +198,14 @@ class Validator(object):
         '''
 
         return self.list_error
+
+
+def is_numeric(values):
+    '''
+
+    This function returns True, when the supplied array is a one dimensional
+    array, with a boolean, integer, or float dtype.
+
+    '''
+
+    return values.ndim == 1 and values.dtype.kind in 'biuf'
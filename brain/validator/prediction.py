@@ -0,0 +1,124 @@
+#!/usr/bin/python
+
+'''
+
+This file performs validation on stored predictions.
+
+'''
+
+from voluptuous import (
+    Schema,
+    Required,
+    Optional,
+    All,
+    Any,
+    Coerce,
+    In,
+    Range,
+    ALLOW_EXTRA
+)
+from voluptuous.humanize import validate_with_humanized_errors
+
+
+class Validator(object):
+    '''
+
+    This class provides an interface to validate predictions, before they are
+    stored.
+
+    Note: this class explicitly inherits the 'new-style' class.
+
+    '''
+
+    def __init__(self):
+        '''
+
+        This constructor is responsible for defining class variables.
+
+        '''
+
+        self.list_error = []
+
+    def validate_prediction(self, prediction, model_type):
+        '''
+
+        This method validates the supplied prediction, containing the 'data',
+        'model_type', and 'title' of an svm, or svr prediction (see
+        'brain/session/predict/sv.py').
+
+        @model_type, the list of supported model types.
+
+        Note: the svm 'classes', 'probability', and 'decision_function' lists
+              are optional, and may be null (i.e. an uncalibrated prediction).
+
+        '''
+
+        label = Any(basestring, int, float)
+
+        try:
+            validate_with_humanized_errors(prediction, Schema({
+                Required('data'): dict,
+                Required('model_type'): In(model_type),
+                Required('title'): label,
+            }, extra=ALLOW_EXTRA))
+
+            if prediction['model_type'] == model_type[0]:
+                schema = Schema({
+                    Required('result'): label,
+                    Optional('classes'): Any(None, [label]),
+                    Optional('probability'): Any(None, [Coerce(float)]),
+                    Optional('decision_function'): Any(None, [Coerce(float)]),
+                }, extra=ALLOW_EXTRA)
+
+            else:
+                schema = Schema({
+                    Required('result'): label,
+                    Required('r2'): Coerce(float),
+                }, extra=ALLOW_EXTRA)
+
+            validate_with_humanized_errors(prediction['data'], schema)
+
+        except Exception, error:
+            split_error = str(error).splitlines()
+            self.list_error.append(split_error)
+            return split_error
+
+        return False
+
+    def validate_export(self, limit, after):
+        '''
+
+        This method validates the supplied page arguments, of the stored
+        predictions (see 'Prediction.get_predictions').
+
+        @limit, a positive integer, or None for the configured limit.
+        @after, a non-negative integer, or None for the first page.
+
+        '''
+
+        schema = Schema({
+            Required('limit'): Any(None, All(Coerce(int), Range(min=1))),
+            Required('after'): Any(None, All(Coerce(int), Range(min=0))),
+        })
+
+        try:
+            validate_with_humanized_errors(
+                {'limit': limit, 'after': after},
+                schema
+            )
+
+        except Exception, error:
+            split_error = str(error).splitlines()
+            self.list_error.append(split_error)
+            return split_error
+
+        return False
+
+    def get_errors(self):
+        '''
+
+        This method gets all current errors.
+
+        '''
+
+        return self.list_error
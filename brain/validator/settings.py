@@ -67,7 +67,8 @@ class Validator(object):
                     Optional('stream'): Any('True', 'False'),
                 })
 
-        # validation on 'model_generate' session
+        # validation on 'model_generate' session: the 'search' lists are a
+        #     single value, when one value is submitted by the web-interface.
         if session_type == 'model_generate':
             schema = Schema({
                 Required('collection'): All(unicode, Length(min=1)),
@@ -77,22 +78,49 @@ class Validator(object):
                 Required('sv_kernel_type'): In(sv_kernel_type),
                 Optional('gamma'): Any(Coerce(int), Coerce(float)),
                 Optional('penalty'): Any(Coerce(int), Coerce(float)),
+                Optional('incremental'): Any('True', 'False'),
+                Optional('approximate'): Any('True', 'False'),
+                Optional('search'): Any('grid', 'random'),
+                Optional('sv_kernel_type[]'): Any(
+                    In(sv_kernel_type),
+                    All([In(sv_kernel_type)], Length(min=1)),
+                ),
+                Optional('penalty[]'): Any(
+                    Coerce(float),
+                    All([Coerce(float)], Length(min=1)),
+                ),
+                Optional('gamma[]'): Any(
+                    'auto',
+                    Coerce(float),
+                    All([Any('auto', Coerce(float))], Length(min=1)),
+                ),
             })
 
-        # validation on 'model_predict' session
+        # validation on 'model_predict' session: 'prediction_input[]' is either
+        #     a single observation, or a (batch) matrix of observations.
         elif session_type == 'model_predict':
+            observation = [Any(Coerce(int), Coerce(float))]
             schema = Schema({
                 Required('collection'): All(unicode, Length(min=1)),
                 Optional('stream'): Any('True', 'False'),
-                Required('prediction_input[]'): [
-                    Any(Coerce(int), Coerce(float)),
-                ],
+                Required('prediction_input[]'): Any(
+                    All(observation, Length(min=1)),
+                    All([All(observation, Length(min=1))], Length(min=1)),
+                ),
                 Required('session_type'): 'model_predict',
             })
 
         try:
             validate_with_humanized_errors(premodel_settings, schema)
 
+            # 'search' candidates are exact models: 'approximate' is not applied
+            if (
+                session_type == 'model_generate' and
+                premodel_settings.get('approximate') == 'True' and
+                premodel_settings.get('search')
+            ):
+                raise ValueError('\'approximate\' cannot be combined with \'search\'')
+
         except Exception, error:
             split_error = str(error).splitlines()
             self.list_error.append(split_error)
@@ -14,9 +14,15 @@ Note: both the handler, and logger has levels. If the level of the logger is
 
 import yaml
 import logging
-from flask import Flask, g
+from flask import Flask
 from logging.handlers import RotatingFileHandler
 from brain.cache.session import RedisSessionInterface
+from brain.cache.pool import configure as configure_pools
+from brain.database.pool import (
+    configure as configure_sql_pools,
+    configure_mongodb
+)
+from brain.database.query import release_mariadb
 from interface.views_api import blueprint_api
 from interface.views_web import blueprint_web
 from flask_jwt_extended import JWTManager
@@ -51,6 +57,31 @@ def create_app(args={'instance': 'web'}):
         crypto = settings['crypto']
         validate_password = settings['validate_password']
 
+    # redis connection pools: shared by each redis client, within the process
+    configure_pools(
+        cache['pool']['max_connections'],
+        cache['pool']['timeout'],
+        cache['pool']['health_check_interval']
+    )
+
+    # mariadb connection pools: shared by each sql client, within the process
+    configure_sql_pools(
+        sql['pool']['max_connections'],
+        sql['pool']['timeout'],
+        sql['pool']['max_idle'],
+        sql['pool']['ping_interval']
+    )
+
+    # mongodb client: shared by each nosql client, within the process
+    configure_mongodb(
+        nosql['client']['max_pool_size'],
+        nosql['client']['connect_timeout'],
+        nosql['client']['socket_timeout'],
+        nosql['client']['server_selection_timeout'],
+        nosql['client']['wait_queue_timeout'],
+        nosql['client']['read_preference']
+    )
+
     # programmatic-api: set the flask-jwt-extended extension
     if args['instance'] == 'api':
         app = Flask(__name__)
@@ -85,6 +116,11 @@ def create_app(args={'instance': 'web'}):
         CACHE_HOST=cache['host'],
         CACHE_PORT=cache['port'],
         CACHE_DB=cache['db'],
+        MODEL_CACHE_ENTRIES=cache['model_cache']['max_entries'],
+        MODEL_CACHE_BYTES=cache['model_cache']['max_bytes'],
+        MODEL_FORMAT=cache['model_format']['type'],
+        MODEL_CODEC=cache['model_format']['codec'],
+        METADATA_TTL=cache['metadata']['ttl'],
         ROOT=ROOT,
         SQL_HOST=sql['host'],
         SQL_LOG_PATH=sql['log_path'],
@@ -103,6 +139,34 @@ def create_app(args={'instance': 'web'}):
         DEBUG_LOG_PATH=application['debug_log_path'],
         MODEL_TYPE=application['model_type'],
         DATASET_TYPE=application['dataset']['types'],
+        DATASET_CHUNK_SIZE=application['dataset']['stream']['chunk_size'],
+        DATASET_CHUNK_BUFFER=application['dataset']['stream']['chunk_buffer'],
+        DATASET_MAX_ERRORS=application['dataset']['max_errors'],
+        DATASET_BATCH_SIZE=application['dataset']['batch_size'],
+        DATASET_URL_WORKERS=application['dataset']['url']['workers'],
+        DATASET_URL_CONNECT_TIMEOUT=application['dataset']['url']['connect_timeout'],
+        DATASET_URL_READ_TIMEOUT=application['dataset']['url']['read_timeout'],
+        DATASET_URL_TOTAL_TIMEOUT=application['dataset']['url']['total_timeout'],
+        DATASET_URL_MAX_BYTES=application['dataset']['url']['max_bytes'],
+        DATASET_URL_CACHE_PATH=application['dataset']['url']['cache_path'],
+        PREDICTION_EXPORT_LIMIT=application['prediction']['export_limit'],
+        METRICS_ADMIN_USERS=application['metrics']['admin_users'],
+        TRAINING_ASYNC=(
+            application['training']['asynchronous'] and
+            args['instance'] == 'api'
+        ),
+        TRAINING_WORKERS=application['training']['workers'],
+        TRAINING_POLL_TIMEOUT=application['training']['poll_timeout'],
+        TRAINING_JOB_TTL=application['training']['job_ttl'],
+        TRAINING_MAX_ATTEMPTS=application['training']['max_attempts'],
+        TRAINING_HEARTBEAT_TIMEOUT=application['training']['heartbeat_timeout'],
+        TRAINING_INCREMENTAL_EPOCHS=application['training']['incremental_epochs'],
+        TRAINING_APPROXIMATE_COMPONENTS=application['training']['approximate_components'],
+        TRAINING_CALIBRATION_BACKGROUND=application['training']['calibration_background'],
+        TRAINING_CALIBRATION_TIMEOUT=application['training']['calibration_timeout'],
+        TRAINING_SEARCH_FOLDS=application['training']['search_folds'],
+        TRAINING_SEARCH_ITERATIONS=application['training']['search_iterations'],
+        TRAINING_SEARCH_PROCESSES=application['training']['search_processes'],
         SV_KERNEL_TYPE=application['sv_kernel_type'],
         MAXCOL_ANON=application['dataset']['anonymous']['max_collection'],
         MAXDOC_ANON=application['dataset']['anonymous']['max_document'],
@@ -140,6 +204,9 @@ def create_app(args={'instance': 'web'}):
     log.setLevel(logging.DEBUG)
     log.addHandler(handler)
 
+    # return pooled connections, when each app context tears down
+    register_teardowns(app)
+
     # return
     return app
 
@@ -149,17 +216,14 @@ def register_teardowns(app):
     def close_db(error):
         '''
 
-        This function closes the database connection, everytime the app context
-        tears down. A teardown can happen because of two reasons: either
-        everything went well (the error parameter will be None) or an exception
-        happened, in which case the error is passed to the teardown function.
+        This function returns each mariadb connection to its pool, everytime
+        the app context tears down. A teardown can happen because of two
+        reasons: either everything went well (the error parameter will be
+        None) or an exception happened, in which case the error is passed to
+        the teardown function.
 
         Note: http://flask.pocoo.org/docs/0.12/tutorial/dbcon/
 
         '''
 
-        if hasattr(g, 'mongodb'):
-            g.mongodb.close()
-
-        if hasattr(g, 'mariadb'):
-            g.mariadb.close()
+        release_mariadb()
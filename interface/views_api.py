@@ -18,12 +18,15 @@ decorators are defined, which flask triggers for specific URL's.
 '''
 
 import json
-from flask import Blueprint, request, session
+from flask import Blueprint, request, session, current_app
 from brain.load_data import Load_Data
 from brain.database.model_type import ModelType
 from brain.database.session import Session
 from brain.cache.model import Model
 from brain.cache.hset import Hset
+from brain.cache.job import JobQueue
+from brain.cache.pool import get_metrics as get_pool_metrics
+from brain.database.pool import get_metrics as get_sql_pool_metrics
 from brain.database.account import Account
 from brain.database.prediction import Prediction
 from brain.converter.crypto import verify_pass
@@ -198,6 +201,121 @@ def retrieve_collections():
             return json.dumps({'error': collections['error']})
 
 
+@blueprint_api.route(
+    '/retrieve-job-status',
+    methods=['POST'],
+    endpoint='retrieve_job_status'
+)
+@jwt_required
+def retrieve_job_status():
+    '''
+
+    This router function retrieves the status of a queued 'model_generate'
+    session, using the 'job_id' returned from the corresponding '/load-data'
+    request:
+
+        - integer, codified indicator of retrieval attempt:
+            - 0, successful retrieval of the job status
+            - 1, job does not exist, has expired, or belongs to another user
+            - 2, improper request submitted
+        - string, job status: 'queued', 'running', 'complete', or 'failed'
+        - integer, completed percentage of the job
+        - list, errors encountered by a failed job
+        - result of a complete job (i.e. 'search' leaderboard), otherwise null
+
+    '''
+
+    if request.method == 'POST':
+        # programmatic-interface
+        if request.get_json() and request.get_json().get('job_id'):
+            job_id = request.get_json()['job_id']
+            uid = get_jwt_identity()
+
+        # invalid request
+        else:
+            return json.dumps({'status': 2})
+
+        # query cache and return results
+        job = JobQueue().get_job(job_id)
+
+        if job and job['uid'] == str(uid):
+            return json.dumps({
+                'status': 0,
+                'job_status': job['status'],
+                'progress': job['progress'],
+                'error': job['error'],
+                'result': job['result']
+            })
+        else:
+            return json.dumps({'status': 1})
+
+
+def is_admin(uid):
+    '''
+
+    This function returns whether the supplied userid belongs to a username,
+    within the 'METRICS_ADMIN_USERS' configuration.
+
+    '''
+
+    account = Account()
+
+    return any(
+        account.get_uid(username)['result'] == uid
+        for username in current_app.config.get('METRICS_ADMIN_USERS') or []
+    )
+
+
+@blueprint_api.route(
+    '/retrieve-cache-metrics',
+    methods=['POST'],
+    endpoint='retrieve_cache_metrics'
+)
+@jwt_required
+def retrieve_cache_metrics():
+    '''
+
+    This router function retrieves the usage of each redis connection pool,
+    within the current webserver process:
+
+        - integer, codified indicator of retrieval attempt:
+            - 0, successful retrieval of the pool usage
+            - 1, user is not within 'METRICS_ADMIN_USERS'
+
+    '''
+
+    if request.method == 'POST':
+        if not is_admin(get_jwt_identity()):
+            return json.dumps({'status': 1})
+
+        return json.dumps({'status': 0, 'metrics': get_pool_metrics()})
+
+
+@blueprint_api.route(
+    '/retrieve-database-metrics',
+    methods=['POST'],
+    endpoint='retrieve_database_metrics'
+)
+@jwt_required
+def retrieve_database_metrics():
+    '''
+
+    This router function retrieves the usage of each mariadb connection pool,
+    within the current webserver process:
+
+        - integer, codified indicator of retrieval attempt:
+            - 0, successful retrieval of the pool usage
+            - 1, user is not within 'METRICS_ADMIN_USERS'
+
+    '''
+
+    if request.method == 'POST':
+        if not is_admin(get_jwt_identity()):
+            return json.dumps({'status': 1})
+
+        return json.dumps({'status': 0, 'metrics': get_sql_pool_metrics()})
+
+
 @blueprint_api.route(
     '/retrieve-sv-model',
     methods=['POST'],
@@ -364,54 +482,84 @@ def retrieve_prediction():
 
         # query database and return results
         prediction = Prediction()
-        result = prediction.get_result(id_result)
-        model_type = prediction.get_model_type(id_result)['result']
+        response = prediction.get_prediction(id_result)
 
-        if model_type == 'svm':
-            classes = prediction.get_value(id_result, model_type, 'class')
-            df = prediction.get_value(id_result, model_type, 'decision_function')
-            prob = prediction.get_value(id_result, model_type, 'probability')
+        if not response['status']:
+            return json.dumps({'status': 1})
 
-            if (
-                result['status'] and
-                classes['status'] and
-                df['status'] and
-                prob['status']
-            ):
-                # return results: queried 'decimal' database values, are not
-                #                 json serializable, without using the 'default'
-                #                 string serializer.
-                #
-                return json.dumps({
-                    'status': 0,
-                    'result': result['result'],
-                    'classes': classes['result'],
-                    'decision_function': df['result'],
-                    'probability': prob['result']
-                }, default=str)
-            else:
-                return json.dumps({'status': 1})
+        values = response['result'] or {}
+        model_type = values.get('model_type')
+
+        if model_type == 'svm':
+            # return results: queried 'decimal' database values, are not
+            #                 json serializable, without using the 'default'
+            #                 string serializer.
+            #
+            return json.dumps({
+                'status': 0,
+                'result': values['result'],
+                'classes': values.get('class', []),
+                'decision_function': values.get('decision_function', []),
+                'probability': values.get('probability', [])
+            }, default=str)
 
         elif model_type == 'svr':
-            coefficient = prediction.get_value(id_result, model_type, 'r2')
-
-            if coefficient['status']:
-                # return results: queried 'decimal' database values, are not
-                #                 json serializable, without using the 'default'
-                #                 string serializer.
-                #
-                return json.dumps({
-                    'status': 0,
-                    'result': result['result'],
-                    'r2': coefficient['result']
-                }, default=str)
-            else:
-                return json.dumps({'status': 1})
+            return json.dumps({
+                'status': 0,
+                'result': values['result'],
+                'r2': values.get('r2', [])
+            }, default=str)
 
         else:
             return json.dumps({'status': 3})
 
 
+@blueprint_api.route(
+    '/retrieve-predictions',
+    methods=['POST'],
+    endpoint='retrieve_predictions'
+)
+@jwt_required
+def retrieve_predictions():
+    '''
+
+    This router function retrieves a page of saved predictions, including
+    each prediction parameter, for the current user. During its attempt, it
+    returns a json string, with the following value:
+
+        - integer, codified indicator of database query:
+            - 0, successful retrieval of predictions
+            - 1, unsuccessful retrieval of predictions
+        - list, predictions of the requested page
+        - integer, 'after' value of the next page, or null on the last page
+
+    '''
+
+    if request.method == 'POST':
+        results = request.get_json() or {}
+
+        # query database
+        prediction = Prediction()
+        response = prediction.get_predictions(
+            results.get('model_type'),
+            results.get('limit'),
+            results.get('after')
+        )
+
+        # return results: datetime, and decimal values are not serializable,
+        #                 without the 'default' string serializer.
+        #
+        if response['status']:
+            return json.dumps({
+                'status': 0,
+                'predictions': response['result'],
+                'next': response['next']
+            }, default=str)
+
+        else:
+            return json.dumps({'status': 1, 'predictions': None, 'next': None})
+
+
 @blueprint_api.route(
     '/save-prediction',
     methods=['POST'],
@@ -469,6 +617,56 @@ def save_prediction():
             return json.dumps({'status': 2})
 
 
+@blueprint_api.route(
+    '/save-predictions',
+    methods=['POST'],
+    endpoint='save_predictions'
+)
+@jwt_required
+def save_predictions():
+    '''
+
+    This router function saves many prediction results, within a single
+    transaction, where the 'predictions' attribute is a list, with each
+    element containing the same attributes, as a '/save-prediction' request.
+    During its attempt, it returns a json string, with the following value:
+
+        - integer, codified indicator of save attempt:
+            - 0, successfully stored every prediction result
+            - 1, unsuccessfully stored the prediction results
+            - 2, status of any prediction was not 'valid'
+            - 3, improper request submitted
+
+    Note: no prediction is stored, unless every prediction is stored.
+
+    '''
+
+    if request.method == 'POST':
+        results = request.get_json()
+
+        # invalid request
+        if (
+            not results or
+            not isinstance(results.get('predictions'), list) or
+            not all(isinstance(x, dict) for x in results['predictions'])
+        ):
+            return json.dumps({'status': 3})
+
+        # notification: status not valid
+        if any(x.get('status') != 'valid' for x in results['predictions']):
+            return json.dumps({'status': 2})
+
+        # save predictions
+        prediction = Prediction()
+        result = prediction.save_many(results['predictions'])['result']
+
+        # notification: prediction status
+        if result == 0:
+            return json.dumps({'status': 0})
+        else:
+            return json.dumps({'status': 1})
+
+
 @blueprint_api.route(
     '/collection-count',
     methods=['POST'],
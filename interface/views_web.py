@@ -18,13 +18,14 @@ decorators are defined, which flask triggers for specific URL's.
 '''
 
 import json
-from flask import Blueprint, render_template, request, session
+from flask import Blueprint, render_template, request, session, current_app
 from brain.load_data import Load_Data
 from brain.converter.settings import Settings
 from brain.database.model_type import ModelType
 from brain.database.session import Session
 from brain.cache.model import Model
 from brain.cache.hset import Hset
+from brain.cache.job import JobQueue
 from brain.validator.password import validate_password
 from brain.validator.email import isValidEmail
 from brain.database.account import Account
@@ -299,6 +300,54 @@ def retrieve_collections():
             return json.dumps({'error': collections['error']})
 
 
+@blueprint_web.route(
+    '/retrieve-job-status',
+    methods=['POST'],
+    endpoint='retrieve_job_status'
+)
+def retrieve_job_status():
+    '''
+
+    This router function retrieves the status of a queued 'model_generate'
+    session, using the 'job_id' returned from the corresponding '/load-data'
+    request:
+
+        - integer, codified indicator of retrieval attempt:
+            - 0, successful retrieval of the job status
+            - 1, job does not exist, has expired, or belongs to another user
+            - 2, improper request submitted
+        - string, job status: 'queued', 'running', 'complete', or 'failed'
+        - integer, completed percentage of the job
+        - list, errors encountered by a failed job
+        - result of a complete job (i.e. 'search' leaderboard), otherwise null
+
+    '''
+
+    if request.method == 'POST':
+        # web-interface
+        if request.form and request.form.get('job_id'):
+            job_id = request.form['job_id']
+            uid = session.get('uid') or current_app.config.get('USER_ID')
+
+        # invalid request
+        else:
+            return json.dumps({'status': 2})
+
+        # query cache and return results
+        job = JobQueue().get_job(job_id)
+
+        if job and job['uid'] == str(uid):
+            return json.dumps({
+                'status': 0,
+                'job_status': job['status'],
+                'progress': job['progress'],
+                'error': job['error'],
+                'result': job['result']
+            })
+        else:
+            return json.dumps({'status': 1})
+
+
 @blueprint_web.route(
     '/retrieve-sv-model',
     methods=['POST'],
@@ -451,49 +500,33 @@ def retrieve_prediction():
 
         # query database and return results
         prediction = Prediction()
-        result = prediction.get_result(id_result)
-        model_type = prediction.get_model_type(id_result)['result']
+        response = prediction.get_prediction(id_result)
 
-        if model_type == 'svm':
-            classes = prediction.get_value(id_result, model_type, 'class')
-            df = prediction.get_value(id_result, model_type, 'decision_function')
-            prob = prediction.get_value(id_result, model_type, 'probability')
+        if not response['status']:
+            return json.dumps({'status': 1})
 
-            if (
-                result['status'] and
-                classes['status'] and
-                df['status'] and
-                prob['status']
-            ):
-                # return results: queried 'decimal' database values, are not
-                #                 json serializable, without using the 'default'
-                #                 string serializer.
-                #
-                return json.dumps({
-                    'status': 0,
-                    'result': result['result'],
-                    'classes': classes['result'],
-                    'decision_function': df['result'],
-                    'probability': prob['result']
-                }, default=str)
-            else:
-                return json.dumps({'status': 1})
+        values = response['result'] or {}
+        model_type = values.get('model_type')
 
-        elif model_type == 'svr':
-            coefficient = prediction.get_value(id_result, model_type, 'r2')
+        if model_type == 'svm':
+            # return results: queried 'decimal' database values, are not
+            #                 json serializable, without using the 'default'
+            #                 string serializer.
+            #
+            return json.dumps({
+                'status': 0,
+                'result': values['result'],
+                'classes': values.get('class', []),
+                'decision_function': values.get('decision_function', []),
+                'probability': values.get('probability', [])
+            }, default=str)
 
-            if coefficient['status']:
-                # return results: queried 'decimal' database values, are not
-                #                 json serializable, without using the 'default'
-                #                 string serializer.
-                #
-                return json.dumps({
-                    'status': 0,
-                    'result': result['result'],
-                    'r2': coefficient['result']
-                }, default=str)
-            else:
-                return json.dumps({'status': 1})
+        elif model_type == 'svr':
+            return json.dumps({
+                'status': 0,
+                'result': values['result'],
+                'r2': values.get('r2', [])
+            }, default=str)
 
         else:
             return json.dumps({'status': 3})
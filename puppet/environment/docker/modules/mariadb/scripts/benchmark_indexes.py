@@ -0,0 +1,251 @@
+#!/usr/bin/python
+
+'''
+
+This file benchmarks the frequently executed legacy table queries, before, and
+after the schema migration (see 'migrate_indexes.py'), by reporting the query
+plan, and the median latency of each query:
+
+    python benchmark_indexes.py /etc/puppetlabs/puppet [scale]
+
+The legacy tables are copied into 'benchmark_' prefixed tables, without the
+migrated indexes, then populated with the following rows:
+
+    - scale * 1000 users
+    - scale * 50000 dataset entities
+    - scale * 200000 predictions, each with 3 classes, probabilities, and
+      decision function values (or a single r2 value)
+
+Note: the 'benchmark_' prefixed tables are removed, when the benchmark
+      completes.
+
+'''
+
+import time
+import yaml
+import random
+from sys import argv
+import MySQLdb as DB
+from migrate_indexes import INDEXES, get_existing, migrate
+
+# local variables
+#
+# @argv[1], first passed-in argument from command (argv[0] is the filename),
+#     indicating the project root directory.
+# @argv[2], optional multiplier of the populated row counts.
+#
+prepath = argv[1] + '/hiera'
+scale = float(argv[2]) if len(argv) > 2 else 1.0
+prefix = 'benchmark_'
+repeat = 200
+batch = 10000
+
+n_user = int(scale * 1000)
+n_entity = int(scale * 50000)
+n_result = int(scale * 200000)
+
+# yaml configuration: database attributes
+with open(prepath + '/database.yaml', 'r') as stream:
+    settings = yaml.load(stream)
+    database = settings['database']['mariadb']
+    db_ml = database['name']
+    provisioner = database['provisioner']
+    provisioner_password = database['provisioner_password']
+
+# yaml configuration: general attributes
+with open(prepath + '/common.yaml', 'r') as stream:
+    settings = yaml.load(stream)
+    host = settings['general']['host']
+
+# benchmarked tables
+TABLES = [x[0] for x in INDEXES]
+
+# benchmarked queries: (name, statement, argument generator)
+QUERIES = [
+    (
+        'Entity.get_metadata',
+        'SELECT id_entity, uid_created, model_type '
+        'FROM {prefix}tbl_dataset_entity WHERE collection=%s',
+        lambda: ('collection-%s' % random.randrange(n_entity),)
+    ),
+    (
+        'Entity.get_collections',
+        'SELECT collection FROM {prefix}tbl_dataset_entity '
+        'WHERE uid_created=%s ORDER BY datetime_created',
+        lambda: (random.randrange(n_user),)
+    ),
+    (
+        'Entity.get_collection_count',
+        'SELECT COUNT(*) FROM {prefix}tbl_dataset_entity WHERE uid_created=%s',
+        lambda: (random.randrange(n_user),)
+    ),
+    (
+        'Prediction.get_all_titles',
+        'SELECT id_result, title, datetime_created '
+        'FROM {prefix}tbl_prediction_results '
+        'WHERE uid_created=%s AND model_type=%s',
+        lambda: (random.randrange(n_user), 1)
+    ),
+    (
+        'Prediction.get_value (class)',
+        'SELECT class FROM {prefix}tbl_svm_results_class WHERE id_result=%s',
+        lambda: (random.randrange(1, n_result),)
+    ),
+    (
+        'Prediction.get_value (probability)',
+        'SELECT probability FROM {prefix}tbl_svm_results_probability '
+        'WHERE id_result=%s ORDER BY id_probability',
+        lambda: (random.randrange(1, n_result),)
+    ),
+]
+
+
+def populate(cur):
+    '''
+
+    This function copies the legacy tables, without the migrated indexes,
+    then populates each copy.
+
+    '''
+
+    for table in TABLES:
+        cur.execute('DROP TABLE IF EXISTS %s' % (prefix + table))
+        cur.execute('CREATE TABLE %s LIKE %s' % (prefix + table, table))
+
+    for table, name in get_existing(cur, db_ml, prefix):
+        cur.execute('ALTER TABLE %s DROP INDEX %s' % (table, name))
+
+    insert(
+        'INSERT INTO {prefix}tbl_dataset_entity (title, collection, '
+        'model_type, uid_created, datetime_created) '
+        'VALUES (%s, %s, %s, %s, UTC_TIMESTAMP())',
+        [(
+            'title-%s' % i,
+            'collection-%s' % i,
+            i % 2 + 1,
+            random.randrange(n_user)
+        ) for i in range(n_entity)],
+        cur
+    )
+
+    insert(
+        'INSERT INTO {prefix}tbl_prediction_results (model_type, title, '
+        'result, uid_created, datetime_created) '
+        'VALUES (%s, %s, %s, %s, UTC_TIMESTAMP())',
+        [(
+            i % 2 + 1,
+            'prediction-%s' % i,
+            'class-%s' % (i % 3),
+            random.randrange(n_user)
+        ) for i in range(n_result)],
+        cur
+    )
+
+    # values: svm predictions have odd 'id_result', svr predictions even
+    svm = range(1, n_result + 1, 2)
+    svr = range(2, n_result + 1, 2)
+
+    for table, column, value in [
+        ('tbl_svm_results_class', 'class', lambda j: 'class-%s' % j),
+        ('tbl_svm_results_probability', 'probability', lambda j: random.random()),
+        (
+            'tbl_svm_results_decision_function',
+            'decision_function',
+            lambda j: random.uniform(-10, 10)
+        )
+    ]:
+        insert(
+            'INSERT INTO {prefix}%s (id_result, %s) VALUES (%%s, %%s)' % (
+                table,
+                column
+            ),
+            [(i, value(j)) for i in svm for j in range(3)],
+            cur
+        )
+
+    insert(
+        'INSERT INTO {prefix}tbl_svr_results_r2 (id_result, r2) VALUES (%s, %s)',
+        [(i, random.random()) for i in svr],
+        cur
+    )
+
+    for table in TABLES:
+        cur.execute('ANALYZE TABLE %s' % (prefix + table))
+        cur.fetchall()
+
+
+def insert(statement, rows, cur):
+    '''
+
+    This function inserts the supplied rows, in batches.
+
+    '''
+
+    statement = statement.format(prefix=prefix)
+    for i in range(0, len(rows), batch):
+        cur.executemany(statement, rows[i:i + batch])
+
+
+def benchmark(cur, label):
+    '''
+
+    This function prints the query plan, and the median latency, of each of
+    the above 'QUERIES'.
+
+    '''
+
+    print '\n%s\n%s' % (label, '=' * len(label))
+
+    for name, statement, get_args in QUERIES:
+        statement = statement.format(prefix=prefix)
+
+        # query plan
+        cur.execute('EXPLAIN ' + statement, get_args())
+        columns = [x[0] for x in cur.description]
+        plans = [dict(zip(columns, row)) for row in cur.fetchall()]
+
+        # latency
+        latency = []
+        for i in range(repeat):
+            args = get_args()
+            start = time.time()
+            cur.execute(statement, args)
+            cur.fetchall()
+            latency.append((time.time() - start) * 1000)
+
+        print '\n%s: median %.3f ms, max %.3f ms' % (
+            name,
+            sorted(latency)[len(latency) // 2],
+            max(latency)
+        )
+        for plan in plans:
+            print '    type=%s, key=%s, rows=%s, extra=%s' % (
+                plan['type'],
+                plan['key'],
+                plan['rows'],
+                plan['Extra']
+            )
+
+
+# create connection
+conn = DB.connect(
+    host,
+    provisioner,
+    provisioner_password,
+    db_ml
+)
+
+with conn:
+    cur = conn.cursor()
+
+    try:
+        populate(cur)
+        conn.commit()
+
+        benchmark(cur, 'before migration')
+        migrate(cur, db_ml, prefix)
+        benchmark(cur, 'after migration')
+
+    finally:
+        for table in TABLES:
+            cur.execute('DROP TABLE IF EXISTS %s' % (prefix + table))
@@ -0,0 +1,107 @@
+#!/usr/bin/python
+
+'''
+
+This file adds the secondary indexes, of the frequently queried legacy tables,
+within the 'db_machine_learning' database:
+
+    @tbl_dataset_entity, collections of a user ('Entity.get_collections',
+        'Entity.get_collection_count', 'Entity.remove_entity'), ordered by
+        'datetime_created'.
+
+    @tbl_prediction_results, predictions of a user, and model type
+        ('Prediction.get_all_titles', 'Prediction.get_predictions').
+
+    @tbl_svm_results_class, @tbl_svm_results_probability,
+    @tbl_svm_results_decision_function, @tbl_svr_results_r2, values of a
+        prediction ('Prediction.get_prediction'). Each index contains the
+        value column, in primary key order, so the table rows are not read.
+
+Note: the 'collection' column of 'tbl_dataset_entity' is already indexed, by
+      its 'UNIQUE' constraint ('Entity.get_metadata', 'ModelType').
+
+Note: indexes are only added, when missing, since 'CREATE TABLE IF NOT EXISTS'
+      does not alter previously created tables.
+
+'''
+
+# (table, index name, indexed columns)
+INDEXES = [
+    (
+        'tbl_dataset_entity',
+        'idx_entity_uid_created',
+        '(uid_created, datetime_created, collection)'
+    ),
+    (
+        'tbl_prediction_results',
+        'idx_results_uid_created',
+        '(uid_created, model_type)'
+    ),
+    (
+        'tbl_svm_results_class',
+        'idx_class_id_result',
+        '(id_result, id_class, class)'
+    ),
+    (
+        'tbl_svm_results_probability',
+        'idx_probability_id_result',
+        '(id_result, id_probability, probability)'
+    ),
+    (
+        'tbl_svm_results_decision_function',
+        'idx_decision_function_id_result',
+        '(id_result, id_decision_function, decision_function)'
+    ),
+    (
+        'tbl_svr_results_r2',
+        'idx_r2_id_result',
+        '(id_result, id_r2, r2)'
+    ),
+]
+
+
+def get_existing(cur, database, prefix=''):
+    '''
+
+    This function returns each (table, index name) of the above 'INDEXES',
+    which already exists within the supplied database.
+
+    @prefix, prepended to each table name (i.e. 'benchmark_indexes.py').
+
+    '''
+
+    existing = []
+    for table, name, columns in INDEXES:
+        cur.execute(
+            'SELECT COUNT(*) FROM information_schema.statistics '
+            'WHERE table_schema=%s AND table_name=%s AND index_name=%s',
+            (database, prefix + table, name)
+        )
+
+        if cur.fetchone()[0]:
+            existing.append((prefix + table, name))
+
+    return existing
+
+
+def migrate(cur, database, prefix=''):
+    '''
+
+    This function adds each of the above 'INDEXES', which does not exist
+    within the supplied database, and returns the added index names.
+
+    @prefix, prepended to each table name (i.e. 'benchmark_indexes.py').
+
+    '''
+
+    existing = get_existing(cur, database, prefix)
+    added = []
+
+    for table, name, columns in INDEXES:
+        if (prefix + table, name) not in existing:
+            cur.execute(
+                'ALTER TABLE %s ADD INDEX %s %s' % (prefix + table, name, columns)
+            )
+            added.append(name)
+
+    return added
@@ -27,11 +27,15 @@ This file initializes the following database tables within the
             @tbl_svr_results_results_r2, record predicted r^2, with respect
                 to a given 'id_result'.
 
+Note: the secondary indexes of the above tables, are added by the schema
+      migration step (see 'migrate_indexes.py').
+
 '''
 
 import yaml
 from sys import argv
 import MySQLdb as DB
+from migrate_indexes import migrate
 
 
 # local variables
@@ -176,6 +180,9 @@ with conn:
                     '''
     cur.execute(sql_statement)
 
+    # schema migration: add missing indexes, of the above tables
+    migrate(cur, db_ml)
+
     # ################################################################################# #
     # NEW STRUCTURE: when the above legacy tables have been completely phased out, the  #
     #                below tables will completely define our sql implementation.        #
@@ -5,7 +5,8 @@ class webserver::params {
     $hiera                 = lookup( { 'name' => 'webserver', 'default_value' => false } )
     $run                   = true
     $pyyaml_version        = 'installed'
-    $redis_version         = 'installed'
+    ## redis client: 'health_check_interval' requires 3.3, or later
+    $redis_version         = '3.3.11'
     $pytest_cov_version    = 'installed'
     $jest_cli_version      = 'installed'
     $gunicorn_version      = 'installed'
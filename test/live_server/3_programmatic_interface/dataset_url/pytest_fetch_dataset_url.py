@@ -0,0 +1,187 @@
+#!/usr/bin/python
+
+'''
+
+This file tests the concurrent retrieval of 'dataset_url' references, from a
+local stand-in http server.
+
+'''
+
+import json
+import time
+import pytest
+import threading
+from SocketServer import ThreadingMixIn
+from BaseHTTPServer import HTTPServer, BaseHTTPRequestHandler
+from brain.session.data.fetch import fetch_all
+
+# local variables
+DELAY = 0.5
+DATASET = {
+    'dataset': [{
+        'dependent-variable': 'dep-variable-1',
+        'independent-variables': [{'indep-variable-1': 23.45}]
+    }]
+}
+
+
+class Handler(BaseHTTPRequestHandler):
+    '''
+
+    This class responds to each request, with respect to the requested path:
+
+        - /slow, the dataset, after a delay
+        - /hang, the dataset, after a delay exceeding the read timeout
+        - /drip, the dataset, in pieces each within the read timeout, but
+          together exceeding the total timeout
+        - /large, a response exceeding the byte cap
+        - /etag, the dataset with an 'ETag' header, or '304 Not Modified',
+          when the request contains the matching 'If-None-Match' header
+
+    '''
+
+    requests = []
+
+    def do_GET(self):
+        Handler.requests.append(self.path)
+        content = json.dumps(DATASET)
+        headers = {}
+
+        if self.path == '/slow':
+            time.sleep(DELAY)
+        elif self.path == '/hang':
+            time.sleep(DELAY * 4)
+        elif self.path == '/large':
+            content = json.dumps({'dataset': ['x' * 1024] * 10})
+        elif self.path == '/etag':
+            if self.headers.get('If-None-Match') == '"v1"':
+                self.send_response(304)
+                self.end_headers()
+                return
+            headers['ETag'] = '"v1"'
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(content)))
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.end_headers()
+
+        if self.path == '/drip':
+            for i in range(0, len(content), len(content) // 4 + 1):
+                self.wfile.write(content[i:i + len(content) // 4 + 1])
+                self.wfile.flush()
+                time.sleep(DELAY)
+        else:
+            self.wfile.write(content)
+
+    def log_message(self, *args):
+        pass
+
+
+class Server(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+@pytest.fixture
+def server():
+    '''
+
+    This method starts the stand-in http server, on an available port, and
+    returns its base url.
+
+    '''
+
+    httpd = Server(('127.0.0.1', 0), Handler)
+    thread = threading.Thread(target=httpd.serve_forever)
+    thread.daemon = True
+    thread.start()
+
+    yield 'http://127.0.0.1:%s' % httpd.server_address[1]
+
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def configure(app, tmpdir):
+    '''
+
+    This method defines the 'dataset_url' configurations, of the supplied app.
+
+    '''
+
+    app.config.update(
+        DATASET_URL_WORKERS=4,
+        DATASET_URL_CONNECT_TIMEOUT=5,
+        DATASET_URL_READ_TIMEOUT=DELAY * 2,
+        DATASET_URL_TOTAL_TIMEOUT=DELAY * 3,
+        DATASET_URL_MAX_BYTES=4096,
+        DATASET_URL_CACHE_PATH=str(tmpdir)
+    )
+
+
+def test_fetch_concurrent(app, server, tmpdir):
+    '''
+
+    This method retrieves several slow urls, concurrently, in order.
+
+    '''
+
+    configure(app, tmpdir)
+
+    with app.app_context():
+        start = time.time()
+        results = fetch_all([server + '/slow'] * 4)
+        elapsed = time.time() - start
+
+    assert [x['error'] for x in results] == [None] * 4
+    assert [x['dataset'] for x in results] == [DATASET['dataset']] * 4
+    assert elapsed < DELAY * 3
+
+
+def test_fetch_limits(app, server, tmpdir):
+    '''
+
+    This method ensures an oversized, slow, or dripping response is an error,
+    without affecting the remaining urls.
+
+    '''
+
+    configure(app, tmpdir)
+
+    with app.app_context():
+        results = fetch_all([
+            server + '/large',
+            server + '/hang',
+            server + '/slow',
+            server + '/drip'
+        ])
+
+    assert results[0]['dataset'] is None
+    assert 'exceeds' in results[0]['error']
+    assert results[1]['dataset'] is None
+    assert results[1]['error']
+    assert results[2]['dataset'] == DATASET['dataset']
+    assert results[3]['dataset'] is None
+    assert 'total timeout' in results[3]['error']
+
+
+def test_fetch_etag_cache(app, server, tmpdir):
+    '''
+
+    This method ensures a response with an 'ETag' header, is cached, and
+    reused when the server responds '304 Not Modified'.
+
+    '''
+
+    configure(app, tmpdir)
+    del Handler.requests[:]
+
+    with app.app_context():
+        first = fetch_all([server + '/etag'])
+        second = fetch_all([server + '/etag'])
+
+    assert first[0]['dataset'] == DATASET['dataset']
+    assert second[0]['dataset'] == DATASET['dataset']
+    assert Handler.requests == ['/etag', '/etag']
+    assert len(tmpdir.listdir()) == 2
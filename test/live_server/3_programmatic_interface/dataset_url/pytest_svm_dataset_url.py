@@ -17,6 +17,7 @@ Note: the 'pytest' instances can further be reviewed:
 '''
 
 import json
+import time
 import os.path
 from flask import current_app, url_for
 
@@ -73,6 +74,24 @@ def send_post(client, endpoint, token, data):
     )
 
 
+def wait_job(client, endpoint, token, job_id, timeout=300):
+    '''
+
+    This method polls the status of the supplied 'model_generate' job, until
+    it has finished, or the timeout (in seconds) has elapsed.
+
+    '''
+
+    for i in range(timeout):
+        res = send_post(client, endpoint, token, json.dumps({'job_id': job_id}))
+        if res.json['status'] or res.json['job_status'] in ['complete', 'failed']:
+            return res
+
+        time.sleep(1)
+
+    return res
+
+
 def test_data_new(client, live_server, token):
     '''
 
@@ -140,6 +159,10 @@ def test_model_generate(client, live_server, token):
     def load_data():
         return url_for('api.load_data', _external=True)
 
+    @live_server.app.route('/retrieve-job-status')
+    def retrieve_job_status():
+        return url_for('api.retrieve_job_status', _external=True)
+
     live_server.start()
 
     # local variables
@@ -156,6 +179,15 @@ def test_model_generate(client, live_server, token):
     assert res.status_code == 200
     assert res.json['status'] == 0
 
+    # queued model: wait for the training worker
+    if 'job_id' in res.json:
+        job = wait_job(client, retrieve_job_status(), token, res.json['job_id'])
+
+        assert job.status_code == 200
+        assert job.json['status'] == 0
+        assert job.json['job_status'] == 'complete'
+        assert job.json['progress'] == 100
+
 
 def test_model_predict(client, live_server, token):
     '''
@@ -185,19 +217,13 @@ def test_model_predict(client, live_server, token):
         get_sample_json('svm-model-predict.json', 'svm')
     )
 
-    # check each probability is within acceptable margin
-    fixed_prob = [
-        0.14075033321086294,
-        0.14500955005546354,
-        0.14156072707544004,
-        0.19249135186767916,
-        0.38018803779055466
-    ]
+    # check probabilities: one per class, summing to one
     cp = res.json['result']['confidence']['probability']
-    margin_prob = 0.005
-    check_prob = [
-        i for i in fixed_prob if any(abs(i-j) > margin_prob for j in cp)
-    ]
+    check_prob = (
+        len(cp) == 5 and
+        all(0 <= x <= 1 for x in cp) and
+        abs(sum(cp) - 1) < 0.00001
+    )
 
     # check each decision function is within acceptable margin
     fixed_df = [
@@ -229,3 +255,42 @@ def test_model_predict(client, live_server, token):
     assert check_prob
     assert res.json['result']['model'] == 'svm'
     assert res.json['result']['result'] == 'dep-variable-4'
+
+
+def test_model_predict_batch(client, live_server, token):
+    '''
+
+    This method tests the 'model_predict' session, using a matrix of
+    observations (batch mode).
+
+    Note: each observation is identical to the above 'test_model_predict',
+          so each row is expected to share the same result.
+
+    '''
+
+    @live_server.app.route('/load-data')
+    def load_data():
+        return url_for('api.load_data', _external=True)
+
+    live_server.start()
+
+    # local variables
+    endpoint = load_data()
+
+    res = send_post(
+        client,
+        endpoint,
+        token,
+        get_sample_json('svm-model-predict-batch.json', 'svm')
+    )
+
+    # assertion checks
+    assert res.status_code == 200
+    assert res.json['status'] == 0
+    assert res.json['result']['model'] == 'svm'
+    assert res.json['result']['result'] == [
+        'dep-variable-4',
+        'dep-variable-4'
+    ]
+    assert len(res.json['result']['confidence']['probability']) == 2
+    assert len(res.json['result']['confidence']['decision_function']) == 2
@@ -18,6 +18,7 @@ Note: the 'pytest' instances can further be reviewed:
 '''
 
 import json
+import time
 import os.path
 from flask import current_app, url_for
 
@@ -74,6 +75,24 @@ def send_post(client, endpoint, token, data):
     )
 
 
+def wait_job(client, endpoint, token, job_id, timeout=300):
+    '''
+
+    This method polls the status of the supplied 'model_generate' job, until
+    it has finished, or the timeout (in seconds) has elapsed.
+
+    '''
+
+    for i in range(timeout):
+        res = send_post(client, endpoint, token, json.dumps({'job_id': job_id}))
+        if res.json['status'] or res.json['job_status'] in ['complete', 'failed']:
+            return res
+
+        time.sleep(1)
+
+    return res
+
+
 def test_data_new(client, live_server, token):
     '''
 
@@ -141,6 +160,10 @@ def test_model_generate(client, live_server, token):
     def load_data():
         return url_for('api.load_data', _external=True)
 
+    @live_server.app.route('/retrieve-job-status')
+    def retrieve_job_status():
+        return url_for('api.retrieve_job_status', _external=True)
+
     live_server.start()
 
     # local variables
@@ -157,6 +180,15 @@ def test_model_generate(client, live_server, token):
     assert res.status_code == 200
     assert res.json['status'] == 0
 
+    # queued model: wait for the training worker
+    if 'job_id' in res.json:
+        job = wait_job(client, retrieve_job_status(), token, res.json['job_id'])
+
+        assert job.status_code == 200
+        assert job.json['status'] == 0
+        assert job.json['job_status'] == 'complete'
+        assert job.json['progress'] == 100
+
 
 def test_model_predict(client, live_server, token):
     '''
@@ -0,0 +1,248 @@
+'''
+
+This file will test the following cases:
+  - saving a batch of proposed svm, and svr predictions.
+  - rejecting a batch containing a malformed prediction, without storing any
+    prediction of the batch.
+  - retrieving every stored prediction, in pages.
+
+Note: this file is run after the other 'results' tests, so the predictions
+      stored by this file do not change the 'id_result' values, asserted by
+      the preceding files.
+
+Note: the 'pytest' instances can further be reviewed:
+
+    - https://pytest-flask.readthedocs.io/en/latest
+    - http://docs.pytest.org/en/latest/usage.html
+
+'''
+
+import json
+import os.path
+from flask import current_app, url_for
+
+
+def get_sample_json(jsonfile, model_type):
+    '''
+
+    Get a sample json dataset.
+
+    '''
+
+    # local variables
+    root = current_app.config.get('ROOT')
+
+    # open file
+    json_dataset = None
+
+    with open(
+        os.path.join(
+            root,
+            'interface',
+            'static',
+            'data',
+            'json',
+            'programmatic_interface',
+            model_type,
+            'results',
+            jsonfile
+        ),
+        'r'
+    ) as json_file:
+        json_dataset = json.load(json_file)
+
+    return json.dumps(json_dataset)
+
+
+def get_batch(*titles):
+    '''
+
+    This method returns a batch of predictions, alternating the sample svm,
+    and svr predictions, with the supplied titles.
+
+    '''
+
+    batch = []
+    for i, title in enumerate(titles):
+        model_type = ['svm', 'svr'][i % 2]
+        prediction = json.loads(get_sample_json('save-prediction.json', model_type))
+        prediction['title'] = title
+        batch.append(prediction)
+
+    return batch
+
+
+def send_post(client, endpoint, token, data):
+    '''
+
+    This method will login, and return the corresponding token.
+
+    @token, is defined as a fixture, in our 'conftest.py', to help reduce
+        runtime on our tests.
+
+    '''
+
+    return client.post(
+        endpoint,
+        headers={
+            'Authorization': 'Bearer {0}'.format(token),
+            'Content-Type': 'application/json'
+        },
+        data=data
+    )
+
+
+def get_titles(client, endpoint, token):
+    '''
+
+    This method returns the titles of every stored prediction.
+
+    '''
+
+    res = send_post(
+        client,
+        endpoint,
+        token,
+        get_sample_json('retrieve-titles.json', 'combined')
+    )
+
+    assert res.status_code == 200
+    assert res.json['status'] == 0
+
+    return res.json['titles']
+
+
+def test_save_predictions_malformed(client, live_server, token):
+    '''
+
+    This method ensures a batch containing a malformed prediction is rejected,
+    and none of the batch is stored.
+
+    '''
+
+    @live_server.app.route('/save-predictions')
+    def save_predictions():
+        return url_for('api.save_predictions', _external=True)
+
+    @live_server.app.route('/retrieve-prediction-titles')
+    def retrieve_prediction_titles():
+        return url_for('api.retrieve_prediction_titles', _external=True)
+
+    live_server.start()
+
+    # local variables
+    titles = get_titles(client, retrieve_prediction_titles(), token)
+    batch = get_batch('svm-batch-invalid', 'svr-batch-invalid')
+    batch[1]['data']['r2'] = 'not-a-float'
+
+    res = send_post(
+        client,
+        save_predictions(),
+        token,
+        json.dumps({'predictions': batch})
+    )
+
+    # assertion checks
+    assert res.status_code == 200
+    assert res.json['status'] == 1
+    assert get_titles(client, retrieve_prediction_titles(), token) == titles
+
+
+def test_save_predictions(client, live_server, token):
+    '''
+
+    This method saves a batch of svm, and svr predictions.
+
+    '''
+
+    @live_server.app.route('/save-predictions')
+    def save_predictions():
+        return url_for('api.save_predictions', _external=True)
+
+    @live_server.app.route('/retrieve-prediction-titles')
+    def retrieve_prediction_titles():
+        return url_for('api.retrieve_prediction_titles', _external=True)
+
+    live_server.start()
+
+    # local variables
+    titles = get_titles(client, retrieve_prediction_titles(), token)
+
+    res = send_post(
+        client,
+        save_predictions(),
+        token,
+        json.dumps({'predictions': get_batch('svm-batch-1', 'svr-batch-1')})
+    )
+
+    # assertion checks
+    assert res.status_code == 200
+    assert res.json['status'] == 0
+
+    stored = get_titles(client, retrieve_prediction_titles(), token)
+    assert len(stored) == len(titles) + 2
+    assert sorted(x[1] for x in stored if x not in titles) == [
+        'svm-batch-1',
+        'svr-batch-1'
+    ]
+
+
+def test_retrieve_predictions(client, live_server, token):
+    '''
+
+    This method retrieves every stored prediction, a page at a time, and
+    ensures an invalid page limit is rejected.
+
+    '''
+
+    @live_server.app.route('/retrieve-predictions')
+    def retrieve_predictions():
+        return url_for('api.retrieve_predictions', _external=True)
+
+    live_server.start()
+
+    # local variables
+    endpoint = retrieve_predictions()
+    res = send_post(client, endpoint, token, json.dumps({}))
+
+    assert res.status_code == 200
+    assert res.json['status'] == 0
+    assert res.json['next'] is None
+
+    stored = [x['id_result'] for x in res.json['predictions']]
+    assert len(stored) >= 4
+
+    # page through every prediction: 'next' is null on the last page
+    paged = []
+    after = None
+
+    while True:
+        res = send_post(
+            client,
+            endpoint,
+            token,
+            json.dumps({'limit': 3, 'after': after})
+        )
+
+        assert res.status_code == 200
+        assert res.json['status'] == 0
+
+        page = [x['id_result'] for x in res.json['predictions']]
+        paged.extend(page)
+        after = res.json['next']
+
+        if after is None:
+            assert len(page) <= 3
+            break
+
+        assert len(page) == 3
+        assert after == page[-1]
+
+    assert paged == stored
+
+    # invalid page limit
+    for limit in [0, 'abc']:
+        res = send_post(client, endpoint, token, json.dumps({'limit': limit}))
+
+        assert res.status_code == 200
+        assert res.json['status'] == 1
@@ -0,0 +1,169 @@
+'''
+
+This file is the acting training worker.
+
+Each worker process consumes the 'model_generate' sessions, queued within
+'load_data.py', and generates the corresponding model. The status, progress,
+and any errors of each job, are recorded into the redis cache, where they can
+be retrieved by the '/retrieve-job-status' route.
+
+Probability calibrations, queued by the first prediction of an svm model (see
+'brain/session/model/calibration.py'), are consumed from the same queue.
+
+Note: the number of worker processes is defined by 'TRAINING_WORKERS', within
+      the 'training' hiera definition.
+
+Note: each worker is named by the host, and its index, so a restarted worker
+      queues again any job it did not finish (see 'JobQueue.recover'). The
+      unfinished jobs of a worker which no longer exists (i.e. a recreated
+      container, with a different host), are queued again by any remaining
+      worker, once its heartbeat expires (see 'JobQueue.sweep').
+
+Note: a job dequeued more than 'TRAINING_MAX_ATTEMPTS' times (i.e. the job
+      repeatedly stops its worker), is failed rather than run again.
+
+'''
+
+import time
+import socket
+import traceback
+from threading import Thread
+from multiprocessing import Process
+from factory import create_app
+from brain.cache.job import JobQueue
+from brain.session.model_generate import ModelGenerate
+from brain.session.model.calibration import calibrate
+
+
+def run_job(queue, worker, job_id, ttl, max_attempts):
+    '''
+
+    This function generates the model, for the supplied job, then records the
+    corresponding status.
+
+    '''
+
+    job = queue.get_job(job_id)
+    if not job or not job['data']:
+        queue.ack(worker, job_id)
+        return
+
+    if job['attempts'] > max_attempts:
+        queue.set_status(
+            job_id,
+            'failed',
+            error=['job exceeded %s attempts, without finishing' % max_attempts],
+            ttl=ttl
+        )
+        queue.ack(worker, job_id)
+        return
+
+    queue.set_status(job_id, 'running', 0)
+    try:
+        properties = job['data']['properties']
+
+        # probability calibration: queued by the first svm prediction
+        if properties['session_type'] == 'model_calibrate':
+            calibrate(properties['model_type'], properties['collection'])
+            errors = None
+            result = None
+
+        else:
+            session = ModelGenerate(job['data'])
+            session.generate_model(
+                lambda progress: queue.set_progress(job_id, progress)
+            )
+            errors = session.get_errors()
+            result = session.return_leaderboard()
+
+    except Exception, error:
+        errors = [str(error)]
+        result = None
+        traceback.print_exc()
+
+    if errors:
+        queue.set_status(job_id, 'failed', error=errors, ttl=ttl)
+    else:
+        queue.set_status(job_id, 'complete', 100, ttl=ttl, result=result)
+
+    queue.ack(worker, job_id)
+
+
+def run_heartbeat(app, worker, timeout):
+    '''
+
+    This function sends the heartbeat of the supplied worker indefinitely,
+    several times within each heartbeat 'timeout', including while a job is
+    running.
+
+    '''
+
+    while True:
+        with app.app_context():
+            try:
+                JobQueue().heartbeat(worker, timeout)
+            except Exception:
+                traceback.print_exc()
+
+        time.sleep(timeout / 3.0)
+
+
+def run_worker(index):
+    '''
+
+    This function queues again any unfinished job, of the supplied worker
+    index, then dequeues, and runs jobs indefinitely, within the application
+    context.
+
+    '''
+
+    app = create_app({'instance': 'api'})
+
+    timeout = app.config.get('TRAINING_POLL_TIMEOUT')
+    ttl = app.config.get('TRAINING_JOB_TTL')
+    max_attempts = app.config.get('TRAINING_MAX_ATTEMPTS')
+    worker = '%s:%s' % (socket.gethostname(), index)
+    recovered = False
+
+    heartbeat = Thread(
+        target=run_heartbeat,
+        args=(app, worker, app.config.get('TRAINING_HEARTBEAT_TIMEOUT'))
+    )
+    heartbeat.daemon = True
+    heartbeat.start()
+
+    while True:
+        with app.app_context():
+            try:
+                queue = JobQueue()
+                if not recovered:
+                    queue.recover(worker)
+                    recovered = True
+
+                queue.sweep()
+                job_id = queue.dequeue(worker, timeout)
+                if job_id:
+                    run_job(queue, worker, job_id, ttl, max_attempts)
+
+            except Exception:
+                traceback.print_exc()
+                time.sleep(timeout)
+
+
+# run workers
+if __name__ == '__main__':
+    app = create_app({'instance': 'api'})
+    workers = [None] * app.config.get('TRAINING_WORKERS')
+
+    # workers are not daemonic, since 'search' sessions fit in child processes
+    #
+    # Note: a worker which exits unexpectedly is restarted, with the same
+    #       index, so its unfinished job is queued again.
+    #
+    while True:
+        for i, worker in enumerate(workers):
+            if worker is None or not worker.is_alive():
+                workers[i] = Process(target=run_worker, args=(i,))
+                workers[i].start()
+
+        time.sleep(app.config.get('TRAINING_POLL_TIMEOUT'))